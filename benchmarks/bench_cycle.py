@@ -0,0 +1,407 @@
+"""
+Notification sikli (auto_scrape_and_notify) uchun sintetik yuklama benchmarki
+
+Alohida Postgres bazasi kerak - users, user_filters, vacancies va
+sent_vacancies jadvallari TOZALANADI:
+
+    BENCH_DATABASE_URL=postgresql://localhost/vacancybot_bench \\
+        python -m benchmarks.bench_cycle --users 10000 --vacancies 2000
+
+Scraperlar fixture vakansiyalarni qaytaruvchi stub bilan, bot esa
+xabarlarni faqat sanaydigan FakeBot bilan almashtiriladi. --bot-api bilan
+haqiqiy aiogram Bot lokal fake Bot API serverga (benchmarks/fake_bot_api.py)
+yuboradi - HTTP, 429 va 403 lar bilan end-to-end yetkazish o'lchanadi.
+--upstream bilan stub o'rniga haqiqiy scraperlar lokal hh.uz/UzJobs
+simulyatoriga (benchmarks/fake_job_boards.py) so'rov yuboradi - kechikish
+taqsimoti va xatoliklar sikl throughput iga qanday ta'sir qilishi ko'rinadi.
+Har bir bosqich (guruhlash, scraping, saqlash, filtrlash, dedup, yuborish)
+uchun chaqiruvlar soni, kumulyativ vaqt, p50/p95/p99 va DB so'rovlari, hamda
+butun siklning wall time va xotira cho'qqisi chiqariladi.
+"""
+
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import types
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Notification sikli benchmarki")
+    parser.add_argument('--users', type=int, default=10000, help="Foydalanuvchilar soni")
+    parser.add_argument('--vacancies', type=int, default=2000, help="Scraperlar qaytaradigan vakansiyalar puli")
+    parser.add_argument('--premium-ratio', type=float, default=0.1, help="Premium foydalanuvchilar ulushi")
+    parser.add_argument('--sent-ratio', type=float, default=0.3, help="Oldindan yuborilgan vakansiyasi bor userlar ulushi (--warm bilan)")
+    parser.add_argument('--warm', action='store_true', help="Vakansiyalarni oldindan bazaga yozish (steady state)")
+    parser.add_argument('--repeat', type=int, default=1, help="Sikl necha marta ishga tushiriladi")
+    parser.add_argument('--scraper-latency', type=float, default=0.0, help="Stub scraper kechikishi (s)")
+    parser.add_argument('--send-latency', type=float, default=0.0, help="FakeBot.send_message kechikishi (s)")
+    parser.add_argument('--bot-api', help="FakeBot o'rniga haqiqiy Bot shu Bot API serverga yuboradi (masalan http://localhost:8081)")
+    parser.add_argument('--upstream', help="Stub o'rniga haqiqiy scraperlar shu serverga so'rov yuboradi (masalan http://localhost:8082)")
+    parser.add_argument('--premium-index', action=argparse.BooleanOptionalAction, default=True,
+                        help="is_premium xotiradagi indeksdan (--no-premium-index - har safar bazadan)")
+    parser.add_argument('--filter-cache', action=argparse.BooleanOptionalAction, default=True,
+                        help="get_user_filter LRU cache dan (--no-filter-cache - har safar bazadan)")
+    parser.add_argument('--sent-filter', action=argparse.BooleanOptionalAction, default=True,
+                        help="Dedup Bloom filtr bilan (--no-sent-filter - har safar bazadan)")
+    parser.add_argument('--keep-throttle', action='store_true', help="Sikl ichidagi asyncio.sleep larni saqlash")
+    parser.add_argument('--tracemalloc', action='store_true', help="Python allokatsiyalari cho'qqisini o'lchash (sekinroq)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Natijalarni JSON faylga yozish")
+    parser.add_argument('--log-level', default='WARNING')
+    return parser.parse_args()
+
+
+def configure_env(args):
+    """config import qilinishidan oldin - benchmark bazasi va o'chirilgan integratsiyalar"""
+    url = os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        sys.exit("BENCH_DATABASE_URL o'rnatilmagan (alohida benchmark bazasi kerak, jadvallar tozalanadi)")
+    os.environ['DATABASE_URL'] = url
+    os.environ.setdefault('BOT_TOKEN', '123456:bench-token')
+    os.environ['FSM_STORAGE'] = 'memory'
+    os.environ['LEADER_ELECTION_ENABLED'] = 'False'
+    os.environ['TELEGRAM_API_URL'] = args.bot_api or ''
+    if args.upstream:
+        os.environ['HH_API_URL'] = args.upstream
+        os.environ['UZJOBS_URL'] = args.upstream
+    for key in ('TELEGRAM_API_ID', 'TELEGRAM_API_HASH', 'TELEGRAM_PHONE'):
+        os.environ[key] = ''
+
+
+class StageStats:
+    """Bosqichlar bo'yicha chaqiruvlar, vaqt (percentile lar bilan) va DB so'rovlari"""
+
+    def __init__(self):
+        self.stages = defaultdict(lambda: {'calls': 0, 'errors': 0, 'time': 0.0, 'queries': 0, 'db_time': 0.0})
+        self.durations = defaultdict(list)
+
+    def record(self, name, elapsed, stats=None, failed=False):
+        stage = self.stages[name]
+        stage['calls'] += 1
+        stage['errors'] += failed
+        stage['time'] += elapsed
+        self.durations[name].append(elapsed)
+        if stats is not None:
+            stage['queries'] += stats.count
+            stage['db_time'] += stats.time
+
+    def wrap(self, name, func):
+        from database import QueryStats, query_stats
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                # Har bir bosqich o'z QueryStats ini oladi, natija ota bosqichga qo'shiladi
+                parent = query_stats.get()
+                stats = QueryStats()
+                token = query_stats.set(stats)
+                start = time.perf_counter()
+                failed = False
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    query_stats.reset(token)
+                    if parent is not None:
+                        parent.count += stats.count
+                        parent.time += stats.time
+                    self.record(name, elapsed, stats, failed)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                failed = False
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    self.record(name, time.perf_counter() - start, failed=failed)
+        return wrapper
+
+    def percentiles(self, name):
+        """p50/p95/p99 (ms) - upstream kechikishida o'rtacha emas, dum muhim"""
+        values = sorted(self.durations[name])
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        pick = lambda p: values[min(len(values) - 1, int(len(values) * p))] * 1000
+        return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+class FakeBot:
+    """Bot o'rnini bosuvchi - xabarlar faqat sanaladi"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = 0
+        self.chars = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent += 1
+        self.chars += len(text)
+
+
+class StubScrapers:
+    """Fixture pulidan kalit so'z bo'yicha vakansiya qaytaruvchi scraperlar"""
+
+    def __init__(self, vacancies, latency: float = 0.0):
+        self.latency = latency
+        self.by_source = defaultdict(list)
+        for vacancy in vacancies:
+            self.by_source['hh_uz' if vacancy['source'] == 'hh_uz' else 'other'].append(vacancy)
+
+    @staticmethod
+    def _search(pool, keywords, limit):
+        words = [kw.lower() for kw in keywords or []]
+        result = []
+        for vacancy in pool:
+            text = f"{vacancy['title']} {vacancy['description']}".lower()
+            if not words or any(word in text for word in words):
+                result.append(vacancy)
+                if len(result) >= limit:
+                    break
+        return result
+
+    async def scrape_hh_uz(self, keywords=None, location='Tashkent', pages=5):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._search(self.by_source['hh_uz'], keywords, 50 * pages)
+
+    async def scrape_uzjobs(self, keywords=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._search(self.by_source['other'], keywords, 20)
+
+
+async def seed(db, args, vacancies, filters):
+    """Benchmark bazasini to'ldirish (COPY orqali)"""
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+
+    async with db.pool.acquire() as conn:
+        await conn.execute(
+            'TRUNCATE sent_vacancies, user_filters, vacancies, vacancy_keys, users RESTART IDENTITY CASCADE'
+        )
+
+        users = [
+            (
+                user_id, f"user{user_id}", f"User {user_id}", True,
+                now + timedelta(days=30) if rng.random() < args.premium_ratio else None,
+                now, now
+            )
+            for user_id in range(1, args.users + 1)
+        ]
+        await conn.copy_records_to_table(
+            'users', records=users,
+            columns=['user_id', 'username', 'first_name', 'is_active', 'premium_until', 'created_at', 'updated_at']
+        )
+
+        await conn.copy_records_to_table(
+            'user_filters',
+            records=[
+                (user_id, f['keywords'], f['locations'], f['salary_min'], f['salary_max'],
+                 f['experience_level'], f['sources'], now, now)
+                for user_id, f in enumerate(filters, start=1)
+            ],
+            columns=['user_id', 'keywords', 'locations', 'salary_min', 'salary_max',
+                     'experience_level', 'sources', 'created_at', 'updated_at']
+        )
+
+        if args.warm:
+            await conn.copy_records_to_table(
+                'vacancies',
+                records=[
+                    (v['external_id'], v['title'], v['company'], v['location'], v['salary_min'],
+                     v['salary_max'], v['experience_level'], v['description'], v['url'],
+                     v['source'], v['published_date'], now)
+                    for v in vacancies
+                ],
+                columns=['vacancy_id', 'title', 'company', 'location', 'salary_min', 'salary_max',
+                         'experience_level', 'description', 'url', 'source', 'published_date', 'created_at']
+            )
+            # Dublikat tekshiruvi vacancy_keys orqali
+            await conn.copy_records_to_table(
+                'vacancy_keys',
+                records=[(v['external_id'], now) for v in vacancies],
+                columns=['vacancy_id', 'seen_at']
+            )
+
+        # sent_vacancies vacancies.id ga bog'langan - faqat --warm bilan (vakansiyalar bazada)
+        sent = []
+        if args.warm:
+            ids = {row['vacancy_id']: row['id'] for row in await conn.fetch('SELECT vacancy_id, id FROM vacancies')}
+            for user_id in range(1, args.users + 1):
+                if rng.random() < args.sent_ratio:
+                    for vacancy in rng.sample(vacancies, min(5, len(vacancies))):
+                        sent.append((user_id, ids[vacancy['external_id']], now))
+        if sent:
+            await conn.copy_records_to_table(
+                'sent_vacancies', records=sent,
+                columns=['user_id', 'vacancy_id', 'sent_at']
+            )
+
+        await conn.execute('ANALYZE')
+
+    return {'users': len(users), 'filters': len(filters), 'sent_rows': len(sent)}
+
+
+def print_report(run, stats, result):
+    print(f"\n=== Sikl #{run}: wall {result['wall']:.2f}s, {result['queries']} ta so'rov "
+          f"({result['db_time']:.2f}s DB), {result['sent']} ta xabar, "
+          f"maxrss {result['maxrss_mb']:.0f} MB"
+          + (f", tracemalloc peak {result['tracemalloc_peak_mb']:.1f} MB" if 'tracemalloc_peak_mb' in result else '')
+          + " ===")
+    print(f"{'bosqich':<32}{'chaqiruv':>10}{'xato':>7}{'kumulyativ s':>14}{"o'rtacha ms":>13}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{"so'rov":>10}{'DB s':>9}")
+    for name, stage in sorted(stats.stages.items(), key=lambda item: -item[1]['time']):
+        mean_ms = stage['time'] / stage['calls'] * 1000 if stage['calls'] else 0
+        tail = stats.percentiles(name)
+        print(f"{name:<32}{stage['calls']:>10}{stage['errors']:>7}{stage['time']:>14.3f}{mean_ms:>13.3f}"
+              f"{tail['p95']:>10.1f}{tail['p99']:>10.1f}{stage['queries']:>10}{stage['db_time']:>9.3f}")
+
+
+async def run(args):
+    import bot as bot_module
+    import config
+    from database import db, QueryStats, query_stats
+    from premium_index import premium_index
+    from filter_cache import filter_cache
+    from bloom import sent_filter
+    from db_events import db_events
+    from filters import vacancy_filter
+    from scraper_api import scraper_api
+    from uzjobs_scraper import uz_jobs_scraper
+    from benchmarks.fixtures import make_vacancies, make_user_filters
+
+    config.TELEGRAM_ENABLED = False
+
+    vacancies = make_vacancies(args.vacancies, seed=args.seed)
+    filters = make_user_filters(args.users, seed=args.seed + 1)
+
+    await db.connect()
+    try:
+        seed_start = time.perf_counter()
+        seeded = await seed(db, args, vacancies, filters)
+        print(f"Seed: {seeded} ({time.perf_counter() - seed_start:.1f}s)")
+        if args.premium_index:
+            await premium_index.start(db.pool)
+        if args.filter_cache:
+            await filter_cache.start()
+        sent_filter.enabled = args.sent_filter
+
+        stubs = StubScrapers(vacancies, latency=args.scraper_latency)
+        if args.bot_api:
+            target_bot = bot_module.bot
+            send_message = type(target_bot).send_message
+        else:
+            target_bot = FakeBot(latency=args.send_latency)
+            send_message = FakeBot.send_message
+            bot_module.bot = target_bot
+
+        if not args.keep_throttle:
+            # Sikl ichidagi rate-limit sleep lari benchmarkni o'lchab bo'lmaydigan qiladi
+            real_sleep = asyncio.sleep
+
+            async def no_sleep(delay, result=None):
+                return await real_sleep(0, result)
+
+            bot_module.asyncio = types.SimpleNamespace(**{**vars(asyncio), 'sleep': no_sleep})
+
+        results = []
+        for run_index in range(1, args.repeat + 1):
+            stats = StageStats()
+            if args.upstream:
+                scraper_api.scrape_hh_uz = stats.wrap(
+                    'scrape_hh_uz (upstream)', type(scraper_api).scrape_hh_uz.__get__(scraper_api)
+                )
+                uz_jobs_scraper.scrape_uzjobs = stats.wrap(
+                    'scrape_uzjobs (upstream)', type(uz_jobs_scraper).scrape_uzjobs.__get__(uz_jobs_scraper)
+                )
+            else:
+                scraper_api.scrape_hh_uz = stats.wrap('scrape_hh_uz (stub)', stubs.scrape_hh_uz)
+                uz_jobs_scraper.scrape_uzjobs = stats.wrap('scrape_uzjobs (stub)', stubs.scrape_uzjobs)
+            for attr in ('get_all_active_users', 'get_user_filter', 'is_premium',
+                         'add_vacancy', 'get_vacancy_ids', 'filter_unsent', 'mark_vacancy_sent'):
+                setattr(db, attr, stats.wrap(f"db.{attr}", getattr(type(db), attr).__get__(db)))
+            vacancy_filter.apply_filters = stats.wrap('apply_filters', type(vacancy_filter).apply_filters)
+            vacancy_filter.format_vacancy_message = stats.wrap(
+                'format_vacancy_message', type(vacancy_filter).format_vacancy_message
+            )
+            bot_module.distribute_vacancies_to_group = stats.wrap(
+                'distribute_vacancies_to_group',
+                getattr(bot_module.distribute_vacancies_to_group, '__wrapped__', bot_module.distribute_vacancies_to_group)
+            )
+            bot_module.save_vacancies = stats.wrap(
+                'save_vacancies',
+                getattr(bot_module.save_vacancies, '__wrapped__', bot_module.save_vacancies)
+            )
+            send_stage = 'bot.send_message (api)' if args.bot_api else 'bot.send_message (fake)'
+            target_bot.send_message = stats.wrap(send_stage, send_message.__get__(target_bot))
+            if args.tracemalloc:
+                tracemalloc.start()
+
+            root_stats = QueryStats()
+            token = query_stats.set(root_stats)
+            start = time.perf_counter()
+            await bot_module.auto_scrape_and_notify()
+            wall = time.perf_counter() - start
+            query_stats.reset(token)
+
+            result = {
+                'run': run_index,
+                'wall': wall,
+                'queries': root_stats.count,
+                'db_time': root_stats.time,
+                'sent': stats.stages[send_stage]['calls'] - stats.stages[send_stage]['errors'],
+                'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                'stages': {
+                    name: {**stage, **stats.percentiles(name)} for name, stage in stats.stages.items()
+                },
+            }
+            if args.tracemalloc:
+                result['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+                tracemalloc.stop()
+
+            print_report(run_index, stats, result)
+            results.append(result)
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'args': vars(args), 'seed': seeded, 'runs': results}, f, indent=2, default=str)
+            print(f"\nNatijalar: {args.json}")
+    finally:
+        await premium_index.stop()
+        await db_events.stop()
+        await db.disconnect()
+        await scraper_api.close()
+        if args.bot_api:
+            await bot_module.bot.session.close()
+
+
+def main():
+    args = parse_args()
+    configure_env(args)
+    logging.basicConfig(level=args.log_level)
+    logging.getLogger().setLevel(args.log_level)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
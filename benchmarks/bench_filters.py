@@ -0,0 +1,183 @@
+"""
+VacancyFilter va calculate_match_score uchun micro-benchmark
+
+    python -m benchmarks.bench_filters --vacancies 2000 --filters 200
+
+Har bir filtr bosqichi (keywords, location, salary, experience, source),
+to'liq apply_filters va calculate_match_score uchun throughput
+(vakansiya/s) va tracemalloc bo'yicha xotira (bitta o'tishdagi cho'qqi va
+o'tish tugaganda natija bilan birga tirik qolgan bloklar) chiqariladi.
+tracemalloc faqat tirik bloklarni ko'radi - o'tish ichida ajratilib
+bo'shatilganlar bu songa kirmaydi, ular cho'qqida aks etadi.
+
+Optimallashtirilgan implementatsiyani solishtirish (natijalar bir xil
+bo'lishi shart, aks holda exit code 1):
+
+    python -m benchmarks.bench_filters \\
+        --compare apply_filters=mymodule:fast_apply_filters \\
+        --compare match_score=scoring:calculate_match_scores
+
+match_score uchun funksiyada ``batch = True`` atributi bo'lsa, u
+(vacancies, user_filter) -> ballar ro'yxati shaklida chaqiriladi.
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Filtr va match score micro-benchmarki")
+    parser.add_argument('--vacancies', type=int, default=2000, help="Fixture vakansiyalar soni")
+    parser.add_argument('--filters', type=int, default=200, help="Fixture user filtrlari soni")
+    parser.add_argument('--repeat', type=int, default=3, help="Har bir o'lchov necha marta (eng yaxshisi olinadi)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--compare', action='append', default=[],
+                        help="target=module:function (target: apply_filters | match_score)")
+    parser.add_argument('--no-alloc', action='store_true', help="tracemalloc o'lchovini o'tkazib yuborish")
+    return parser.parse_args()
+
+
+# ========== BOSQICHLAR ==========
+
+def build_stages(vacancy_filter, calculate_match_score) -> Dict[str, Callable]:
+    """Har bir bosqich: (vacancies, user_filter) -> natija (solishtirish uchun)"""
+    vf = vacancy_filter
+
+    def per_vacancy(check):
+        return lambda vacancies, f: [check(v, f) for v in vacancies]
+
+    return {
+        'filter_by_keywords': per_vacancy(lambda v, f: vf.filter_by_keywords(v, f.get('keywords', []))),
+        'filter_by_location': per_vacancy(lambda v, f: vf.filter_by_location(v, f.get('locations', []))),
+        'filter_by_salary': per_vacancy(lambda v, f: vf.filter_by_salary(v, f.get('min_salary'), f.get('max_salary'))),
+        'filter_by_experience': per_vacancy(lambda v, f: vf.filter_by_experience(v, f.get('experience_level'))),
+        'filter_by_source': per_vacancy(lambda v, f: vf.filter_by_source(v, f.get('sources', ['hh_uz', 'user_post']))),
+        'apply_filters': lambda vacancies, f: vf.apply_filters(vacancies, f),
+        'match_score': per_vacancy(calculate_match_score),
+    }
+
+
+def run_stage(stage: Callable, vacancies: List[Dict], filters: List[Dict]):
+    return [stage(vacancies, f) for f in filters]
+
+
+def time_stage(stage, vacancies, filters, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run_stage(stage, vacancies, filters)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_allocations(stage, vacancies, filters) -> Dict:
+    """Bitta o'tish: xotira cho'qqisi va natija tirik paytda o'tishdan qolgan bloklar soni"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = run_stage(stage, vacancies, filters)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, 'filename')
+    live = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+    del result
+    return {'peak_kib': peak / 1024, 'live_blocks': live}
+
+
+# ========== SOLISHTIRISH ==========
+
+def load_callable(spec: str) -> Callable:
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f"module:function formati kerak, berilgan: {spec}")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+def result_key(target: str, result):
+    """apply_filters - vakansiyalar tartibi (id bo'yicha), match_score - ballar ro'yxati"""
+    if target == 'apply_filters':
+        return [v.get('external_id') for v in result]
+    return list(result)
+
+
+def compare(target: str, baseline: Callable, candidate: Callable, vacancies, filters, repeat: int) -> bool:
+    if target == 'apply_filters':
+        base_stage = lambda vs, f: baseline(vs, f)
+        candidate_stage = lambda vs, f: candidate(vs, f)
+    elif target == 'match_score':
+        base_stage = lambda vs, f: [baseline(v, f) for v in vs]
+        candidate_stage = lambda vs, f: candidate(vs, f) if getattr(candidate, 'batch', False) \
+            else [candidate(v, f) for v in vs]
+    else:
+        raise ValueError(f"Noma'lum target: {target}")
+
+    mismatches = 0
+    for index, user_filter in enumerate(filters):
+        expected = result_key(target, base_stage(vacancies, user_filter))
+        actual = result_key(target, candidate_stage(vacancies, user_filter))
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"   ❌ filter #{index}: {user_filter}")
+                print(f"      kutilgan: {expected[:10]}{'...' if len(expected) > 10 else ''}")
+                print(f"      olingan:  {actual[:10]}{'...' if len(actual) > 10 else ''}")
+
+    base_time = time_stage(base_stage, vacancies, filters, repeat)
+    candidate_time = time_stage(candidate_stage, vacancies, filters, repeat)
+    total = len(vacancies) * len(filters)
+    status = '✅ bir xil' if not mismatches else f"❌ {mismatches}/{len(filters)} filtrda farq"
+    print(f"{target:<22}{total / base_time:>14,.0f}{total / candidate_time:>14,.0f}"
+          f"{base_time / candidate_time:>10.2f}x   {status}")
+    return mismatches == 0
+
+
+def main():
+    args = parse_args()
+    # Filtrlar har chaqiruvda logger.info/debug yozadi - benchmark chiqishini bosib ketmasin
+    logging.basicConfig(level=logging.WARNING)
+
+    from filters import vacancy_filter
+    from handlers.smart_matching import calculate_match_score
+    from benchmarks.fixtures import make_vacancies, make_user_filters
+
+    vacancies = make_vacancies(args.vacancies, seed=args.seed)
+    filters = make_user_filters(args.filters, seed=args.seed + 1)
+    total = len(vacancies) * len(filters)
+    print(f"Fixture: {len(vacancies)} vakansiya x {len(filters)} filtr = {total:,} juftlik\n")
+
+    stages = build_stages(vacancy_filter, calculate_match_score)
+    print(f"{'bosqich':<22}{'vakansiya/s':>14}{'ns/juftlik':>12}{'peak KiB':>11}{'tirik blok':>11}")
+    for name, stage in stages.items():
+        elapsed = time_stage(stage, vacancies, filters, args.repeat)
+        alloc = {} if args.no_alloc else measure_allocations(stage, vacancies, filters)
+        print(f"{name:<22}{total / elapsed:>14,.0f}{elapsed / total * 1e9:>12.0f}"
+              f"{alloc.get('peak_kib', 0):>11.1f}{alloc.get('live_blocks', 0):>11}")
+
+    if not args.compare:
+        return
+
+    baselines = {'apply_filters': vacancy_filter.apply_filters, 'match_score': calculate_match_score}
+    print(f"\n{'solishtirish':<22}{'baseline/s':>14}{'candidate/s':>14}{'tezlik':>11}")
+    ok = True
+    for spec in args.compare:
+        target, _, callable_spec = spec.partition('=')
+        ok &= compare(target, baselines[target], load_callable(callable_spec),
+                      vacancies, filters, args.repeat)
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Lokal fake Telegram Bot API server (yuborish throughput load testlari uchun)
+
+    python -m benchmarks.fake_bot_api --port 8081 --latency-ms 40 --jitter-ms 20 \\
+        --global-rate 30 --per-chat-interval 1 --blocked-ratio 0.05
+
+Botni unga yo'naltirish:
+
+    TELEGRAM_API_URL=http://localhost:8081 python bot.py
+    BENCH_DATABASE_URL=... \\
+        python -m benchmarks.bench_cycle --bot-api http://localhost:8081
+
+Qo'llab-quvvatlanadi: sendMessage, editMessageText, answerCallbackQuery,
+getMe, getUpdates (bo'sh long-poll), set/deleteWebhook; boshqa metodlar
+``true`` qaytaradi. Telegram limitlari emulyatsiya qilinadi: global va
+per-chat rate limit (429 retry_after), bloklagan userlar (403) va topilmagan
+chatlar (400). Statistika: GET /stats, tozalash: POST /stats/reset.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict, deque
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=30.0, help="O'rtacha javob kechikishi")
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help="Kechikish og'ishi (gauss)")
+    parser.add_argument('--global-rate', type=float, default=30.0, help="Global limit (xabar/s), 0 - cheksiz")
+    parser.add_argument('--per-chat-interval', type=float, default=1.0, help="Bitta chatga xabarlar orasidagi minimal vaqt (s), 0 - cheksiz")
+    parser.add_argument('--retry-after', type=int, default=1, help="429 javobidagi retry_after (s)")
+    parser.add_argument('--random-429', type=float, default=0.0, help="Tasodifiy 429 ehtimoli")
+    parser.add_argument('--blocked-ratio', type=float, default=0.0, help="Botni bloklagan userlar ulushi (403)")
+    parser.add_argument('--not-found-ratio', type=float, default=0.0, help="Topilmaydigan chatlar ulushi (400)")
+    parser.add_argument('--report-interval', type=float, default=5.0, help="Konsolga statistika chiqarish oralig'i (s), 0 - o'chirilgan")
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+# Limit qo'llaniladigan (xabar yuboruvchi) metodlar
+SEND_METHODS = {'sendmessage', 'sendphoto', 'senddocument', 'copymessage', 'forwardmessage'}
+
+
+class FakeBotAPI:
+    """Bot API emulyatori - holat va statistika"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.message_id = 0
+        self.stats = defaultdict(int)
+        self.latencies = deque(maxlen=100_000)  # percentile lar oxirgi so'rovlar bo'yicha
+        self.started = time.monotonic()
+        # Global token bucket
+        self.tokens = args.global_rate
+        self.tokens_updated = time.monotonic()
+        self.last_sent_to_chat = {}
+
+    # ========== EMULYATSIYA ==========
+
+    def _chat_bucket(self, chat_id) -> float:
+        """chat_id bo'yicha barqaror [0, 1) qiymat - bloklangan/topilmagan userlar doimiy bo'lsin"""
+        return (int(chat_id) * 2654435761 % 2 ** 32) / 2 ** 32
+
+    def _take_global_token(self) -> bool:
+        rate = self.args.global_rate
+        if not rate:
+            return True
+        now = time.monotonic()
+        self.tokens = min(rate, self.tokens + (now - self.tokens_updated) * rate)
+        self.tokens_updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _check_limits(self, method: str, chat_id):
+        """Xatolik javobi (status, description, parameters) yoki None"""
+        if chat_id is not None:
+            try:
+                bucket = self._chat_bucket(chat_id)
+            except (TypeError, ValueError):
+                return 400, "Bad Request: chat not found", None
+            if bucket < self.args.blocked_ratio:
+                return 403, "Forbidden: bot was blocked by the user", None
+            if bucket < self.args.blocked_ratio + self.args.not_found_ratio:
+                return 400, "Bad Request: chat not found", None
+
+        if method not in SEND_METHODS:
+            return None
+
+        retry = {'retry_after': self.args.retry_after}
+        if self.args.random_429 and self.rng.random() < self.args.random_429:
+            return 429, f"Too Many Requests: retry after {self.args.retry_after}", retry
+
+        if chat_id is not None and self.args.per_chat_interval:
+            now = time.monotonic()
+            last = self.last_sent_to_chat.get(chat_id)
+            if last is not None and now - last < self.args.per_chat_interval:
+                return 429, f"Too Many Requests: retry after {self.args.retry_after}", retry
+            self.last_sent_to_chat[chat_id] = now
+
+        if not self._take_global_token():
+            return 429, f"Too Many Requests: retry after {self.args.retry_after}", retry
+        return None
+
+    def _result(self, method: str, params: dict):
+        now = int(time.time())
+        if method in ('sendmessage', 'editmessagetext'):
+            if method == 'editmessagetext' and params.get('inline_message_id'):
+                return True
+            if method == 'sendmessage':
+                self.message_id += 1
+            return {
+                'message_id': int(params.get('message_id') or self.message_id),
+                'date': now,
+                'chat': {'id': int(params['chat_id']), 'type': 'private'},
+                'text': params.get('text', ''),
+                **({'edit_date': now} if method == 'editmessagetext' else {}),
+            }
+        if method == 'getme':
+            return {'id': 1, 'is_bot': True, 'first_name': 'FakeBot', 'username': 'fake_bot'}
+        if method == 'getupdates':
+            return []
+        if method == 'getwebhookinfo':
+            return {'url': '', 'has_custom_certificate': False, 'pending_update_count': 0}
+        return True
+
+    # ========== HTTP ==========
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method'].lower()
+        params = dict(await request.post()) if request.can_read_body else {}
+        params.update(request.query)
+        chat_id = params.get('chat_id')
+
+        if method == 'getupdates':
+            # Long-poll: yangilanishlar yo'q, timeout gacha kutish
+            await asyncio.sleep(min(float(params.get('timeout') or 0), 30))
+        else:
+            delay = max(0.0, self.rng.gauss(self.args.latency_ms, self.args.jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+            self.latencies.append(delay)
+
+        error = self._check_limits(method, chat_id)
+        if error:
+            status, description, parameters = error
+            self.stats[f"{method}:{status}"] += 1
+            body = {'ok': False, 'error_code': status, 'description': description}
+            if parameters:
+                body['parameters'] = parameters
+            return web.json_response(body, status=status)
+
+        self.stats[f"{method}:200"] += 1
+        return web.json_response({'ok': True, 'result': self._result(method, params)})
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        sent = sum(v for k, v in self.stats.items() if k.split(':')[0] in SEND_METHODS and k.endswith(':200'))
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+        return {
+            'elapsed': round(elapsed, 2),
+            'delivered': sent,
+            'delivered_per_sec': round(sent / elapsed, 2) if elapsed else 0,
+            'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99)},
+            'responses': dict(sorted(self.stats.items())),
+        }
+
+    def reset(self):
+        self.stats.clear()
+        self.latencies.clear()
+        self.last_sent_to_chat.clear()
+        self.started = time.monotonic()
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    async def reset_handler(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({'ok': True})
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.args.report_interval)
+            print(json.dumps(self.snapshot(), ensure_ascii=False))
+
+    async def reporter(self, app):
+        """cleanup_ctx: davriy statistika chiqarish"""
+        task = asyncio.create_task(self._report_loop()) if self.args.report_interval else None
+        yield
+        if task:
+            task.cancel()
+
+
+def create_app(args) -> web.Application:
+    api = FakeBotAPI(args)
+    app = web.Application()
+    app['api'] = api
+    app.router.add_route('*', '/bot{token}/{method}', api.handle)
+    app.router.add_get('/stats', api.stats_handler)
+    app.router.add_post('/stats/reset', api.reset_handler)
+    app.cleanup_ctx.append(api.reporter)
+    return app
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    print(f"Fake Bot API: http://{args.host}:{args.port} (TELEGRAM_API_URL)")
+    web.run_app(create_app(args), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+hh.uz API va uzjobs.com uchun lokal simulyatsiya serveri
+
+    python -m benchmarks.fake_job_boards --port 8082 --vacancies 5000 \\
+        --latency lognormal:0.3:0.6 --error-rate 0.02 --rate-429 0.01
+
+Scraperlarni unga yo'naltirish:
+
+    HH_API_URL=http://localhost:8082 UZJOBS_URL=http://localhost:8082 python bot.py
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_cycle --upstream http://localhost:8082
+
+Endpointlar: GET /vacancies (hh.uz API: text, area, page, per_page;
+found/pages bilan), GET /ru/vacancy/search (UzJobs HTML, q), GET /stats,
+POST /stats/reset.
+
+Kechikish taqsimoti (--latency, soniyalarda):
+    fixed:0.1 | uniform:0.05:0.5 | normal:0.2:0.05 | lognormal:MEDIAN:SIGMA | pareto:SCALE:ALPHA
+"""
+
+import argparse
+import asyncio
+import html
+import math
+import random
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, List
+
+from aiohttp import web
+
+# scraper_api.area_ids bilan mos
+AREA_IDS = {
+    '2759': 'Tashkent', '2760': 'Samarkand', '2761': 'Bukhara',
+    '2762': 'Andijan', '2763': 'Fergana', '2764': 'Namangan',
+}
+HH_EXPERIENCE = {
+    'no_experience': 'noExperience', 'between_1_and_3': 'between1And3',
+    'between_3_and_6': 'between3And6', 'more_than_6': 'moreThan6',
+}
+HH_MAX_RESULTS = 2000  # hh API 2000 tadan ortiq natija bermaydi
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="hh.uz / UzJobs simulyatsiya serveri")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--vacancies', type=int, default=5000, help="Generatsiya qilinadigan vakansiyalar soni")
+    parser.add_argument('--latency', default='lognormal:0.2:0.5', help="Kechikish taqsimoti (yuqoriga qarang)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500 javoblar ehtimoli")
+    parser.add_argument('--rate-429', type=float, default=0.0, help="429 javoblar ehtimoli")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="Javob bermay osilib qolish ehtimoli (client timeout)")
+    parser.add_argument('--hang-seconds', type=float, default=60.0)
+    parser.add_argument('--uzjobs-page-size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def make_latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    kind, *params = spec.split(':')
+    values = [float(p) for p in params]
+    samplers = {
+        'fixed': lambda: values[0],
+        'uniform': lambda: rng.uniform(values[0], values[1]),
+        'normal': lambda: max(0.0, rng.gauss(values[0], values[1])),
+        'lognormal': lambda: rng.lognormvariate(math.log(values[0]), values[1]),
+        'pareto': lambda: values[0] * rng.paretovariate(values[1]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Noma'lum kechikish taqsimoti: {spec}")
+    return samplers[kind]
+
+
+# ========== MA'LUMOT ==========
+
+def to_hh_item(vacancy: Dict, index: int, city: str) -> Dict:
+    """Fixture vakansiyasini hh.uz API item shakliga o'tkazish"""
+    vacancy_id = str(90_000_000 + index)
+    salary = None
+    if vacancy['salary_min'] or vacancy['salary_max']:
+        salary = {'from': vacancy['salary_min'], 'to': vacancy['salary_max'], 'currency': 'UZS', 'gross': False}
+    return {
+        'id': vacancy_id,
+        'name': vacancy['title'],
+        'archived': False,
+        'type': {'id': 'open', 'name': 'Открытая'},
+        'employer': {'id': str(index % 500), 'name': vacancy['company']},
+        'salary': salary,
+        'area': {'id': next(k for k, v in AREA_IDS.items() if v == city), 'name': vacancy['location']},
+        'snippet': {
+            'responsibility': vacancy['description'][:200],
+            'requirement': f"<highlighttext>{vacancy['title']}</highlighttext>",
+        },
+        'experience': {'id': HH_EXPERIENCE.get(vacancy['experience_level'], 'noExperience')},
+        'published_at': vacancy['published_date'].strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'alternate_url': f"https://hh.uz/vacancy/{vacancy_id}",
+    }
+
+
+def to_uzjobs_box(vacancy: Dict, index: int) -> str:
+    return (
+        '<div class="vacancy-box">'
+        f'<a class="vacancy-title" href="/ru/vacancy/{index}/">{html.escape(vacancy["title"])}</a>'
+        f'<div class="company">{html.escape(vacancy["company"])}</div>'
+        f'<div class="location">{html.escape(vacancy["location"])}</div>'
+        '</div>'
+    )
+
+
+class JobBoards:
+    """Generatsiya qilingan vakansiyalar va nosozlik profillari"""
+
+    def __init__(self, args):
+        from benchmarks.fixtures import LOCATION_NAMES, make_vacancy
+
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.latency = make_latency_sampler(args.latency, self.rng)
+        self.stats = defaultdict(int)
+        self.latencies = defaultdict(lambda: deque(maxlen=100_000))
+        self.started = time.monotonic()
+
+        city_by_name = {name: city for city, names in LOCATION_NAMES.items() for name in names}
+        self.hh_items: List[Dict] = []
+        self.uzjobs_boxes: List[tuple] = []
+        for index in range(args.vacancies):
+            vacancy = make_vacancy(self.rng, index, source='hh_uz' if index % 4 else 'uzjobs')
+            text = f"{vacancy['title']} {vacancy['description']}".lower()
+            if vacancy['source'] == 'hh_uz':
+                city = city_by_name[vacancy['location']]
+                self.hh_items.append((text, to_hh_item(vacancy, index, city)))
+            else:
+                self.uzjobs_boxes.append((text, to_uzjobs_box(vacancy, index)))
+
+    @staticmethod
+    def _search(pool, query: str):
+        words = [w for w in query.lower().replace('+', ' ').split() if w]
+        return [item for text, item in pool if not words or any(w in text for w in words)]
+
+    async def _simulate(self, endpoint: str):
+        """Kechikish va nosozliklar - xatolik javobi yoki None"""
+        if self.args.hang_rate and self.rng.random() < self.args.hang_rate:
+            self.stats[f"{endpoint}:hang"] += 1
+            await asyncio.sleep(self.args.hang_seconds)
+
+        delay = self.latency()
+        await asyncio.sleep(delay)
+        self.latencies[endpoint].append(delay)
+
+        roll = self.rng.random()
+        if roll < self.args.error_rate:
+            self.stats[f"{endpoint}:500"] += 1
+            return web.json_response({'errors': [{'type': 'server_error'}]}, status=500)
+        if roll < self.args.error_rate + self.args.rate_429:
+            self.stats[f"{endpoint}:429"] += 1
+            return web.json_response({'errors': [{'type': 'too_many_requests'}]}, status=429,
+                                     headers={'Retry-After': '1'})
+        self.stats[f"{endpoint}:200"] += 1
+        return None
+
+    # ========== HANDLERLAR ==========
+
+    async def hh_vacancies(self, request: web.Request) -> web.Response:
+        error = await self._simulate('hh')
+        if error:
+            return error
+
+        query = request.query
+        page = int(query.get('page', 0))
+        per_page = min(int(query.get('per_page', 20)), 100)
+        area = AREA_IDS.get(query.get('area', ''))
+
+        found = self._search(self.hh_items, query.get('text', ''))
+        if area:
+            found = [item for item in found if AREA_IDS.get(item['area']['id']) == area]
+        visible = found[:HH_MAX_RESULTS]
+
+        return web.json_response({
+            'items': visible[page * per_page:(page + 1) * per_page],
+            'found': len(found),
+            'pages': math.ceil(len(visible) / per_page) if visible else 0,
+            'page': page,
+            'per_page': per_page,
+        })
+
+    async def uzjobs_search(self, request: web.Request) -> web.Response:
+        error = await self._simulate('uzjobs')
+        if error:
+            return error
+
+        boxes = self._search(self.uzjobs_boxes, request.query.get('q', ''))[:self.args.uzjobs_page_size]
+        body = f"<html><body><div class='results'>{''.join(boxes)}</div></body></html>"
+        return web.Response(text=body, content_type='text/html')
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        def percentile(values, p):
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(len(values) * p))], 4) if values else 0
+
+        return web.json_response({
+            'elapsed': round(time.monotonic() - self.started, 2),
+            'responses': dict(sorted(self.stats.items())),
+            'latency_s': {
+                endpoint: {'p50': percentile(v, 0.5), 'p95': percentile(v, 0.95), 'p99': percentile(v, 0.99)}
+                for endpoint, v in self.latencies.items()
+            },
+        })
+
+    async def reset_handler(self, request: web.Request) -> web.Response:
+        self.stats.clear()
+        self.latencies.clear()
+        self.started = time.monotonic()
+        return web.json_response({'ok': True})
+
+
+def create_app(args) -> web.Application:
+    boards = JobBoards(args)
+    app = web.Application()
+    app['boards'] = boards
+    app.router.add_get('/vacancies', boards.hh_vacancies)
+    app.router.add_get('/ru/vacancy/search', boards.uzjobs_search)
+    app.router.add_get('/stats', boards.stats_handler)
+    app.router.add_post('/stats/reset', boards.reset_handler)
+    return app
+
+
+def main():
+    args = parse_args()
+    app = create_app(args)
+    boards = app['boards']
+    print(f"Job boards: http://{args.host}:{args.port} "
+          f"(hh: {len(boards.hh_items)}, uzjobs: {len(boards.uzjobs_boxes)} vakansiya, latency {args.latency})")
+    web.run_app(app, host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmarklar uchun sintetik vakansiya va filtr generatorlari
+
+Shakllar scraperlar qaytaradigan dict larga mos: hh.uz (parse_vacancy),
+Telegram (parse_vacancy_from_text), UzJobs (parse_item) va user_post.
+Bir xil seed - bir xil ma'lumot, shuning uchun natijalarni solishtirish mumkin.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+KEYWORDS = [
+    'python', 'django', 'javascript', 'react', 'vue', 'node', 'java', 'kotlin',
+    'android', 'ios', 'flutter', 'php', 'laravel', 'golang', 'devops', 'sql',
+    'postgresql', 'frontend', 'backend', 'fullstack', 'qa', 'designer', 'figma',
+    'manager', 'sotuvchi', 'buxgalter', 'operator', 'marketing', 'smm', 'hr'
+]
+
+LOCATIONS = ['Tashkent', 'Samarkand', 'Bukhara', 'Andijan', 'Fergana', 'Namangan']
+LOCATION_NAMES = {
+    'Tashkent': ['Ташкент', 'Tashkent', 'Toshkent'],
+    'Samarkand': ['Самарканд', 'Samarkand'],
+    'Bukhara': ['Бухара', 'Bukhara'],
+    'Andijan': ['Андижан', 'Andijan'],
+    'Fergana': ['Фергана', 'Fergana'],
+    'Namangan': ['Наманган', 'Namangan'],
+}
+
+EXPERIENCE_LEVELS = ['no_experience', 'between_1_and_3', 'between_3_and_6', 'more_than_6', 'not_specified']
+COMPANIES = ['EPAM', 'Uzum', 'Payme', 'Click', 'Beeline', 'Ucell', 'Artel', 'Korzinka', 'Humans', 'MyTaxi']
+CHANNELS = ['@UstozShogirdSohalar', '@ishmi_ish', '@techjobs_vakansiya', '@vakansiyaa_ishbor']
+
+TITLE_TEMPLATES = [
+    '{kw} developer', 'Senior {kw} engineer', 'Junior {kw} dasturchi',
+    '{kw} mutaxassis', 'Middle {kw} developer', '{kw} specialist'
+]
+
+FILLER = (
+    "Kompaniyamiz jamoaga yangi xodim qidiradi. Rasmiy ishga joylashish, "
+    "qulay ofis, o'sish imkoniyati. Требования: опыт работы, ответственность. "
+    "Responsibilities: code review, writing tests, working with the team."
+)
+
+
+def _salary(rng: random.Random):
+    if rng.random() < 0.35:
+        return None, None
+    low = rng.randrange(3, 40) * 1_000_000
+    return low, (low + rng.randrange(1, 15) * 1_000_000 if rng.random() < 0.7 else None)
+
+
+def make_vacancy(rng: random.Random, index: int, source: str = None) -> Dict:
+    """Bitta sintetik vakansiya (manbaga mos shaklda)"""
+    source = source or rng.choices(['hh_uz', 'telegram', 'uzjobs', 'user_post'], [6, 2, 1, 1])[0]
+    keywords = rng.sample(KEYWORDS, rng.randint(1, 3))
+    title = rng.choice(TITLE_TEMPLATES).format(kw=keywords[0].capitalize())
+    city = rng.choice(LOCATIONS)
+    location = rng.choice(LOCATION_NAMES[city])
+    company = rng.choice(COMPANIES)
+    salary_min, salary_max = _salary(rng)
+    published = datetime.now(timezone.utc) - timedelta(minutes=rng.randrange(0, 60 * 24 * 14))
+    description = f"{' '.join(keywords)}. {FILLER}"
+
+    if source == 'hh_uz':
+        external_id = f"hh_uz_{90_000_000 + index}"
+        url = f"https://hh.uz/vacancy/{90_000_000 + index}"
+        experience = rng.choice(EXPERIENCE_LEVELS[:4])
+    elif source == 'telegram':
+        channel = rng.choice(CHANNELS)
+        external_id = f"tg_{channel}_{index}"
+        url = f"https://t.me/{channel.replace('@', '')}/{index}"
+        experience = rng.choice(EXPERIENCE_LEVELS)
+        description = f"📢 {title}\n🏢 {company}\n📍 {location}\n{description}"[:500]
+    elif source == 'uzjobs':
+        external_id = f"uzjobs_{index}"
+        url = f"https://uzjobs.com/ru/vacancy/{index}/"
+        experience = 'not_specified'
+        salary_min = salary_max = None
+        description = f"Vakansiya: {title} ({company})"
+    else:
+        external_id = f"user_{rng.randrange(10_000, 99_999)}_{index}"
+        url = "https://t.me/employer"
+        experience = rng.choice(EXPERIENCE_LEVELS)
+        salary_max = None
+
+    return {
+        'external_id': external_id,
+        'title': title,
+        'company': company,
+        'description': description,
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'location': location,
+        'experience_level': experience,
+        'url': url,
+        'source': source,
+        'published_date': published,
+    }
+
+
+def make_vacancies(count: int, seed: int = 42) -> List[Dict]:
+    rng = random.Random(seed)
+    return [make_vacancy(rng, i) for i in range(count)]
+
+
+def make_user_filter(rng: random.Random) -> Dict:
+    """Bitta foydalanuvchi filtri (user_filters jadvali shaklida)"""
+    salary_min = rng.randrange(3, 30) * 1_000_000 if rng.random() < 0.4 else None
+    return {
+        'keywords': rng.sample(KEYWORDS, rng.choices([1, 2, 3], [5, 3, 1])[0]),
+        'locations': [rng.choices(LOCATIONS, [10, 3, 2, 2, 2, 1])[0]],
+        'salary_min': salary_min,
+        'salary_max': None,
+        'experience_level': rng.choice(EXPERIENCE_LEVELS),
+        'sources': ['hh_uz', 'user_post'] + (['uzjobs'] if rng.random() < 0.5 else []),
+    }
+
+
+def make_user_filters(count: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    return [make_user_filter(rng) for _ in range(count)]
@@ -0,0 +1,225 @@
+"""
+Scraper fixture larini yozib olish va tarmoqsiz qayta o'ynash
+
+Yozib olish (haqiqiy hh.uz / UzJobs / Telegram javoblari):
+
+    python -m benchmarks.replay_scrapers record --dir fixtures/scrapers \\
+        --keywords python django --pages 2 [--telegram]
+
+Bot ishlayotganda ham SCRAPER_RECORD_DIR=fixtures/scrapers orqali yozish mumkin.
+
+Qayta o'ynash - haqiqiy parse kodi (parse_page, parse_html, parse_messages)
+orqali, parser throughput i bilan:
+
+    python -m benchmarks.replay_scrapers replay --dir fixtures/scrapers
+    python -m benchmarks.replay_scrapers replay --update   # kutilgan natijalarni yozish
+    python -m benchmarks.replay_scrapers replay --check    # parse regressiyasi - exit code 1
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+DEFAULT_DIR = os.path.join('fixtures', 'scrapers')
+
+# Fixture dan tiklanmaydigan (parse vaqtida olinadigan) maydonlar
+VOLATILE_FIELDS = {
+    'uzjobs': {'published_date'},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scraper record/replay")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help="Haqiqiy javoblarni yozib olish")
+    record.add_argument('--dir', default=DEFAULT_DIR)
+    record.add_argument('--keywords', nargs='+', default=['python'])
+    record.add_argument('--location', default='Tashkent')
+    record.add_argument('--pages', type=int, default=1)
+    record.add_argument('--telegram', action='store_true', help="Telegram kanallarini ham yozish (Telethon sessiya kerak)")
+    record.add_argument('--limit-per-channel', type=int, default=30)
+
+    replay = sub.add_parser('replay', help="Fixture larni parse qilish va o'lchash")
+    replay.add_argument('--dir', default=DEFAULT_DIR)
+    replay.add_argument('--source', choices=['hh_uz', 'uzjobs', 'telegram'])
+    replay.add_argument('--repeat', type=int, default=5, help="Har bir fixture necha marta parse qilinadi (eng yaxshisi olinadi)")
+    mode = replay.add_mutually_exclusive_group()
+    mode.add_argument('--check', action='store_true', help="Kutilgan natijalar bilan solishtirish")
+    mode.add_argument('--update', action='store_true', help="Kutilgan natijalarni qayta yozish")
+    return parser.parse_args()
+
+
+def configure_env():
+    # config.py BOT_TOKEN/DATABASE_URL siz import bo'lmaydi - replay ularni ishlatmaydi
+    os.environ.setdefault('BOT_TOKEN', '123456:replay-token')
+    os.environ.setdefault('DATABASE_URL', 'postgresql://localhost/replay')
+
+
+# ========== RECORD ==========
+
+async def record(args):
+    from scraper_api import scraper_api
+    from scraper_recorder import scraper_recorder
+    from uzjobs_scraper import uz_jobs_scraper
+
+    scraper_recorder.directory = args.dir
+
+    hh = await scraper_api.scrape_hh_uz(keywords=args.keywords, location=args.location, pages=args.pages)
+    await scraper_api.close()
+    print(f"hh.uz: {len(hh)} ta vakansiya")
+
+    uzjobs = await uz_jobs_scraper.scrape_uzjobs(keywords=args.keywords)
+    print(f"UzJobs: {len(uzjobs)} ta vakansiya")
+
+    if args.telegram:
+        from telegram_scraper import telegram_scraper
+        if not telegram_scraper or not telegram_scraper.is_available():
+            print("Telegram scraper sozlanmagan (TELEGRAM_API_ID/HASH/PHONE)")
+        else:
+            await telegram_scraper.connect()
+            try:
+                telegram = await telegram_scraper.scrape_channels(limit_per_channel=args.limit_per_channel)
+            finally:
+                await telegram_scraper.disconnect()
+            print(f"Telegram: {len(telegram)} ta vakansiya")
+
+    print(f"Fixture lar: {args.dir}")
+
+
+# ========== REPLAY ==========
+
+def build_parsers():
+    """source -> (payload, request) -> (kirish elementlari soni, vakansiyalar)"""
+    from scraper_api import scraper_api
+    from telegram_scraper import TelegramVacancyScraper
+    from uzjobs_scraper import uz_jobs_scraper
+
+    telegram = TelegramVacancyScraper()
+
+    def parse_hh(payload, request):
+        return len(payload.get('items', [])), scraper_api.parse_page(payload)
+
+    def parse_uzjobs(payload, request):
+        vacancies = uz_jobs_scraper.parse_html(payload)
+        return len(vacancies), vacancies
+
+    def parse_telegram(payload, request):
+        messages = [
+            SimpleNamespace(
+                id=m['id'],
+                text=m['text'],
+                date=datetime.fromisoformat(m['date']) if m.get('date') else None
+            )
+            for m in payload
+        ]
+        return len(messages), telegram.parse_messages(messages, request.get('channel', ''))
+
+    return {'hh_uz': parse_hh, 'uzjobs': parse_uzjobs, 'telegram': parse_telegram}
+
+
+def normalize(source, vacancies):
+    """Snapshot uchun: JSON ga mos va o'zgaruvchan maydonlarsiz"""
+    volatile = VOLATILE_FIELDS.get(source, set())
+    return json.loads(json.dumps(
+        [{k: v for k, v in vacancy.items() if k not in volatile} for vacancy in vacancies],
+        ensure_ascii=False, default=str
+    ))
+
+
+def expected_path(path):
+    from scraper_recorder import FIXTURE_SUFFIX
+    return path[:-len(FIXTURE_SUFFIX)] + '.expected' + FIXTURE_SUFFIX
+
+
+def replay(args) -> int:
+    from scraper_recorder import iter_fixtures, load_fixture
+
+    parsers = build_parsers()
+    totals = defaultdict(lambda: {'files': 0, 'items': 0, 'vacancies': 0, 'bytes': 0, 'time': 0.0})
+    failures = 0
+
+    paths = list(iter_fixtures(args.dir, args.source))
+    if not paths:
+        print(f"Fixture topilmadi: {args.dir}")
+        return 1
+
+    for path in paths:
+        fixture = load_fixture(path)
+        source = fixture['source']
+        parse = parsers.get(source)
+        if parse is None:
+            print(f"⚠️ Noma'lum manba {source}: {path}")
+            continue
+
+        payload, request = fixture['payload'], fixture.get('request', {})
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            items, vacancies = parse(payload, request)
+            best = min(best, time.perf_counter() - start)
+
+        total = totals[source]
+        total['files'] += 1
+        total['items'] += items
+        total['vacancies'] += len(vacancies)
+        total['bytes'] += len(payload.encode('utf-8')) if isinstance(payload, str) \
+            else len(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        total['time'] += best
+
+        snapshot = normalize(source, vacancies)
+        if args.update:
+            with gzip.open(expected_path(path), 'wt', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=1)
+        elif args.check:
+            if not os.path.exists(expected_path(path)):
+                print(f"⚠️ Kutilgan natija yo'q (--update bilan yarating): {path}")
+                failures += 1
+                continue
+            with gzip.open(expected_path(path), 'rt', encoding='utf-8') as f:
+                expected = json.load(f)
+            if expected != snapshot:
+                failures += 1
+                print(f"❌ Parse regressiyasi: {path} ({len(expected)} -> {len(snapshot)} ta vakansiya)")
+                for old, new in zip(expected, snapshot):
+                    if old != new:
+                        changed = sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+                        print(f"   {old.get('external_id')}: {', '.join(changed)}")
+                        break
+
+    print(f"\n{'manba':<10}{'fayl':>6}{'element':>10}{'vakansiya':>11}{'element/s':>12}{'MB/s':>8}")
+    for source, total in sorted(totals.items()):
+        elapsed = total['time'] or 1e-9
+        print(f"{source:<10}{total['files']:>6}{total['items']:>10}{total['vacancies']:>11}"
+              f"{total['items'] / elapsed:>12,.0f}{total['bytes'] / elapsed / 1e6:>8.1f}")
+
+    if args.update:
+        print("\n✅ Kutilgan natijalar yangilandi")
+    elif args.check and not failures:
+        print("\n✅ Parse regressiyasi yo'q")
+    elif args.check:
+        print(f"\n❌ {failures} ta fixture farq qildi")
+    return 1 if failures else 0
+
+
+def main():
+    args = parse_args()
+    configure_env()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == 'record':
+        asyncio.run(record(args))
+    else:
+        sys.exit(replay(args))
+
+
+if __name__ == '__main__':
+    main()
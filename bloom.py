@@ -0,0 +1,148 @@
+"""
+Yuborilgan vakansiyalar uchun xotiradagi Bloom filtr
+
+Bitta global filtr (user_id, vacancies.id) juftliklari bo'yicha. "Yo'q"
+javobi aniq - bunday nomzodlar bazaga so'rovsiz yangi hisoblanadi, "bor
+bo'lishi mumkin" javobi bazada tasdiqlanadi (db.filter_unsent). Filtr
+birinchi scraping siklida sent_vacancies dan quriladi va har sikl oldidan
+oxirgi yozuvlar bilan to'ldiriladi (lider almashganda ham eskirmaydi).
+Bloom filtrdan o'chirib bo'lmaydi - muddati o'tgan yozuvlar uchun filtr
+vaqti-vaqti bilan qaytadan quriladi.
+"""
+
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from config import SENT_FILTER_ENABLED, SENT_FILTER_ERROR_RATE
+
+logger = logging.getLogger(__name__)
+
+MASK64 = (1 << 64) - 1
+MIN_CAPACITY = 100_000
+REBUILD_INTERVAL = 86400          # muddati o'tgan yozuvlarni tashlash uchun to'liq qayta qurish
+REFRESH_OVERLAP = timedelta(minutes=5)  # kechikib commit bo'lgan yozuvlar uchun
+
+
+def _mix(user_id: int, vacancy_id: int) -> int:
+    """(user_id, vacancy_id) -> 64 bit hash (splitmix64)"""
+    h = (user_id * 0x9E3779B97F4A7C15 + vacancy_id) & MASK64
+    h ^= h >> 30
+    h = (h * 0xBF58476D1CE4E5B9) & MASK64
+    h ^= h >> 27
+    h = (h * 0x94D049BB133111EB) & MASK64
+    return h ^ (h >> 31)
+
+
+class BloomFilter:
+    """Oddiy Bloom filtr (double hashing)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+
+    def _positions(self, user_id: int, vacancy_id: int):
+        h = _mix(user_id, vacancy_id)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, user_id: int, vacancy_id: int):
+        bits = self._bits
+        for pos in self._positions(user_id, vacancy_id):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(*key))
+
+
+class SentFilter:
+    """sent_vacancies ning xotiradagi Bloom nusxasi"""
+
+    def __init__(self, enabled: bool = True, error_rate: float = 0.01):
+        self.enabled = enabled
+        self.error_rate = error_rate
+        self._filter: Optional[BloomFilter] = None
+        self._building: Optional[BloomFilter] = None  # qurilayotgan filtrga ham yoziladi
+        self._loaded_until: Optional[datetime] = None
+        self._built_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """False bo'lsa - barcha tekshiruvlar bazadan"""
+        return self.enabled and self._filter is not None
+
+    def might_contain(self, user_id: int, vacancy_id: int) -> bool:
+        """False - aniq yuborilmagan"""
+        if not self.ready:
+            return True
+        return (user_id, vacancy_id) in self._filter
+
+    def add(self, user_id: int, vacancy_id: int):
+        """Write-through: mark_vacancy_sent dan"""
+        if self._filter is not None:
+            self._filter.add(user_id, vacancy_id)
+        if self._building is not None:
+            self._building.add(user_id, vacancy_id)
+
+    async def refresh(self, pool):
+        """Scraping sikli oldidan: yangi yozuvlarni qo'shish yoki to'liq qayta qurish"""
+        if not self.enabled:
+            return
+        try:
+            if (self._filter is None
+                    or self._filter.count > self._filter.capacity
+                    or time.monotonic() - self._built_at > REBUILD_INTERVAL):
+                await self._build(pool)
+            else:
+                await self._load_since(pool, self._loaded_until)
+        except Exception as e:
+            logger.error(f"❌ Sent filter yangilash xatolik: {e}")
+
+    async def _build(self, pool):
+        start = time.perf_counter()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                SELECT NOW() AS now, COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint AS estimate
+                FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'sent_vacancies'::regclass
+            ''')
+        self._building = BloomFilter(max(MIN_CAPACITY, row['estimate'] * 2), self.error_rate)
+        try:
+            loaded_until = await self._load_into(pool, self._building, None)
+            self._filter, self._loaded_until = self._building, loaded_until or row['now']
+            self._built_at = time.monotonic()
+        finally:
+            self._building = None
+        logger.info(
+            f"🌸 Sent filter qurildi: {self._filter.count} ta yozuv, "
+            f"{len(self._filter._bits) / 1024 / 1024:.1f} MB, {time.perf_counter() - start:.1f}s"
+        )
+
+    async def _load_since(self, pool, since: datetime):
+        self._loaded_until = await self._load_into(pool, self._filter, since) or since
+
+    async def _load_into(self, pool, bloom: BloomFilter, since: Optional[datetime]) -> Optional[datetime]:
+        """sent_vacancies (since - REFRESH_OVERLAP dan keyin) -> bloom, oxirgi sent_at (yoki None)"""
+        query = 'SELECT user_id, vacancy_id, sent_at FROM sent_vacancies'
+        args = []
+        if since is not None:
+            query += ' WHERE sent_at > $1'
+            args.append(since - REFRESH_OVERLAP)
+        loaded_until = None
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(query, *args, prefetch=10000):
+                    bloom.add(row['user_id'], row['vacancy_id'])
+                    if loaded_until is None or row['sent_at'] > loaded_until:
+                        loaded_until = row['sent_at']
+        return loaded_until
+
+
+sent_filter = SentFilter(enabled=SENT_FILTER_ENABLED, error_rate=SENT_FILTER_ERROR_RATE)
@@ -1,12 +1,30 @@
 import asyncio
 import logging
-from loader import bot, dp, scheduler, logger
-from flask import Flask
-from threading import Thread
+import signal
+import time
+from datetime import datetime, timedelta
+from loader import bot, dp, scheduler, storage, logger
+from web_server import BoundedRequestHandler, create_web_app, start_web_server
 
 # Config import
-from config import SCRAPING_INTERVAL
+from config import (
+    SCRAPING_INTERVAL, FSM_STATE_TTL, FSM_CLEANUP_INTERVAL, CLEANUP_INTERVAL,
+    WEBHOOK_ENABLED, WEBHOOK_PATH, WEBHOOK_URL, WEBHOOK_SECRET, WEBHOOK_MAX_CONCURRENT_UPDATES,
+    SERVER_HOST, SERVER_PORT, DIGEST_SLOTS, DIGEST_PRECOMPUTE_MINUTES
+)
 from database import db
+from leader import leader_election
+from premium_index import premium_index
+from filter_cache import filter_cache
+from bloom import sent_filter
+from recommendations import recommendations
+from db_events import db_events
+from broadcast import broadcast_manager
+from middlewares.unreachable_users import unreachable_users
+from metrics import (
+    VACANCIES_INGESTED, VACANCIES_NEW, MATCH_DURATION, MATCHED_VACANCIES,
+    track_job, monitor_event_loop
+)
 from scraper_api import scraper_api
 from filters import vacancy_filter
 
@@ -71,6 +89,12 @@ try:
 except:
     CANDIDATES_ENABLED = False
 
+# Handler latency (router/handler bo'yicha vaqt va DB so'rovlari)
+from middlewares.latency import setup_latency_middleware
+from middlewares.user_context import setup_user_context_middleware
+setup_latency_middleware(dp)
+setup_user_context_middleware(dp)
+
 # Handlerlarni ro'yxatdan o'tkazish (TARTIB MUHIM!)
 logger.info("Handlerlar ro'yxatga olinmoqda...")
 
@@ -122,11 +146,34 @@ logger.info("  ✅ Settings handler")
 dp.include_router(vacancies.router)
 logger.info("  ✅ Vacancies handler")
 
+async def save_vacancies(vacancies_list: list, source: str):
+    """Vakansiyalarni bazaga saqlash va ingest metrikalarini yozish"""
+    if not vacancies_list:
+        return
+    save_tasks = [db.add_vacancy(**v) for v in vacancies_list]
+    results = await asyncio.gather(*save_tasks, return_exceptions=True)
+    
+    # sent_vacancies butun son kalit bilan ishlaydi - vacancies.id ni biriktirish
+    ids = await db.get_vacancy_ids([v['external_id'] for v in vacancies_list if v.get('external_id')])
+    for vacancy in vacancies_list:
+        vacancy['db_id'] = ids.get(vacancy.get('external_id'))
+    
+    new_ids = [r for r in results if r is not None and not isinstance(r, Exception)]
+    VACANCIES_INGESTED.labels(source=source).inc(len(vacancies_list))
+    VACANCIES_NEW.labels(source=source).inc(len(new_ids))
+    
+    # Smart tavsiyalar - faqat yangi vakansiyalar baholanadi
+    await recommendations.on_ingest(new_ids)
+
+
 async def auto_scrape_and_notify():
     """Avtomatik scraping va bildirishnoma - OPTIMIZED GROUPED + TELEGRAM"""
     logger.info("Avtomatik scraping boshlandi...")
     
     try:
+        # Dedup Bloom filtri: birinchi siklda quriladi, keyin yangi yozuvlar qo'shiladi
+        await sent_filter.refresh(db.pool)
+        
         # 1. Telegram scraping (Global)
         telegram_vacancies = []
         try:
@@ -142,8 +189,7 @@ async def auto_scrape_and_notify():
                 
                 # Bazaga saqlash
                 if telegram_vacancies:
-                    tg_save_tasks = [db.add_vacancy(**v) for v in telegram_vacancies]
-                    await asyncio.gather(*tg_save_tasks, return_exceptions=True)
+                    await save_vacancies(telegram_vacancies, 'telegram')
                     logger.info(f"✅ Telegram: {len(telegram_vacancies)} ta vakansiya saqlandi")
         except Exception as e:
             logger.error(f"❌ Telegram scraping error: {e}")
@@ -192,15 +238,11 @@ async def auto_scrape_and_notify():
                     )
                     
                     # hh.uz vakansiyalarini saqlash
-                    if vacancies_list:
-                        save_tasks = [db.add_vacancy(**v) for v in vacancies_list]
-                        await asyncio.gather(*save_tasks, return_exceptions=True)
+                    await save_vacancies(vacancies_list, 'hh_uz')
                     
                     # 3. UzJobs scraping (NEW)
                     uzjobs_list = await uz_jobs_scraper.scrape_uzjobs(keywords=keywords)
-                    if uzjobs_list:
-                        uz_save_tasks = [db.add_vacancy(**v) for v in uzjobs_list]
-                        await asyncio.gather(*uz_save_tasks, return_exceptions=True)
+                    await save_vacancies(uzjobs_list, 'uzjobs')
                     
                     # Umumiy ro'yxat: hh.uz + Telegram + UzJobs
                     combined_vacancies = (vacancies_list or []) + (uzjobs_list or []) + telegram_vacancies
@@ -251,16 +293,25 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
                     user_filter['sources'] = sources
                 
             # Filtr qo'llash
+            match_start = time.perf_counter()
             filtered_vacancies = vacancy_filter.apply_filters(vacancies, user_filter)
+            MATCH_DURATION.observe(time.perf_counter() - match_start)
+            MATCHED_VACANCIES.observe(len(filtered_vacancies))
+            
+            # Allaqachon yuborilganlarni tashlash (Bloom filtr + musbatlar uchun bitta so'rov).
+            # Bazada yo'q (muddati o'tgan yoki saqlanmagan) vakansiyani belgilab bo'lmaydi
+            unsent = set(await db.filter_unsent(
+                user_id, [v['db_id'] for v in filtered_vacancies if v.get('db_id')]
+            ))
             
             created_count = 0
-            for vacancy in filtered_vacancies[:3]:
-                vacancy_id = vacancy.get('external_id') or vacancy.get('id')
-                
-                # Allaqachon yuborilganmi?
-                is_sent = await db.is_vacancy_sent(user_id, str(vacancy_id))
-                if is_sent:
+            for vacancy in filtered_vacancies:
+                if created_count >= 3:
+                    break
+                vacancy_id = vacancy.get('db_id')
+                if vacancy_id not in unsent:
                     continue
+                unsent.discard(vacancy_id)
                 
                 # Yuborish
                 try:
@@ -272,8 +323,7 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
                         disable_web_page_preview=True
                     )
                     
-                    if vacancy_id:
-                        await db.mark_vacancy_sent(user_id, str(vacancy_id))
+                    await db.mark_vacancy_sent(user_id, vacancy_id)
                     
                     created_count += 1
                     await asyncio.sleep(0.3) # User rate limit
@@ -285,6 +335,9 @@ async def distribute_vacancies_to_group(user_ids: list, vacancies: list):
             logger.error(f"User dist error {user_id}: {e}")
 
 
+loop_monitor_task = None
+
+
 async def on_startup():
     """Bot ishga tushganda"""
     logger.info("\n" + "="*60)
@@ -295,12 +348,23 @@ async def on_startup():
     logger.info("1. Database'ga ulanish...")
     await db.connect()
     logger.info("   ✅ Database ulanish muvaffaqiyatli")
+    await premium_index.start(db.pool)
+    await filter_cache.start()
     
     # Scheduler ishga tushirish
     logger.info("2. Scheduler ishga tushirish...")
+    
+    # Lider tanlash - joblar barcha replikalarda ro'yxatdan o'tadi, lekin faqat liderda bajariladi.
+    # Liderlik olinganda (ishga tushish, failover) - o'tib ketgan digest slotlarini yetkazish
+    from handlers.notifications import catch_up_digests
+    leader_election.on_acquire(catch_up_digests)
+    await leader_election.start()
+    logger.info(f"   {'👑 Lider' if leader_election.is_leader else '⏳ Follower'} (leader election)")
+    leader_only = leader_election.leader_only
+    
     # Avtomatik scraping
     scheduler.add_job(
-        auto_scrape_and_notify,
+        track_job('auto_scraping')(leader_only(auto_scrape_and_notify)),
         'interval',
         seconds=SCRAPING_INTERVAL,
         id='auto_scraping',
@@ -309,13 +373,74 @@ async def on_startup():
         misfire_grace_time=300
     )
     
-    # Kunlik xulosalar (har 15 minutda tekshirish)
-    from handlers.notifications import send_daily_digests
+    # Kunlik xulosalar - har slot uchun: oldindan tayyorlash va aynan vaqtida yuborish
+    from handlers.notifications import UZ_TZ, prepare_digests, send_daily_digests
+    for slot in DIGEST_SLOTS:
+        send_at = datetime.strptime(slot, '%H:%M')
+        prepare_at = send_at - timedelta(minutes=DIGEST_PRECOMPUTE_MINUTES)
+        scheduler.add_job(
+            track_job('digest_prepare')(leader_only(prepare_digests)),
+            'cron',
+            hour=prepare_at.hour,
+            minute=prepare_at.minute,
+            timezone=UZ_TZ,
+            args=[slot],
+            id=f'digest_prepare_{slot}',
+            max_instances=1,
+            coalesce=True
+        )
+        scheduler.add_job(
+            track_job('daily_digest')(leader_only(send_daily_digests)),
+            'cron',
+            hour=send_at.hour,
+            minute=send_at.minute,
+            timezone=UZ_TZ,
+            args=[slot],
+            id=f'daily_digest_{slot}',
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=1800
+        )
+    
+    # Eskirgan FSM holatlarini tozalash
+    if hasattr(storage, 'cleanup'):
+        scheduler.add_job(
+            track_job('fsm_cleanup')(leader_only(storage.cleanup)),
+            'interval',
+            seconds=FSM_CLEANUP_INTERVAL,
+            args=[FSM_STATE_TTL],
+            id='fsm_cleanup',
+            max_instances=1,
+            coalesce=True
+        )
+    
+    # Oylik partitsiyalar: kelgusi oylarni yaratish, muddati o'tganlarini DROP
     scheduler.add_job(
-        send_daily_digests,
+        track_job('partition_maintenance')(leader_only(db.maintain_partitions)),
         'interval',
-        minutes=15,
-        id='daily_digest',
+        seconds=CLEANUP_INTERVAL,
+        id='partition_maintenance',
+        max_instances=1,
+        coalesce=True
+    )
+    
+    # Egasiz qolgan (restart/crash) broadcast joblarini davom ettirish
+    scheduler.add_job(
+        track_job('broadcast_recovery')(leader_only(broadcast_manager.resume_stale)),
+        'interval',
+        seconds=60,
+        args=[bot],
+        id='broadcast_recovery',
+        max_instances=1,
+        coalesce=True
+    )
+    
+    # Yetib bo'lmaydigan userlarni o'chirish (har replika o'z navbatini yozadi)
+    scheduler.add_job(
+        track_job('deactivate_unreachable')(unreachable_users.flush),
+        'interval',
+        seconds=30,
+        id='deactivate_unreachable',
         max_instances=1,
         coalesce=True
     )
@@ -323,6 +448,10 @@ async def on_startup():
     scheduler.start()
     logger.info(f"   ✅ Scheduler ishga tushdi (interval: {SCRAPING_INTERVAL}s)")
     
+    # Event loop lag monitoringi (/metrics)
+    global loop_monitor_task
+    loop_monitor_task = asyncio.create_task(monitor_event_loop())
+    
     # Dastlabki scrapingni scheduler o'zi hal qiladi
     
     # Funksiyalar ro'yxati
@@ -363,6 +492,13 @@ async def on_shutdown():
     # Scheduler to'xtatish
     logger.info("1. Scheduler to'xtatish...")
     scheduler.shutdown(wait=False)
+    if loop_monitor_task:
+        loop_monitor_task.cancel()
+    await leader_election.stop()
+    await broadcast_manager.stop()
+    await unreachable_users.flush()
+    await premium_index.stop()
+    await db_events.stop()
     logger.info("   ✅ Scheduler to'xtatildi")
     
     # Database dan uzilish
@@ -382,47 +518,72 @@ async def on_shutdown():
 
 async def main():
     """Asosiy funksiya"""
+    runner = None
     try:
         # Startup
         await on_startup()
         
-        # Botni ishga tushirish - OPTIMIZED
-        await dp.start_polling(
-            bot,
-            polling_timeout=30,
-            handle_signals=True,
-            close_bot_session=False  # Session ni main() da yopamiz
-        )
+        # Health (va webhook) server - bot bilan bitta event loop da
+        app = create_web_app()
+        
+        if WEBHOOK_ENABLED:
+            if not WEBHOOK_URL:
+                raise ValueError("WEBHOOK_ENABLED=true, lekin WEBHOOK_HOST o'rnatilmagan!")
+            webhook_handler = BoundedRequestHandler(
+                dispatcher=dp,
+                bot=bot,
+                secret_token=WEBHOOK_SECRET,
+                max_concurrent_updates=WEBHOOK_MAX_CONCURRENT_UPDATES
+            )
+            webhook_handler.register(app, path=WEBHOOK_PATH)
+        
+        runner = await start_web_server(app, SERVER_HOST, SERVER_PORT)
+        
+        if WEBHOOK_ENABLED:
+            # Webhook rejimi - polling round trip yo'q
+            await bot.set_webhook(
+                WEBHOOK_URL,
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=dp.resolve_used_update_types(),
+                max_connections=WEBHOOK_MAX_CONCURRENT_UPDATES
+            )
+            logger.info(f"✅ Webhook o'rnatildi: {WEBHOOK_URL}")
+            
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, stop_event.set)
+                except NotImplementedError:
+                    pass
+            await stop_event.wait()
+        else:
+            # Polling rejimi (eski webhook bo'lsa o'chiriladi)
+            await bot.delete_webhook()
+            
+            # Botni ishga tushirish - OPTIMIZED
+            await dp.start_polling(
+                bot,
+                polling_timeout=30,
+                handle_signals=True,
+                close_bot_session=False  # Session ni main() da yopamiz
+            )
         
     except Exception as e:
         logger.error(f"❌ KRITIK XATOLIK: {e}", exc_info=True)
         raise
     finally:
         # Shutdown
+        if runner:
+            await runner.cleanup()
         await on_shutdown()
-app = Flask('')
-
-@app.route('/')
-def home():
-    return "Bot ishlayapti ✅"
-
-@app.route('/health')
-def health():
-    return "OK", 200
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
-
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
 
 if __name__ == '__main__':
-    keep_alive()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("\n⚠️  Bot to'xtatildi (Ctrl+C)")
     except Exception as e:
         logger.error(f"\n❌ Bot xatolik bilan to'xtadi: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,290 @@
+"""
+Broadcast joblari - bazada saqlanadigan, davom ettiriladigan yuborish
+
+Job va uning cursori (oxirgi user_id) broadcast_jobs da, har bir qabul
+qiluvchi natijasi broadcast_recipients da saqlanadi. Worker userlarni
+BROADCAST_BATCH_SIZE bo'laklarda oladi va BROADCAST_RATE limiti ostida
+BROADCAST_CONCURRENCY parallel so'rov bilan yuboradi. Natijalar bo'lak
+tugagach bitta tranzaksiyada yoziladi, shuning uchun jarayon o'lsa ko'pi
+bilan bitta bo'lak qayta yuborilishi mumkin.
+
+Har bir job bitta jarayonga tegishli (owner - jarayon tokeni): egalik
+yaratishda, davom ettirishda va egasiz jobni olishda atomik beriladi;
+heartbeat va natijalarni saqlash faqat egasi uchun ishlaydi, egaligini
+yo'qotgan worker to'xtaydi. Heartbeat alohida tickerda (bo'lak qancha
+cho'zilishidan qat'i nazar) yangilanadi; egasi o'lgan running joblarni
+lider replika resume_stale() orqali qayta oladi.
+
+Pauza/davom/bekor qilish - job holati orqali (bazada), shuning uchun
+tugmani qaysi replika qabul qilishi muhim emas. Boshqa replikadagi worker
+buni ko'pi bilan HEARTBEAT_INTERVAL ichida sezadi va joriy bo'lakning
+qolgan yuborishlarini o'tkazadi (yumshoq to'xtash). Worker hali chiqib
+ulgurmagan bo'lsa davom ettirish ham shu workerga qaytadi - ikkinchi worker
+ochilmaydi.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from config import (
+    BROADCAST_BATCH_SIZE, BROADCAST_CONCURRENCY,
+    BROADCAST_PROGRESS_INTERVAL, BROADCAST_RATE
+)
+from database import db
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = 120  # heartbeat shuncha soniya yangilanmasa - job egasiz hisoblanadi
+HEARTBEAT_INTERVAL = 15  # heartbeat va holat tekshiruvi, soniya (STALE_AFTER dan ancha kam)
+MAX_ATTEMPTS = 3   # 429 dan keyin qayta urinishlar
+
+STATUS_LABELS = {
+    'running': "📤 Yuborilmoqda",
+    'paused': "⏸ Pauza",
+    'cancelled': "❌ Bekor qilindi",
+    'done': "✅ Yakunlandi",
+}
+
+
+class RateLimiter:
+    """Bir tekis limit (xabar/soniya), 429 da barcha yuborishlar to'xtaydi"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def penalize(self, seconds: float):
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+def format_progress(job: Dict) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    """Admin uchun progress xabari va boshqaruv tugmalari"""
+    done = job['sent'] + job['blocked'] + job['failed']
+    total = max(job['total'], done)
+    percent = done / total * 100 if total else 100
+    bar = '█' * int(percent // 10) + '░' * (10 - int(percent // 10))
+
+    text = (
+        f"{STATUS_LABELS.get(job['status'], job['status'])} — <b>Broadcast #{job['id']}</b>\n\n"
+        f"{bar} {percent:.1f}%\n\n"
+        f"• Yuborildi: {job['sent']}\n"
+        f"• Bloklagan: {job['blocked']}\n"
+        f"• Xatolik: {job['failed']}\n"
+        f"• Jami: {done}/{total}"
+    )
+
+    job_id = job['id']
+    if job['status'] == 'running':
+        buttons = [
+            InlineKeyboardButton(text="⏸ Pauza", callback_data=f"broadcast_pause:{job_id}"),
+            InlineKeyboardButton(text="❌ To'xtatish", callback_data=f"broadcast_stop:{job_id}"),
+        ]
+    elif job['status'] == 'paused':
+        buttons = [
+            InlineKeyboardButton(text="▶️ Davom ettirish", callback_data=f"broadcast_resume:{job_id}"),
+            InlineKeyboardButton(text="❌ To'xtatish", callback_data=f"broadcast_stop:{job_id}"),
+        ]
+    else:
+        return text, None
+    return text, InlineKeyboardMarkup(inline_keyboard=[buttons])
+
+
+class BroadcastManager:
+    """Shu jarayondagi broadcast workerlari"""
+
+    def __init__(self, rate: float, concurrency: int, batch_size: int, progress_interval: int):
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+        self.limiter = RateLimiter(rate)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._stopping = set()  # pauza/bekor - joriy bo'lakdagi qolgan yuborishlar o'tkaziladi
+        # Shu jarayon tokeni - broadcast_jobs.owner
+        self.owner = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # ========== BOSHQARUV ==========
+
+    async def create(self, bot: Bot, admin_id: int, text: str,
+                     chat_id: int = None, message_id: int = None) -> Optional[int]:
+        job_id = await db.create_broadcast_job(admin_id, text, self.owner, chat_id, message_id)
+        if job_id:
+            logger.info(f"📢 Broadcast #{job_id} yaratildi (admin {admin_id})")
+            self._spawn(bot, job_id)
+        return job_id
+
+    async def pause(self, job_id: int) -> bool:
+        if not await db.set_broadcast_status(job_id, 'paused', ['running']):
+            return False
+        self._stopping.add(job_id)
+        return True
+
+    async def resume(self, bot: Bot, job_id: int) -> bool:
+        owner = await db.resume_broadcast_job(job_id, self.owner, STALE_AFTER)
+        if owner is None:
+            return False
+        self._stopping.discard(job_id)
+        if owner == self.owner:
+            self._spawn(bot, job_id)
+        # Aks holda oldingi worker (boshqa replikada) hali tirik - o'zi davom etadi
+        return True
+
+    async def cancel(self, job_id: int) -> bool:
+        if not await db.set_broadcast_status(job_id, 'cancelled', ['running', 'paused']):
+            return False
+        self._stopping.add(job_id)
+        return True
+
+    async def resume_stale(self, bot: Bot):
+        """Egasi o'lgan (restart, crash) running joblarni davom ettirish"""
+        for job_id in await db.claim_stale_broadcast_jobs(STALE_AFTER, self.owner):
+            if job_id not in self._tasks:
+                logger.info(f"📢 Broadcast #{job_id} davom ettirilmoqda (egasiz job)")
+                self._spawn(bot, job_id)
+
+    async def stop(self):
+        """Shutdown: workerlar to'xtatiladi, joblar running qoladi (keyin davom etadi)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def report(self, bot: Bot, job_id: int):
+        job = await db.get_broadcast_job(job_id)
+        if job:
+            await self._report(bot, job)
+
+    # ========== WORKER ==========
+
+    def _spawn(self, bot: Bot, job_id: int):
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            return
+        task = asyncio.create_task(self._run(bot, job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _heartbeat(self, job_id: int):
+        """Egalikni uzaytirish; pauza/bekor yoki egalik yo'qolsa - joriy bo'lak to'xtatiladi"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            if await db.touch_broadcast_job(job_id, self.owner) != 'running':
+                self._stopping.add(job_id)
+
+    async def _run(self, bot: Bot, job_id: int):
+        job = await db.get_broadcast_job(job_id)
+        if not job:
+            return
+        last_report = 0.0
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            while True:
+                status = await db.touch_broadcast_job(job_id, self.owner)
+                if status is None:
+                    logger.warning(f"⚠️ Broadcast #{job_id}: job boshqa jarayonga o'tgan, worker to'xtatildi")
+                    return
+                if status != 'running':
+                    if await db.release_broadcast_job(job_id, self.owner):
+                        break
+                    continue  # shu orada davom ettirilgan - egalik saqlangan, qayta tekshiramiz
+                # Ticker pauzani ko'rgan bo'lsa ham job yana running - yuborish davom etadi
+                self._stopping.discard(job_id)
+
+                batch = await db.get_broadcast_batch(job_id, job['last_user_id'], self.batch_size)
+                if not batch:
+                    await db.set_broadcast_status(job_id, 'done', ['running'])
+                    break
+
+                results = await asyncio.gather(*(self._send(bot, job, user_id) for user_id in batch))
+                completed = [result for result in results if result is not None]
+                # Bo'lak to'liq bo'lmasa cursor siljimaydi - qolganlari keyingi safar olinadi
+                cursor = batch[-1] if len(completed) == len(batch) else job['last_user_id']
+                updated = await db.save_broadcast_batch(job_id, self.owner, cursor, completed)
+                if updated is None:
+                    logger.error(f"❌ Broadcast #{job_id}: natijalarni saqlab bo'lmadi, to'xtatildi")
+                    return
+                if updated['owner'] != self.owner:
+                    logger.warning(f"⚠️ Broadcast #{job_id}: job boshqa jarayonga o'tgan, worker to'xtatildi")
+                    return
+                job = updated
+
+                if time.monotonic() - last_report >= self.progress_interval:
+                    await self._report(bot, job)
+                    last_report = time.monotonic()
+        finally:
+            heartbeat.cancel()
+            self._stopping.discard(job_id)
+
+        job = await db.get_broadcast_job(job_id)
+        if job:
+            logger.info(
+                f"📢 Broadcast #{job_id} {job['status']}: "
+                f"{job['sent']} yuborildi, {job['blocked']} bloklagan, {job['failed']} xatolik"
+            )
+            await self._report(bot, job)
+
+    async def _send(self, bot: Bot, job: Dict, user_id: int) -> Optional[Tuple[int, str, Optional[str]]]:
+        """(user_id, sent|blocked|failed, xatolik) yoki None - yuborilmadi (pauza/bekor)"""
+        async with self.semaphore:
+            for _ in range(MAX_ATTEMPTS):
+                if job['id'] in self._stopping:
+                    return None
+                await self.limiter.wait()
+                try:
+                    await bot.send_message(user_id, job['text'], parse_mode='HTML')
+                    return user_id, 'sent', None
+                except TelegramRetryAfter as e:
+                    self.limiter.penalize(e.retry_after)
+                except TelegramForbiddenError as e:
+                    return user_id, 'blocked', str(e)[:255]
+                except TelegramBadRequest as e:
+                    return user_id, 'failed', str(e)[:255]
+                except Exception as e:
+                    logger.debug(f"Broadcast xatolik {user_id}: {e}")
+                    return user_id, 'failed', str(e)[:255]
+            return user_id, 'failed', 'retry_after'
+
+    async def _report(self, bot: Bot, job: Dict):
+        if not job.get('progress_chat_id') or not job.get('progress_message_id'):
+            return
+        text, keyboard = format_progress(job)
+        try:
+            await bot.edit_message_text(
+                text,
+                chat_id=job['progress_chat_id'],
+                message_id=job['progress_message_id'],
+                reply_markup=keyboard,
+                parse_mode='HTML'
+            )
+        except TelegramBadRequest:
+            pass  # "message is not modified" yoki xabar o'chirilgan
+        except Exception as e:
+            logger.debug(f"Broadcast progress xatolik: {e}")
+
+
+# Global manager
+broadcast_manager = BroadcastManager(
+    rate=BROADCAST_RATE,
+    concurrency=BROADCAST_CONCURRENCY,
+    batch_size=BROADCAST_BATCH_SIZE,
+    progress_interval=BROADCAST_PROGRESS_INTERVAL,
+)
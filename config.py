@@ -1,4 +1,5 @@
 import os
+import hashlib
 from dotenv import load_dotenv
 from datetime import timezone
 
@@ -39,6 +40,10 @@ TELEGRAM_API_HASH = os.getenv('TELEGRAM_API_HASH')
 TELEGRAM_PHONE = os.getenv('TELEGRAM_PHONE')
 TELEGRAM_ENABLED = bool(TELEGRAM_API_ID and TELEGRAM_API_HASH and TELEGRAM_PHONE)
 
+# Scraper manbalari (load test uchun lokal serverga yo'naltirish mumkin)
+HH_API_URL = os.getenv('HH_API_URL', 'https://api.hh.uz').rstrip('/')
+UZJOBS_URL = os.getenv('UZJOBS_URL', 'https://uzjobs.com').rstrip('/')
+
 # Vakansiya saytlari
 VACANCY_SITES = {
     'hh_uz': 'https://hh.uz/search/vacancy',
@@ -186,7 +191,54 @@ HEADERS = {
 
 # Tozalash sozlamalari
 CLEANUP_OLD_VACANCIES_DAYS = 30  # 30 kundan eski vakansiyalarni o'chirish
-CLEANUP_INTERVAL = 86400  # 24 soat
+CLEANUP_INTERVAL = 86400  # 24 soat (partitsiyalarni yaratish/o'chirish)
+SENT_VACANCIES_RETENTION_DAYS = int(os.getenv('SENT_VACANCIES_RETENTION_DAYS', 60))  # yuborilganlar tarixi
+
+# FSM storage sozlamalari
+FSM_STORAGE = os.getenv('FSM_STORAGE', 'postgres').lower()  # postgres | memory
+FSM_CACHE_ENABLED = os.getenv('FSM_CACHE_ENABLED', 'False').lower() == 'true'  # faqat bitta jarayon uchun
+FSM_STATE_TTL = int(os.getenv('FSM_STATE_TTL', 7 * 86400))  # 7 kun
+FSM_CLEANUP_INTERVAL = 3600  # 1 soat
+
+# Leader election (bir nechta replika uchun - scheduler joblari faqat liderda)
+LEADER_ELECTION_ENABLED = os.getenv('LEADER_ELECTION_ENABLED', 'True').lower() == 'true'
+LEADER_LOCK_ID = int(os.getenv('LEADER_LOCK_ID', 727001))  # pg_advisory_lock kaliti
+LEADER_RENEW_INTERVAL = int(os.getenv('LEADER_RENEW_INTERVAL', 10))  # soniya
+
+# Sekin updatelar (handler latency middleware)
+SLOW_UPDATE_THRESHOLD = float(os.getenv('SLOW_UPDATE_THRESHOLD', 1.0))  # soniya
+
+# Premium status xotirada (LISTEN/NOTIFY orqali replikalar o'rtasida yangilanadi)
+PREMIUM_INDEX_ENABLED = os.getenv('PREMIUM_INDEX_ENABLED', 'True').lower() == 'true'
+PREMIUM_INDEX_RELOAD_INTERVAL = int(os.getenv('PREMIUM_INDEX_RELOAD_INTERVAL', 3600))  # to'liq qayta yuklash, soniya
+
+# User filtrlari cache (write-through, NOTIFY bilan invalidatsiya)
+FILTER_CACHE_ENABLED = os.getenv('FILTER_CACHE_ENABLED', 'True').lower() == 'true'
+FILTER_CACHE_SIZE = int(os.getenv('FILTER_CACHE_SIZE', 50000))
+
+# Yuborilgan vakansiyalar Bloom filtri (dedup - "yo'q" javobi bazaga bormaydi)
+SENT_FILTER_ENABLED = os.getenv('SENT_FILTER_ENABLED', 'True').lower() == 'true'
+SENT_FILTER_ERROR_RATE = float(os.getenv('SENT_FILTER_ERROR_RATE', 0.01))  # false positive ulushi
+
+# Kunlik xulosa slotlari (Uzbekistan vaqti, HH:MM) - har slot uchun alohida cron job
+DIGEST_SLOTS = sorted(s.strip() for s in os.getenv('DIGEST_SLOTS', '08:00,12:00,18:00,20:00,22:00').split(',') if s.strip())
+DIGEST_PRECOMPUTE_MINUTES = int(os.getenv('DIGEST_PRECOMPUTE_MINUTES', 5))  # xulosa slotdan shuncha oldin tayyorlanadi
+
+# Smart tavsiyalar (user_recommendations - premium userlar uchun oldindan hisoblangan top-K)
+RECOMMENDATIONS_TOP_K = int(os.getenv('RECOMMENDATIONS_TOP_K', 50))  # har bir user uchun saqlanadigan tavsiyalar
+RECOMMENDATIONS_WINDOW_DAYS = int(os.getenv('RECOMMENDATIONS_WINDOW_DAYS', 7))  # shundan eski vakansiyalar tavsiya qilinmaydi
+RECOMMENDATIONS_REBUILD_HOURS = int(os.getenv('RECOMMENDATIONS_REBUILD_HOURS', 24))  # to'liq qayta hisoblash oralig'i
+RECOMMENDATIONS_CANDIDATES = int(os.getenv('RECOMMENDATIONS_CANDIDATES', 2000))  # qayta hisoblashda shuncha nomzod vakansiya
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'True').lower() == 'true'  # BM25 indeks (o'chirilsa - eng yangilari)
+
+# Broadcast joblari
+BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', 25))  # xabar/soniya (Telegram limiti ~30)
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', 10))  # parallel so'rovlar
+BROADCAST_BATCH_SIZE = int(os.getenv('BROADCAST_BATCH_SIZE', 200))  # natijalar shu bo'lak bilan saqlanadi
+BROADCAST_PROGRESS_INTERVAL = int(os.getenv('BROADCAST_PROGRESS_INTERVAL', 5))  # progress xabarini yangilash, soniya
+
+# Bot API server (bo'sh bo'lsa - api.telegram.org; load test uchun benchmarks/fake_bot_api.py)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', '').rstrip('/')
 
 # Debug rejimi
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
@@ -196,6 +248,9 @@ WEBHOOK_ENABLED = os.getenv('WEBHOOK_ENABLED', 'False').lower() == 'true'
 WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '')
 WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
 WEBHOOK_URL = f"{WEBHOOK_HOST}{WEBHOOK_PATH}" if WEBHOOK_HOST else None
+# Secret token - barcha replikalarda bir xil bo'lishi kerak (default: token hash)
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET') or hashlib.sha256(BOT_TOKEN.encode()).hexdigest()[:32]
+WEBHOOK_MAX_CONCURRENT_UPDATES = int(os.getenv('WEBHOOK_MAX_CONCURRENT_UPDATES', 40))
 
 # Server sozlamalari
 SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
@@ -1,12 +1,140 @@
 import asyncpg
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, List
+from datetime import datetime, timedelta, timezone, time as dt_time
+from typing import Optional, Dict, List, Tuple
 import asyncio
+import re
+import time
+from contextvars import ContextVar
+
+from metrics import DB_POOL_WAIT, observe_pool
 
 logger = logging.getLogger(__name__)
 
 
+PARTITION_MONTHS_AHEAD = 2  # oldindan yaratiladigan oylik partitsiyalar
+
+# Oylik partitsiyalar: jadval -> partitsiya ustuni
+PARTITIONED_TABLES = {
+    'vacancies': 'published_date',
+    'sent_vacancies': 'sent_at',
+}
+
+
+def _month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _retention_cutoffs(now: datetime) -> Dict[str, datetime]:
+    """Jadval -> shundan eski qatorlar saqlanmaydi"""
+    from config import CLEANUP_OLD_VACANCIES_DAYS, SENT_VACANCIES_RETENTION_DAYS
+    return {
+        'vacancies': now - timedelta(days=CLEANUP_OLD_VACANCIES_DAYS),
+        'sent_vacancies': now - timedelta(days=SENT_VACANCIES_RETENTION_DAYS),
+    }
+
+
+class QueryStats:
+    """Bitta update (yoki job) davomida bajarilgan so'rovlar soni va vaqti"""
+
+    __slots__ = ('count', 'time')
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+
+# Joriy update uchun statistika (middleware o'rnatadi, None bo'lsa yozilmaydi)
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+class _TrackedConnection:
+    """Connection proxy - so'rovlarni joriy QueryStats ga yozish"""
+
+    def __init__(self, conn: asyncpg.Connection):
+        self._conn = conn
+
+    async def _timed(self, method, query, args, kwargs):
+        stats = query_stats.get()
+        if stats is None:
+            return await method(query, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await method(query, *args, **kwargs)
+        finally:
+            stats.count += 1
+            stats.time += time.perf_counter() - start
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._timed(self._conn.execute, query, args, kwargs)
+
+    async def executemany(self, query: str, *args, **kwargs):
+        return await self._timed(self._conn.executemany, query, args, kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._timed(self._conn.fetch, query, args, kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._timed(self._conn.fetchrow, query, args, kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._timed(self._conn.fetchval, query, args, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _TrackedAcquire:
+    """pool.acquire() context - ulanish kutish vaqtini o'lchash"""
+
+    def __init__(self, ctx):
+        self._ctx = ctx
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        conn = await self._ctx.__aenter__()
+        DB_POOL_WAIT.observe(time.perf_counter() - start)
+        return _TrackedConnection(conn)
+
+    async def __aexit__(self, *exc):
+        return await self._ctx.__aexit__(*exc)
+
+
+class TrackedPool:
+    """asyncpg pool proxy (metrikalar va query_stats uchun), qolgan atributlar pool ning o'zidan"""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+
+    def acquire(self, *, timeout: float = None):
+        return _TrackedAcquire(self._pool.acquire(timeout=timeout))
+
+    async def execute(self, query: str, *args, timeout: float = None):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: float = None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
 class Database:
     async def delete_vacancy(self, vacancy_id: str) -> bool:
         """Vakansiyani o'chirish"""
@@ -27,7 +155,7 @@ class Database:
             from config import DATABASE_URL
             
             # OPTIMIZED POOL SETTINGS
-            self.pool = await asyncpg.create_pool(
+            pool = await asyncpg.create_pool(
                 DATABASE_URL,
                 min_size=5,           # Minimum 5 connection
                 max_size=20,          # Maximum 20 connection (ko'p user uchun)
@@ -36,6 +164,8 @@ class Database:
                 command_timeout=60,   # 60 soniya timeout
                 timeout=30,           # Connection olish timeout
             )
+            self.pool = TrackedPool(pool)
+            observe_pool(pool)
             logger.info("✅ Database pool yaratildi (optimized: min=5, max=20)")
             await self.create_tables()
         except Exception as e:
@@ -87,23 +217,25 @@ class Database:
                 )
             ''')
             
-            # Sent vacancies jadvali
+            # Saqlangan vakansiyalar - retention tegmaydigan alohida jadval (vakansiya nusxasi bilan).
+            # Partitsiya migratsiyalaridan oldin: eski sent_vacancies hali to'liq
+            await self._create_favorites_table(conn)
+            
+            # Vacancies va sent_vacancies - oylik partitsiyalar (eski oylar DROP bilan o'chiriladi)
+            cutoffs = _retention_cutoffs(datetime.now(timezone.utc))
+            
+            # Vakansiya dublikatlari - global UNIQUE partitsiyalangan jadvalda bo'lmaydi
+            # (published_date uzjobs da har safar NOW()), shuning uchun alohida kalitlar jadvali
             await conn.execute('''
-                CREATE TABLE IF NOT EXISTS sent_vacancies (
-                    id SERIAL PRIMARY KEY,
-                    user_id BIGINT REFERENCES users(user_id) ON DELETE CASCADE,
-                    vacancy_id VARCHAR(255),
-                    vacancy_title TEXT,
-                    sent_at TIMESTAMPTZ DEFAULT NOW(),
-                    UNIQUE(user_id, vacancy_id)
+                CREATE TABLE IF NOT EXISTS vacancy_keys (
+                    vacancy_id VARCHAR(255) PRIMARY KEY,
+                    seen_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
                 )
             ''')
-            
-            # Vacancies jadvali
-            await conn.execute('''
-                CREATE TABLE IF NOT EXISTS vacancies (
-                    id SERIAL PRIMARY KEY,
-                    vacancy_id VARCHAR(255) UNIQUE,
+            await self._create_partitioned_table(conn, 'vacancies', '''
+                CREATE TABLE vacancies (
+                    id BIGSERIAL,
+                    vacancy_id VARCHAR(255),
                     title TEXT,
                     company VARCHAR(255),
                     location VARCHAR(255),
@@ -113,9 +245,46 @@ class Database:
                     description TEXT,
                     url TEXT,
                     source VARCHAR(50),
-                    published_date TIMESTAMPTZ,
-                    created_at TIMESTAMPTZ DEFAULT NOW()
+                    published_date TIMESTAMPTZ NOT NULL,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (id, published_date)
+                ) PARTITION BY RANGE (published_date)
+            ''', '''
+                WITH copied AS (
+                    INSERT INTO vacancies (id, vacancy_id, title, company, location, salary_min, salary_max,
+                                           experience_level, description, url, source, published_date, created_at)
+                    SELECT id, vacancy_id, title, company, location, salary_min, salary_max,
+                           experience_level, description, url, source,
+                           LEAST(COALESCE(published_date, created_at, NOW()), NOW()), created_at
+                    FROM vacancies_legacy
+                    WHERE COALESCE(published_date, created_at, NOW()) >= $1
                 )
+                INSERT INTO vacancy_keys (vacancy_id)
+                SELECT vacancy_id FROM vacancies_legacy WHERE vacancy_id IS NOT NULL
+                ON CONFLICT (vacancy_id) DO NOTHING
+            ''', cutoffs['vacancies'])
+
+            # Yuborilganlar - (user_id, vacancies.id) butun sonlar, sarlavha vacancies dan olinadi.
+            # vacancies ga FK yo'q: uning PK si (id, published_date), partitsiyalar alohida o'chiriladi
+            await self._create_partitioned_table(conn, 'sent_vacancies', '''
+                CREATE TABLE sent_vacancies (
+                    user_id BIGINT REFERENCES users(user_id) ON DELETE CASCADE,
+                    vacancy_id BIGINT NOT NULL,
+                    sent_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (user_id, vacancy_id, sent_at)
+                ) PARTITION BY RANGE (sent_at)
+            ''', '''
+                INSERT INTO sent_vacancies (user_id, vacancy_id, sent_at)
+                SELECT DISTINCT ON (s.user_id, v.id)
+                       s.user_id, v.id, LEAST(COALESCE(s.sent_at, NOW()), NOW())
+                FROM sent_vacancies_legacy s
+                JOIN vacancies v ON v.vacancy_id = s.vacancy_id
+                WHERE COALESCE(s.sent_at, NOW()) >= $1
+                ORDER BY s.user_id, v.id, s.sent_at
+            ''', cutoffs['sent_vacancies'], outdated_sql='''
+                SELECT data_type <> 'bigint' FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'sent_vacancies' AND column_name = 'vacancy_id'
             ''')
 
             # Resumes jadvali (Seekers)
@@ -150,15 +319,139 @@ class Database:
                     updated_at TIMESTAMPTZ DEFAULT NOW()
                 )
             ''')
+
+            # FSM storage jadvali (aiogram holatlari)
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS fsm_storage (
+                    key TEXT PRIMARY KEY,
+                    state TEXT,
+                    data JSONB NOT NULL DEFAULT '{}'::jsonb,
+                    updated_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            ''')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_users_premium ON users(premium_until)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_users_referred_by ON users(referred_by)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active) WHERE is_active = TRUE')
-            await conn.execute('CREATE INDEX IF NOT EXISTS idx_sent_vacancies_user ON sent_vacancies(user_id)')
+            await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_vacancy_id ON vacancies(vacancy_id)')
+            await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancy_keys_seen ON vacancy_keys(seen_at)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_sent_vacancies_vacancy ON sent_vacancies(vacancy_id)')
+            # Bloom filtrni oxirgi yozuvlar bilan to'ldirish uchun (append-only - BRIN kichik)
+            await conn.execute('CREATE INDEX IF NOT EXISTS idx_sent_vacancies_sent_at ON sent_vacancies USING BRIN (sent_at)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_published ON vacancies(published_date DESC)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_source ON vacancies(source)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_location ON vacancies(location)')
             await conn.execute('CREATE INDEX IF NOT EXISTS idx_vacancies_experience ON vacancies(experience_level)')
+            await conn.execute('CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated ON fsm_storage(updated_at)')
+
+            # Broadcast joblari va har bir qabul qiluvchi natijasi
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                    id SERIAL PRIMARY KEY,
+                    admin_id BIGINT,
+                    text TEXT NOT NULL,
+                    status VARCHAR(20) DEFAULT 'running',
+                    last_user_id BIGINT DEFAULT 0,
+                    total INTEGER DEFAULT 0,
+                    sent INTEGER DEFAULT 0,
+                    blocked INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    progress_chat_id BIGINT,
+                    progress_message_id BIGINT,
+                    heartbeat_at TIMESTAMPTZ DEFAULT NOW(),
+                    owner VARCHAR(64),
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    finished_at TIMESTAMPTZ
+                )
+            ''')
+            # Workerni yurgizayotgan jarayon tokeni - bitta job bitta workerda
+            await conn.execute('ALTER TABLE broadcast_jobs ADD COLUMN IF NOT EXISTS owner VARCHAR(64)')
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS broadcast_recipients (
+                    job_id INTEGER REFERENCES broadcast_jobs(id) ON DELETE CASCADE,
+                    user_id BIGINT,
+                    status VARCHAR(20),
+                    error TEXT,
+                    sent_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (job_id, user_id)
+                )
+            ''')
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_status ON broadcast_jobs(status) WHERE status IN ('running', 'paused')")
+
+            # Smart tavsiyalar: har bir user uchun top-K (vacancies.id, score).
+            # recommendation_users - kimga hisoblangan va qachon; o'chirilsa tavsiyalar ham o'chadi
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS recommendation_users (
+                    user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+                    built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+            ''')
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS user_recommendations (
+                    user_id BIGINT REFERENCES recommendation_users(user_id) ON DELETE CASCADE,
+                    vacancy_id BIGINT NOT NULL,
+                    score SMALLINT NOT NULL,
+                    relevance REAL NOT NULL DEFAULT 0,
+                    published_date TIMESTAMPTZ NOT NULL,
+                    PRIMARY KEY (user_id, vacancy_id)
+                )
+            ''')
+            # relevance (BM25) - teng score lar tartibi; eski jadval va indeks uchun
+            await conn.execute('ALTER TABLE user_recommendations ADD COLUMN IF NOT EXISTS relevance REAL NOT NULL DEFAULT 0')
+            await conn.execute('DROP INDEX IF EXISTS idx_user_recommendations_rank')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_user_recommendations_order
+                ON user_recommendations(user_id, score DESC, relevance DESC, published_date DESC)
+            ''')
+            # Admin ro'yxatlari uchun keyset pagination indexlari
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_users_active_created
+                ON users(created_at DESC, user_id DESC) WHERE is_active = TRUE
+            ''')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_users_active_premium
+                ON users(premium_until, user_id) WHERE is_active = TRUE AND premium_until IS NOT NULL
+            ''')
+
+            # premium_until o'zgarishi - replikalardagi premium indeksga NOTIFY
+            await conn.execute('''
+                CREATE OR REPLACE FUNCTION notify_premium_changed() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' AND NEW.premium_until IS NULL THEN
+                        RETURN NULL;
+                    END IF;
+                    PERFORM pg_notify('premium_changed', NEW.user_id || ':' ||
+                        COALESCE(EXTRACT(EPOCH FROM NEW.premium_until)::text, ''));
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+            ''')
+            await conn.execute('DROP TRIGGER IF EXISTS trg_users_premium_changed ON users')
+            await conn.execute('''
+                CREATE TRIGGER trg_users_premium_changed
+                AFTER INSERT OR UPDATE OF premium_until ON users
+                FOR EACH ROW EXECUTE FUNCTION notify_premium_changed()
+            ''')
+
+            # user_filters o'zgarishi - replikalardagi filter cache ga NOTIFY
+            await conn.execute('''
+                CREATE OR REPLACE FUNCTION notify_user_filter_changed() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'DELETE' THEN
+                        PERFORM pg_notify('user_filter_changed', OLD.user_id || ':');
+                    ELSE
+                        PERFORM pg_notify('user_filter_changed', NEW.user_id || ':' ||
+                            COALESCE(EXTRACT(EPOCH FROM NEW.updated_at)::text, ''));
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+            ''')
+            await conn.execute('DROP TRIGGER IF EXISTS trg_user_filters_changed ON user_filters')
+            await conn.execute('''
+                CREATE TRIGGER trg_user_filters_changed
+                AFTER INSERT OR UPDATE OR DELETE ON user_filters
+                FOR EACH ROW EXECUTE FUNCTION notify_user_filter_changed()
+            ''')
             
             # referred_by ustunini qo'shish (eski database uchun)
             try:
@@ -169,6 +462,159 @@ class Database:
             
             logger.info("✅ Jadvallar va indexlar yaratildi/tekshirildi")
     
+    async def _create_favorites_table(self, conn):
+        """favorites jadvali; birinchi marta yaratilganda eski sent_vacancies dagi barcha saqlanganlar ko'chiriladi"""
+        async with conn.transaction():
+            await conn.execute('SELECT pg_advisory_xact_lock(hashtext($1))', 'table:favorites')
+            if await conn.fetchval("SELECT to_regclass('favorites') IS NOT NULL"):
+                return
+            await conn.execute('''
+                CREATE TABLE favorites (
+                    user_id BIGINT REFERENCES users(user_id) ON DELETE CASCADE,
+                    vacancy_id VARCHAR(255) NOT NULL,
+                    title TEXT,
+                    company VARCHAR(255),
+                    location VARCHAR(255),
+                    salary_min INTEGER,
+                    salary_max INTEGER,
+                    experience_level VARCHAR(50),
+                    description TEXT,
+                    url TEXT,
+                    source VARCHAR(50),
+                    saved_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (user_id, vacancy_id)
+                )
+            ''')
+            await conn.execute('CREATE INDEX idx_favorites_user_saved ON favorites(user_id, saved_at DESC)')
+            
+            if not await conn.fetchval("SELECT to_regclass('sent_vacancies') IS NOT NULL"):
+                return
+            # Eski sxemada sent_vacancies.vacancy_id - tashqi id (VARCHAR), yangisida vacancies.id
+            sent_by_id = await conn.fetchval('''
+                SELECT data_type = 'bigint' FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'sent_vacancies' AND column_name = 'vacancy_id'
+            ''')
+            join = 'v.id = s.vacancy_id' if sent_by_id else 'v.vacancy_id = s.vacancy_id'
+            copied = await conn.execute(f'''
+                INSERT INTO favorites (user_id, vacancy_id, title, company, location, salary_min, salary_max,
+                                       experience_level, description, url, source, saved_at)
+                SELECT DISTINCT ON (s.user_id, v.vacancy_id)
+                       s.user_id, v.vacancy_id, v.title, v.company, v.location, v.salary_min, v.salary_max,
+                       v.experience_level, v.description, v.url, v.source, COALESCE(s.sent_at, NOW())
+                FROM sent_vacancies s
+                JOIN vacancies v ON {join}
+                WHERE s.user_id IS NOT NULL AND v.vacancy_id IS NOT NULL
+                ORDER BY s.user_id, v.vacancy_id, s.sent_at DESC
+            ''')
+            logger.info(f"✅ favorites jadvali yaratildi, sent_vacancies dan ko'chirildi: {copied}")
+    
+    # ========== PARTITSIYALAR ==========
+    
+    async def _create_partitioned_table(self, conn, table: str, create_sql: str,
+                                        copy_sql: str, cutoff: datetime, outdated_sql: str = None):
+        """Partitsiyalangan jadval yaratish; eski jadval (oddiy yoki outdated_sql bo'yicha eski sxema) - ko'chirish"""
+        async with conn.transaction():
+            # Bir nechta replika bir vaqtda ishga tushsa - migratsiya bir marta
+            await conn.execute('SELECT pg_advisory_xact_lock(hashtext($1))', f'partition:{table}')
+            relkind = await conn.fetchval('SELECT relkind FROM pg_class WHERE oid = to_regclass($1)', table)
+            if relkind == 'p' and not (outdated_sql and await conn.fetchval(outdated_sql)):
+                await self._ensure_partitions(conn, table, cutoff, datetime.now(timezone.utc))
+                return
+            
+            if relkind:
+                legacy = f'{table}_legacy'
+                # Eski partitsiyalar nomi yangilari bilan to'qnashmasin
+                partitions = await conn.fetch(
+                    'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+                    'WHERE i.inhparent = $1::regclass', table
+                )
+                for row in partitions:
+                    await conn.execute(f'ALTER TABLE "{row["relname"]}" RENAME TO "{row["relname"]}_legacy"')
+                await conn.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+                await conn.execute(f'ALTER SEQUENCE IF EXISTS {table}_id_seq RENAME TO {legacy}_id_seq')
+                # Indeks/constraint nomlari yangi jadvalniki bilan to'qnashmasin
+                indexes = await conn.fetch(
+                    'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                    'WHERE i.indrelid = $1::regclass', legacy
+                )
+                for row in indexes:
+                    await conn.execute(f'ALTER INDEX "{row["relname"]}" RENAME TO "{row["relname"]}_legacy"')
+            
+            await conn.execute(create_sql)
+            await self._ensure_partitions(conn, table, cutoff, datetime.now(timezone.utc))
+            
+            if relkind:
+                await conn.execute(copy_sql, cutoff)
+                sequence = await conn.fetchval(
+                    "SELECT pg_get_serial_sequence($1, attname) FROM pg_attribute "
+                    "WHERE attrelid = $1::regclass AND attname = 'id'", table
+                )
+                if sequence:
+                    await conn.execute(
+                        f"SELECT setval('{sequence}', "
+                        f"COALESCE((SELECT MAX(id) FROM {table}_legacy), 0) + 1, false)"
+                    )
+                await conn.execute(f'DROP TABLE {table}_legacy')
+                logger.info(f"✅ {table} yangi sxemaga (oylik partitsiyalar) ko'chirildi")
+    
+    async def _ensure_partitions(self, conn, table: str, oldest: datetime, now: datetime):
+        """oldest oyidan PARTITION_MONTHS_AHEAD oy oldinga partitsiyalar"""
+        month = _month_start(oldest)
+        last = _add_months(_month_start(now), PARTITION_MONTHS_AHEAD)
+        while month <= last:
+            next_month = _add_months(month, 1)
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+            )
+            month = next_month
+    
+    async def _drop_expired_partitions(self, conn, table: str, cutoff: datetime) -> List[str]:
+        """Butunlay cutoff dan eski oylar - DROP (DELETE dan farqli O(1))"""
+        rows = await conn.fetch(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = $1::regclass', table
+        )
+        dropped = []
+        for row in rows:
+            match = re.fullmatch(rf'{table}_p(\d{{4}})(\d{{2}})', row['relname'])
+            if not match:
+                continue
+            month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+            if _add_months(month, 1) <= cutoff:
+                await conn.execute(f'DROP TABLE IF EXISTS {row["relname"]}')
+                dropped.append(row['relname'])
+        return dropped
+    
+    async def maintain_partitions(self):
+        """Kelgusi oylar partitsiyalarini yaratish, muddati o'tganlarini o'chirish"""
+        try:
+            now = datetime.now(timezone.utc)
+            cutoffs = _retention_cutoffs(now)
+            async with self.pool.acquire() as conn:
+                dropped = []
+                for table in PARTITIONED_TABLES:
+                    await self._ensure_partitions(conn, table, cutoffs[table], now)
+                    dropped += await self._drop_expired_partitions(conn, table, cutoffs[table])
+                # Scraperlar uzoq vaqt ko'rmagan kalitlar
+                purged = await conn.execute(
+                    'DELETE FROM vacancy_keys WHERE seen_at < $1', cutoffs['vacancies']
+                )
+                # Smart tavsiyalarni uzoq ochmagan userlar - inkremental yangilanmaydi
+                from config import RECOMMENDATIONS_WINDOW_DAYS
+                await conn.execute(
+                    'DELETE FROM recommendation_users WHERE built_at < $1',
+                    now - timedelta(days=RECOMMENDATIONS_WINDOW_DAYS)
+                )
+            logger.info(
+                f"🗂 Partitsiyalar tekshirildi: {len(dropped)} ta o'chirildi"
+                + (f" ({', '.join(dropped)})" if dropped else '')
+                + f", vacancy_keys: {purged}"
+            )
+        except Exception as e:
+            logger.error(f"❌ maintain_partitions xatolik: {e}")
+    
     # ========== USER MANAGEMENT - OPTIMIZED ==========
     
     async def add_resume(self, **kwargs):
@@ -275,6 +721,29 @@ class Database:
             logger.error(f"❌ get_all_active_users xatolik: {e}")
             return []
     
+    async def deactivate_users(self, failed_at: Dict[int, datetime]) -> Optional[List[int]]:
+        """Yetib bo'lmaydigan userlarni o'chirish (user_id -> xatolik vaqti)
+
+        Xatolikdan keyin faol bo'lgan (/start - updated_at yangilangan) userlar
+        o'chirilmaydi. O'chirilgan user_id lar, xatolikda None.
+        """
+        if not failed_at:
+            return []
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    UPDATE users u SET is_active = FALSE
+                    FROM unnest($1::bigint[], $2::timestamptz[]) AS f(user_id, failed_at)
+                    WHERE u.user_id = f.user_id
+                      AND u.is_active = TRUE
+                      AND u.updated_at <= f.failed_at
+                    RETURNING u.user_id
+                ''', list(failed_at.keys()), list(failed_at.values()))
+                return [row['user_id'] for row in rows]
+        except Exception as e:
+            logger.error(f"❌ deactivate_users xatolik: {e}")
+            return None
+    
     # ========== PREMIUM MANAGEMENT - FIXED ==========
     
     async def set_premium(self, user_id: int, days: int) -> bool:
@@ -325,6 +794,8 @@ class Database:
                     SET premium_until = $2, updated_at = $3
                     WHERE user_id = $1
                 ''', user_id, premium_until, now)
+                from premium_index import premium_index
+                premium_index.set(user_id, premium_until)
                 
                 # 5. VERIFICATION
                 await asyncio.sleep(0.3)
@@ -346,11 +817,15 @@ class Database:
             return False
     
     async def is_premium(self, user_id: int) -> bool:
-        """Premium status - CACHED with index"""
+        """Premium status - xotiradagi indeks, tayyor bo'lmasa bazadan"""
         try:
             from config import ADMIN_IDS
+            from premium_index import premium_index
             if user_id in ADMIN_IDS:
                 return True
+
+            if premium_index.ready:
+                return premium_index.is_premium(user_id)
                 
             now = datetime.now(timezone.utc)
             
@@ -375,7 +850,7 @@ class Database:
             now = datetime.now(timezone.utc)
             
             async with self.pool.acquire() as conn:
-                await conn.execute('''
+                row = await conn.fetchrow('''
                     INSERT INTO user_filters 
                     (user_id, keywords, locations, regions, categories, salary_min, salary_max,
                      employment_types, experience_level, sources, created_at, updated_at)
@@ -391,6 +866,7 @@ class Database:
                         experience_level = EXCLUDED.experience_level,
                         sources = EXCLUDED.sources,
                         updated_at = EXCLUDED.updated_at
+                    RETURNING *
                 ''', 
                 user_id,
                 filter_data.get('keywords', []),
@@ -404,6 +880,10 @@ class Database:
                 filter_data.get('sources', ['hh_uz', 'user_post']),
                 now, now)
                 
+                from filter_cache import filter_cache
+                filter_cache.put(user_id, dict(row))
+                # Smart tavsiyalar eski filtr bo'yicha - keyingi ochishda qayta hisoblanadi
+                await conn.execute('DELETE FROM recommendation_users WHERE user_id = $1', user_id)
                 return True
                 
         except Exception as e:
@@ -413,41 +893,20 @@ class Database:
     async def get_user_filter(self, user_id: int) -> Dict:
         """User filtrini olish (Premium uchun Telegram-auto bilan)"""
         try:
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    'SELECT * FROM user_filters WHERE user_id = $1',
-                    user_id
-                )
+            from filter_cache import filter_cache
+            found, data = filter_cache.get(user_id)
+            if not found:
+                token = filter_cache.token()
+                async with self.pool.acquire() as conn:
+                    row = await conn.fetchrow(
+                        'SELECT * FROM user_filters WHERE user_id = $1',
+                        user_id
+                    )
+                data = dict(row) if row else None
+                filter_cache.put(user_id, data, token)
                 
-                # Default filter
-                data = {
-                    'keywords': [],
-                    'locations': ['Tashkent'],
-                    'salary_min': None,
-                    'salary_max': None,
-                    'experience_level': 'not_specified',
-                    'sources': ['hh_uz', 'user_post']
-                }
-                
-                if row:
-                    data = dict(row)
-                
-                # Premium check and auto-source addition
-                is_premium = await self.is_premium(user_id)
-                if is_premium:
-                    # sources list bo'lishini ta'minlash
-                    if not data.get('sources'):
-                        data['sources'] = ['hh_uz', 'user_post', 'telegram']
-                    elif 'telegram' not in data['sources']:
-                        # convert if it was string for some reason (asyncpg usually returns list for ARRAY)
-                        data['sources'] = list(data['sources'])
-                        data['sources'].append('telegram')
-                else:
-                    # Non-premium shouldn't have telegram
-                    if data.get('sources') and 'telegram' in data['sources']:
-                        data['sources'] = [s for s in data['sources'] if s != 'telegram']
-                
-                return data
+            is_premium = await self.is_premium(user_id)
+            return self.build_user_filter(data, is_premium)
         except Exception as e:
             logger.error(f"❌ get_user_filter xatolik: {e}")
             return {
@@ -459,11 +918,95 @@ class Database:
                 'sources': ['hh_uz', 'user_post']
             }
     
+    @staticmethod
+    def build_user_filter(data: Optional[Dict], is_premium: bool) -> Dict:
+        """Filtr qatori (yoki default) + premium bo'yicha manbalar"""
+        if not data:
+            # Default filter
+            data = {
+                'keywords': [],
+                'locations': ['Tashkent'],
+                'salary_min': None,
+                'salary_max': None,
+                'experience_level': 'not_specified',
+                'sources': ['hh_uz', 'user_post']
+            }
+
+        # Premium check and auto-source addition
+        if is_premium:
+            # sources list bo'lishini ta'minlash
+            if not data.get('sources'):
+                data['sources'] = ['hh_uz', 'user_post', 'telegram']
+            elif 'telegram' not in data['sources']:
+                # convert if it was string for some reason (asyncpg usually returns list for ARRAY)
+                data['sources'] = list(data['sources'])
+                data['sources'].append('telegram')
+        else:
+            # Non-premium shouldn't have telegram
+            if data.get('sources') and 'telegram' in data['sources']:
+                data['sources'] = [s for s in data['sources'] if s != 'telegram']
+
+        return data
+
+    async def get_user_context(self, user_id: int) -> Optional[Dict]:
+        """User, filtr va bildirishnoma sozlamalari - bitta so'rovda (UserContext uchun)"""
+        try:
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    SELECT
+                        u.*,
+                        (u.premium_until > NOW()) as is_premium_active,
+                        f.user_id IS NOT NULL as f_exists,
+                        f.keywords as f_keywords,
+                        f.locations as f_locations,
+                        f.regions as f_regions,
+                        f.categories as f_categories,
+                        f.salary_min as f_salary_min,
+                        f.salary_max as f_salary_max,
+                        f.employment_types as f_employment_types,
+                        f.experience_level as f_experience_level,
+                        f.sources as f_sources,
+                        ns.user_id IS NOT NULL as ns_exists,
+                        ns.enabled as ns_enabled,
+                        ns.instant_notify as ns_instant_notify,
+                        ns.daily_digest as ns_daily_digest,
+                        ns.digest_time as ns_digest_time,
+                        ns.last_digest_sent as ns_last_digest_sent
+                    FROM users u
+                    LEFT JOIN user_filters f ON f.user_id = u.user_id
+                    LEFT JOIN notification_settings ns ON ns.user_id = u.user_id
+                    WHERE u.user_id = $1
+                ''', user_id)
+
+                if not row:
+                    return None
+
+                user, user_filter, notification_settings = {}, {}, {}
+                for key, value in row.items():
+                    if key.startswith('f_'):
+                        user_filter[key[2:]] = value
+                    elif key.startswith('ns_'):
+                        notification_settings[key[3:]] = value
+                    else:
+                        user[key] = value
+
+                return {
+                    'user': user,
+                    'filter': user_filter if user_filter.pop('exists') else None,
+                    'notification_settings': notification_settings if notification_settings.pop('exists') else None,
+                }
+        except Exception as e:
+            logger.error(f"❌ get_user_context xatolik: {e}")
+            return None
+
     async def delete_user_filter(self, user_id: int):
         """User filtrini o'chirish"""
         try:
             async with self.pool.acquire() as conn:
                 await conn.execute('DELETE FROM user_filters WHERE user_id = $1', user_id)
+                from filter_cache import filter_cache
+                filter_cache.put(user_id, None)
+                await conn.execute('DELETE FROM recommendation_users WHERE user_id = $1', user_id)
                 return True
         except Exception as e:
             logger.error(f"❌ delete_user_filter xatolik: {e}")
@@ -475,14 +1018,29 @@ class Database:
         """Vakansiya qo'shish"""
         try:
             now = datetime.now(timezone.utc)
+            published_date = kwargs.get('published_date') or now
+            if published_date.tzinfo is None:
+                published_date = published_date.replace(tzinfo=timezone.utc)
+            # Kelajakdagi sana - partitsiya yo'q; muddati o'tgani - baribir o'chiriladi
+            published_date = min(published_date, now)
+            if published_date < _retention_cutoffs(now)['vacancies']:
+                return None
             
             async with self.pool.acquire() as conn:
+                # Yangi kalit bo'lsa qo'shiladi; mavjud kalitning seen_at i kuniga bir marta yangilanadi
                 result = await conn.fetchval('''
+                    WITH new_key AS (
+                        INSERT INTO vacancy_keys (vacancy_id, seen_at)
+                        VALUES ($1, $12)
+                        ON CONFLICT (vacancy_id) DO UPDATE SET seen_at = EXCLUDED.seen_at
+                        WHERE vacancy_keys.seen_at < EXCLUDED.seen_at - INTERVAL '1 day'
+                        RETURNING (xmax = 0) AS inserted
+                    )
                     INSERT INTO vacancies 
                     (vacancy_id, title, company, location, salary_min, salary_max,
                      experience_level, description, url, source, published_date, created_at)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                    ON CONFLICT (vacancy_id) DO NOTHING
+                    SELECT $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12
+                    FROM new_key WHERE inserted
                     RETURNING id
                 ''',
                 kwargs.get('external_id'),
@@ -495,7 +1053,7 @@ class Database:
                 kwargs.get('description'),
                 kwargs.get('url'),
                 kwargs.get('source', 'hh_uz'),
-                kwargs.get('published_date', now),
+                published_date,
                 now)
                 
                 return result
@@ -519,33 +1077,240 @@ class Database:
     
     # ========== SENT VACANCIES ==========
     
-    async def mark_vacancy_sent(self, user_id: int, vacancy_id: str, vacancy_title: str = None):
-        """Yuborilgan vakansiyani belgilash"""
+    async def get_vacancy_ids(self, external_ids: List[str]) -> Dict[str, int]:
+        """Tashqi vacancy_id -> vacancies.id (bitta so'rov)"""
+        if not external_ids:
+            return {}
         try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT vacancy_id, id FROM vacancies WHERE vacancy_id = ANY($1::varchar[])',
+                    list(external_ids)
+                )
+                return {row['vacancy_id']: row['id'] for row in rows}
+        except Exception as e:
+            logger.error(f"❌ get_vacancy_ids xatolik: {e}")
+            return {}
+    
+    async def mark_vacancy_sent(self, user_id: int, vacancy_id: int) -> bool:
+        """Yuborilgan vakansiyani belgilash (vacancies.id). Yangi yozilgan bo'lsa True"""
+        try:
+            from bloom import sent_filter
             now = datetime.now(timezone.utc)
             
             async with self.pool.acquire() as conn:
-                await conn.execute('''
-                    INSERT INTO sent_vacancies (user_id, vacancy_id, vacancy_title, sent_at)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (user_id, vacancy_id) DO NOTHING
-                ''', user_id, vacancy_id, vacancy_title, now)
+                # Partitsiyalangan jadvalda (user_id, vacancy_id) UNIQUE bo'lmaydi - juftlik bo'yicha
+                # advisory lock: boshqa replika bir vaqtda yozsa, NOT EXISTS uning commitidan keyin tekshiriladi
+                async with conn.transaction():
+                    await conn.execute(
+                        "SELECT pg_advisory_xact_lock(hashtext('sent:' || $1::bigint || ':' || $2::bigint))",
+                        user_id, vacancy_id
+                    )
+                    result = await conn.execute('''
+                        INSERT INTO sent_vacancies (user_id, vacancy_id, sent_at)
+                        SELECT $1, $2, $3
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM sent_vacancies WHERE user_id = $1 AND vacancy_id = $2
+                        )
+                    ''', user_id, vacancy_id, now)
                 
-                return True
+                sent_filter.add(user_id, vacancy_id)
+                return result == 'INSERT 0 1'
+        except Exception as e:
+            logger.debug(f"mark_vacancy_sent: {e}")
+            return False
+    
+    # ========== FAVORITES ==========
+    
+    async def add_favorite(self, user_id: int, vacancy_id: str) -> bool:
+        """Saqlanganlarga qo'shish (tashqi vacancy_id, vakansiya nusxasi bilan). Allaqachon bor bo'lsa False"""
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.execute('''
+                    INSERT INTO favorites (user_id, vacancy_id, title, company, location, salary_min, salary_max,
+                                           experience_level, description, url, source)
+                    SELECT $1, vacancy_id, title, company, location, salary_min, salary_max,
+                           experience_level, description, url, source
+                    FROM vacancies
+                    WHERE vacancy_id = $2
+                    ORDER BY published_date DESC
+                    LIMIT 1
+                    ON CONFLICT (user_id, vacancy_id) DO NOTHING
+                ''', user_id, vacancy_id)
+                return result == 'INSERT 0 1'
         except Exception as e:
-            logger.debug(f"add_sent_vacancy: {e}")
+            logger.error(f"❌ add_favorite xatolik: {e}")
             return False
     
-    async def is_vacancy_sent(self, user_id: int, vacancy_id: str) -> bool:
-        """Vakansiya yuborilganmi?"""
+    async def get_favorite(self, user_id: int, vacancy_id: str) -> Optional[Dict]:
+        """Saqlangan vakansiya nusxasi (vakansiya o'zi retention bilan o'chgan bo'lsa ham)"""
         try:
             async with self.pool.acquire() as conn:
                 row = await conn.fetchrow(
-                    'SELECT 1 FROM sent_vacancies WHERE user_id = $1 AND vacancy_id = $2',
+                    'SELECT * FROM favorites WHERE user_id = $1 AND vacancy_id = $2',
                     user_id, vacancy_id
                 )
-                return row is not None
-        except:
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"❌ get_favorite xatolik: {e}")
+            return None
+    
+    
+    async def filter_unsent(self, user_id: int, vacancy_ids: List[int]) -> List[int]:
+        """Hali yuborilmagan vacancies.id lar (tartib saqlanadi)
+
+        Bloom filtr "yo'q" deganlar bazasiz o'tadi, "bor bo'lishi mumkin"
+        deganlar bitta so'rov bilan tekshiriladi. Xatolikda - bo'sh ro'yxat
+        (dublikat yuborgandan ko'ra yubormagan afzal).
+        """
+        if not vacancy_ids:
+            return []
+        try:
+            from bloom import sent_filter
+            maybe_sent = [v for v in vacancy_ids if sent_filter.might_contain(user_id, v)]
+            if not maybe_sent:
+                return list(vacancy_ids)
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT vacancy_id FROM sent_vacancies WHERE user_id = $1 AND vacancy_id = ANY($2::bigint[])',
+                    user_id, maybe_sent
+                )
+            sent = {row['vacancy_id'] for row in rows}
+            return [v for v in vacancy_ids if v not in sent]
+        except Exception as e:
+            logger.error(f"❌ filter_unsent xatolik: {e}")
+            return []
+    
+    # ========== SMART RECOMMENDATIONS ==========
+    
+    async def get_recommendations(self, user_id: int, since: datetime, built_after: datetime,
+                                  limit: int = 10) -> Optional[List[Dict]]:
+        """Saqlangan top tavsiyalar (vakansiya + match_score) - bitta indeksli so'rov
+
+        Bo'sh ro'yxat - user uchun hisoblanmagan yoki built_after dan eski
+        (qayta hisoblash kerak). Xatolikda None.
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT v.*, r.score AS match_score
+                    FROM recommendation_users s
+                    JOIN user_recommendations r ON r.user_id = s.user_id
+                    JOIN vacancies v ON v.id = r.vacancy_id AND v.published_date = r.published_date
+                    WHERE s.user_id = $1 AND s.built_at > $2 AND r.published_date > $3
+                    ORDER BY r.score DESC, r.relevance DESC, r.published_date DESC
+                    LIMIT $4
+                ''', user_id, built_after, since, limit)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ get_recommendations xatolik: {e}")
+            return None
+    
+    async def get_match_candidates(self, since: datetime, vacancy_ids: Optional[List[int]] = None,
+                                   limit: int = 2000) -> List[Dict]:
+        """calculate_match_score va qidiruv indeksi uchun vakansiyalar (eng yangilari), vacancy_ids berilsa - faqat ular"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT id, COALESCE(title, '') AS title, COALESCE(description, '') AS description,
+                           company, COALESCE(location, '') AS location, salary_min, salary_max,
+                           experience_level, published_date
+                    FROM vacancies
+                    WHERE published_date > $1
+                      AND ($2::bigint[] IS NULL OR id = ANY($2::bigint[]))
+                    ORDER BY published_date DESC
+                    LIMIT $3
+                ''', since, vacancy_ids, limit)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ get_match_candidates xatolik: {e}")
+            return []
+    
+    async def get_recommendation_users(self) -> List[Dict]:
+        """Tavsiyalari saqlangan premium userlar: filtr + hozir saqlangan soni va eng past score"""
+        try:
+            from config import ADMIN_IDS
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT f.*, t.kept, t.min_score
+                    FROM recommendation_users s
+                    JOIN users u ON u.user_id = s.user_id
+                    JOIN user_filters f ON f.user_id = s.user_id
+                    CROSS JOIN LATERAL (
+                        SELECT COUNT(*) AS kept, MIN(score) AS min_score
+                        FROM user_recommendations r WHERE r.user_id = s.user_id
+                    ) t
+                    WHERE u.is_active = TRUE
+                      AND (u.premium_until > NOW() OR u.user_id = ANY($1::bigint[]))
+                ''', list(ADMIN_IDS))
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ get_recommendation_users xatolik: {e}")
+            return []
+    
+    async def save_recommendations(self, user_id: int, built_at: datetime,
+                                   items: List[Tuple[int, int, float, datetime]]) -> bool:
+        """User tavsiyalarini to'liq almashtirish: [(vacancies.id, score, relevance, published_date)]"""
+        try:
+            vacancy_ids, scores, relevances, dates = (
+                (list(column) for column in zip(*items)) if items else ([], [], [], [])
+            )
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('''
+                        INSERT INTO recommendation_users (user_id, built_at) VALUES ($1, $2)
+                        ON CONFLICT (user_id) DO UPDATE SET built_at = EXCLUDED.built_at
+                    ''', user_id, built_at)
+                    await conn.execute('DELETE FROM user_recommendations WHERE user_id = $1', user_id)
+                    await conn.execute('''
+                        INSERT INTO user_recommendations (user_id, vacancy_id, score, relevance, published_date)
+                        SELECT $1, * FROM unnest($2::bigint[], $3::smallint[], $4::real[], $5::timestamptz[])
+                    ''', user_id, vacancy_ids, scores, relevances, dates)
+                return True
+        except Exception as e:
+            logger.error(f"❌ save_recommendations xatolik: {e}")
+            return False
+    
+    async def add_recommendations(self, items: List[Tuple[int, int, int, float, datetime]],
+                                  top_k: int, since: datetime) -> bool:
+        """Yangi vakansiyalar tavsiyalari: [(user_id, vacancies.id, score, relevance, published_date)]
+
+        Qo'shilgandan keyin shu userlarda top_k dan ortig'i va since dan
+        eskilari o'chiriladi - bitta tranzaksiyada.
+        """
+        if not items:
+            return True
+        try:
+            user_ids, vacancy_ids, scores, relevances, dates = (list(column) for column in zip(*items))
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    # Tavsiyalari shu orada o'chirilgan (filtr o'zgargan) userlar tashlab ketiladi
+                    await conn.execute('''
+                        INSERT INTO user_recommendations (user_id, vacancy_id, score, relevance, published_date)
+                        SELECT n.* FROM unnest($1::bigint[], $2::bigint[], $3::smallint[], $4::real[], $5::timestamptz[])
+                             AS n(user_id, vacancy_id, score, relevance, published_date)
+                        WHERE EXISTS (SELECT 1 FROM recommendation_users s WHERE s.user_id = n.user_id)
+                        ON CONFLICT (user_id, vacancy_id) DO UPDATE
+                        SET score = EXCLUDED.score, relevance = EXCLUDED.relevance
+                    ''', user_ids, vacancy_ids, scores, relevances, dates)
+                    await conn.execute('''
+                        DELETE FROM user_recommendations
+                        WHERE user_id = ANY($1::bigint[])
+                          AND (published_date <= $3 OR (user_id, vacancy_id) IN (
+                              SELECT user_id, vacancy_id FROM (
+                                  SELECT user_id, vacancy_id,
+                                         ROW_NUMBER() OVER (PARTITION BY user_id
+                                                            ORDER BY score DESC, relevance DESC,
+                                                                     published_date DESC) AS rank
+                                  FROM user_recommendations
+                                  WHERE user_id = ANY($1::bigint[]) AND published_date > $3
+                              ) ranked
+                              WHERE rank > $2
+                          ))
+                    ''', list(set(user_ids)), top_k, since)
+                return True
+        except Exception as e:
+            logger.error(f"❌ add_recommendations xatolik: {e}")
             return False
     
     async def remove_premium(self, user_id: int) -> bool:
@@ -559,72 +1324,350 @@ class Database:
                     SET premium_until = NULL, updated_at = $2
                     WHERE user_id = $1
                 ''', user_id, now)
+                from premium_index import premium_index
+                premium_index.set(user_id, None)
                 
                 return True
         except Exception as e:
             logger.error(f"❌ remove_premium: {e}")
             return False
 
-    async def get_users_for_digest(self) -> List[Dict]:
-        """Xulosa yuborilishi kerak bo'lgan userlarni olish (Uzbekistan vaqti bilan)"""
+    async def get_digests(self, after: dt_time, upto: dt_time, limit: int = 5) -> Optional[List[Dict]]:
+        """Bitta slot userlari uchun xulosa - bitta so'rov (Uzbekistan vaqti bilan)
+
+        Slot - digest_time (after, upto] oralig'idagi userlar (after >= upto
+        bo'lsa yarim tun orqali o'tadi). Oxirgi 24 soat vakansiyalari bir marta
+        olinadi (idx_vacancies_published), har bir user uchun kalit so'zlar
+        bo'yicha top-N LATERAL join bilan tanlanadi.
+        [{'user_id', 'vacancies': [...]}] - faqat mosi borlar; baza xatoligida None.
+        """
         try:
             from datetime import timedelta
             now_utc = datetime.now(timezone.utc)
             # Uzbekistan vaqti (UTC+5)
             uz_now = now_utc + timedelta(hours=5)
-            today = uz_now.date()
-            current_time = uz_now.time()
             
             async with self.pool.acquire() as conn:
-                # 1. Digest yoqilgan, bugun hali yuborilmagan va vaqti kelgan userlar
-                return await conn.fetch('''
-                    SELECT ns.user_id, ns.digest_time, u.premium_until
-                    FROM notification_settings ns
-                    JOIN users u ON ns.user_id = u.user_id
-                    WHERE ns.daily_digest = TRUE 
-                      AND (ns.last_digest_sent IS NULL OR ns.last_digest_sent::DATE < $1)
-                      AND ns.digest_time <= $2::TIME
-                ''', today, current_time)
-        except Exception as e:
-            logger.error(f"get_users_for_digest error: {e}")
-            return []
+                rows = await conn.fetch('''
+                    WITH due AS (
+                        SELECT ns.user_id,
+                               ARRAY(SELECT '%' || k || '%' FROM unnest(uf.keywords) k) AS patterns
+                        FROM notification_settings ns
+                        JOIN users u ON u.user_id = ns.user_id
+                        JOIN user_filters uf ON uf.user_id = ns.user_id
+                        WHERE ns.daily_digest = TRUE
+                          AND u.is_active = TRUE
+                          AND (ns.last_digest_sent IS NULL OR ns.last_digest_sent::DATE < $1)
+                          AND CASE WHEN $2::TIME < $3::TIME
+                                   THEN ns.digest_time > $2::TIME AND ns.digest_time <= $3::TIME
+                                   ELSE ns.digest_time > $2::TIME OR ns.digest_time <= $3::TIME
+                              END
+                          AND cardinality(uf.keywords) > 0
+                    ),
+                    recent AS MATERIALIZED (
+                        SELECT vacancy_id, title, company, description, published_date
+                        FROM vacancies
+                        WHERE published_date > NOW() - INTERVAL '24 hours'
+                    )
+                    SELECT d.user_id, m.vacancy_id, m.title, m.company
+                    FROM due d
+                    CROSS JOIN LATERAL (
+                        SELECT r.vacancy_id, r.title, r.company, r.published_date
+                        FROM recent r
+                        WHERE r.title ILIKE ANY(d.patterns) OR r.description ILIKE ANY(d.patterns)
+                        ORDER BY r.published_date DESC
+                        LIMIT $4
+                    ) m
+                    ORDER BY d.user_id, m.published_date DESC
+                ''', uz_now.date(), after, upto, limit)
+            
+            digests: Dict[int, List[Dict]] = {}
+            for row in rows:
+                digests.setdefault(row['user_id'], []).append({
+                    'vacancy_id': row['vacancy_id'],
+                    'title': row['title'],
+                    'company': row['company'],
+                })
+            return [{'user_id': user_id, 'vacancies': vacancies} for user_id, vacancies in digests.items()]
+        except Exception as e:
+            logger.error(f"get_digests error: {e}")
+            return None
 
-    async def update_last_digest_sent(self, user_id: int):
-        """Oxirgi xulosa vaqtini yangilash"""
+    async def mark_digests_sent(self, user_ids: List[int]):
+        """Oxirgi xulosa vaqtini yangilash - bitta so'rov"""
+        if not user_ids:
+            return
         try:
             async with self.pool.acquire() as conn:
                 await conn.execute('''
                     UPDATE notification_settings 
                     SET last_digest_sent = NOW() 
-                    WHERE user_id = $1
-                ''', user_id)
+                    WHERE user_id = ANY($1::bigint[])
+                ''', user_ids)
         except Exception as e:
-            logger.error(f"update_last_digest_sent error: {e}")
+            logger.error(f"mark_digests_sent error: {e}")
 
-    async def get_recent_vacancies_for_user(self, user_id: int, limit: int = 10) -> List[Dict]:
-        """User uchun oxirgi mos vakansiyalarni olish (Digest uchun)"""
+    # ========== ADMIN STATISTICS ==========
+
+    async def get_admin_stats(self) -> Dict:
+        """Admin statistikasi - bitta aggregate so'rov (userlar soniga bog'liq emas)"""
+        empty = {
+            'total': 0, 'premium': 0, 'free': 0, 'new_today': 0, 'active_24h': 0,
+            'with_filters': 0, 'seekers': 0, 'employers': 0, 'vacancies_today': 0
+        }
+        try:
+            from config import ADMIN_IDS
+            now = datetime.now(timezone.utc)
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    SELECT
+                        COUNT(*) as total,
+                        COUNT(*) FILTER (WHERE u.premium_until > $1 OR u.user_id = ANY($3::bigint[])) as premium,
+                        COUNT(*) FILTER (WHERE u.created_at >= $2) as new_today,
+                        COUNT(*) FILTER (WHERE u.updated_at >= $1 - INTERVAL '24 hours') as active_24h,
+                        COUNT(f.user_id) as with_filters,
+                        COUNT(*) FILTER (WHERE u.role = 'employer') as employers,
+                        -- published_date: partition pruning + idx_vacancies_published (created_at indekssiz)
+                        (SELECT COUNT(*) FROM vacancies WHERE published_date >= $2) as vacancies_today
+                    FROM users u
+                    LEFT JOIN user_filters f ON f.user_id = u.user_id
+                    WHERE u.is_active = TRUE
+                ''', now, today, list(ADMIN_IDS))
+
+            stats = dict(row)
+            stats['free'] = stats['total'] - stats['premium']
+            stats['seekers'] = stats['total'] - stats['employers']
+            return stats
+        except Exception as e:
+            logger.error(f"❌ get_admin_stats xatolik: {e}")
+            return empty
+
+    async def get_users_page(self, cursor: Optional[Tuple[datetime, int]] = None,
+                             backward: bool = False, limit: int = 10) -> Tuple[List[Dict], bool]:
+        """Aktiv userlar (created_at DESC) - keyset sahifa va shu yo'nalishda yana bormi"""
+        try:
+            if cursor is None:
+                condition, args = '', []
+            elif backward:
+                condition, args = 'AND (created_at, user_id) > ($2, $3)', list(cursor)
+            else:
+                condition, args = 'AND (created_at, user_id) < ($2, $3)', list(cursor)
+            order = 'ASC' if backward else 'DESC'
+
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(f'''
+                    SELECT user_id, username, first_name, created_at,
+                           (premium_until > NOW()) as is_premium_active
+                    FROM users
+                    WHERE is_active = TRUE {condition}
+                    ORDER BY created_at {order}, user_id {order}
+                    LIMIT $1
+                ''', limit + 1, *args)
+
+            rows = [dict(row) for row in rows]
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if backward:
+                rows.reverse()
+            return rows, has_more
+        except Exception as e:
+            logger.error(f"❌ get_users_page xatolik: {e}")
+            return [], False
+
+    async def get_premium_users_page(self, cursor: Optional[Tuple[datetime, int]] = None,
+                                     backward: bool = False, limit: int = 10) -> Tuple[List[Dict], bool]:
+        """Aktiv premium userlar (eng tez tugaydigani birinchi) - keyset sahifa"""
+        try:
+            if cursor is None:
+                condition, args = '', []
+            elif backward:
+                condition, args = 'AND (premium_until, user_id) < ($2, $3)', list(cursor)
+            else:
+                condition, args = 'AND (premium_until, user_id) > ($2, $3)', list(cursor)
+            order = 'DESC' if backward else 'ASC'
+
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(f'''
+                    SELECT user_id, username, first_name, premium_until
+                    FROM users
+                    WHERE is_active = TRUE AND premium_until > NOW() {condition}
+                    ORDER BY premium_until {order}, user_id {order}
+                    LIMIT $1
+                ''', limit + 1, *args)
+
+            rows = [dict(row) for row in rows]
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if backward:
+                rows.reverse()
+            return rows, has_more
+        except Exception as e:
+            logger.error(f"❌ get_premium_users_page xatolik: {e}")
+            return [], False
+
+    # ========== BROADCAST ==========
+
+    async def create_broadcast_job(self, admin_id: int, text: str, owner: str,
+                                   chat_id: int = None, message_id: int = None) -> Optional[int]:
+        """Yangi broadcast job (jami qabul qiluvchilar soni shu paytdagi aktiv userlar)"""
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval('''
+                    INSERT INTO broadcast_jobs (admin_id, text, total, progress_chat_id, progress_message_id, owner)
+                    SELECT $1, $2, COUNT(*), $3, $4, $5 FROM users WHERE is_active = TRUE
+                    RETURNING id
+                ''', admin_id, text, chat_id, message_id, owner)
+        except Exception as e:
+            logger.error(f"❌ create_broadcast_job xatolik: {e}")
+            return None
+
+    async def get_broadcast_job(self, job_id: int) -> Optional[Dict]:
+        try:
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow('SELECT * FROM broadcast_jobs WHERE id = $1', job_id)
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"❌ get_broadcast_job xatolik: {e}")
+            return None
+
+    async def set_broadcast_status(self, job_id: int, status: str, from_statuses: List[str]) -> bool:
+        """Holatni faqat ruxsat etilgan holatdan o'zgartirish (replikalar o'rtasida atomik)"""
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.execute('''
+                    UPDATE broadcast_jobs
+                    SET status = $2,
+                        heartbeat_at = NOW(),
+                        finished_at = CASE WHEN $2 IN ('done', 'cancelled') THEN NOW() ELSE finished_at END
+                    WHERE id = $1 AND status = ANY($3::text[])
+                ''', job_id, status, from_statuses)
+                return result == 'UPDATE 1'
+        except Exception as e:
+            logger.error(f"❌ set_broadcast_status xatolik: {e}")
+            return False
+
+    async def touch_broadcast_job(self, job_id: int, owner: str) -> Optional[str]:
+        """Heartbeat yangilash va joriy holatni qaytarish; job boshqa jarayonniki bo'lsa - None"""
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval('''
+                    UPDATE broadcast_jobs SET heartbeat_at = NOW()
+                    WHERE id = $1 AND owner = $2
+                    RETURNING status
+                ''', job_id, owner)
+        except Exception as e:
+            logger.error(f"❌ touch_broadcast_job xatolik: {e}")
+            return None
+
+    async def release_broadcast_job(self, job_id: int, owner: str) -> bool:
+        """Pauza/bekor qilingan jobdan chiqish; shu orada davom ettirilgan bo'lsa - False (worker davom etadi)"""
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.execute('''
+                    UPDATE broadcast_jobs SET owner = NULL
+                    WHERE id = $1 AND owner = $2 AND status <> 'running'
+                ''', job_id, owner)
+                return result == 'UPDATE 1'
+        except Exception as e:
+            logger.error(f"❌ release_broadcast_job xatolik: {e}")
+            return True
+
+    async def resume_broadcast_job(self, job_id: int, owner: str, stale_seconds: int) -> Optional[str]:
+        """paused -> running; egasi yo'q yoki o'lgan bo'lsa job shu jarayonga o'tadi.
+
+        Joriy egasi (oxirgi bo'lagini tugatayotgan worker) tirik bo'lsa u
+        egaligicha qoladi va o'zi davom etadi - ikkinchi worker ochilmaydi.
+        Natija: job egasi yoki None (paused emas).
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval('''
+                    WITH claim AS (
+                        SELECT id, owner IS NULL OR heartbeat_at < NOW() - make_interval(secs => $3) AS free
+                        FROM broadcast_jobs WHERE id = $1 AND status = 'paused'
+                        FOR UPDATE
+                    )
+                    UPDATE broadcast_jobs j
+                    SET status = 'running',
+                        owner = CASE WHEN claim.free THEN $2 ELSE j.owner END,
+                        heartbeat_at = CASE WHEN claim.free THEN NOW() ELSE j.heartbeat_at END
+                    FROM claim WHERE j.id = claim.id
+                    RETURNING j.owner
+                ''', job_id, owner, stale_seconds)
+        except Exception as e:
+            logger.error(f"❌ resume_broadcast_job xatolik: {e}")
+            return None
+
+    async def claim_stale_broadcast_jobs(self, stale_seconds: int, owner: str) -> List[int]:
+        """Egasi o'lgan (heartbeat eskirgan) running joblarni shu jarayonga olish"""
         try:
-            user_filter = await self.get_user_filter(user_id)
-            if not user_filter or not user_filter.get('keywords'):
-                return []
-            
-            keywords = [f"%{k}%" for k in user_filter.get('keywords', [])]
-            if not keywords: return []
-            
             async with self.pool.acquire() as conn:
                 rows = await conn.fetch('''
-                    SELECT * FROM vacancies 
-                    WHERE (title ILIKE ANY($1) OR description ILIKE ANY($1))
-                      AND published_date > NOW() - INTERVAL '24 hours'
-                    ORDER BY published_date DESC
-                    LIMIT $2
-                ''', keywords, limit)
-                
-                return [dict(r) for r in rows]
+                    UPDATE broadcast_jobs SET heartbeat_at = NOW(), owner = $2
+                    WHERE status = 'running' AND heartbeat_at < NOW() - make_interval(secs => $1)
+                    RETURNING id
+                ''', stale_seconds, owner)
+                return [row['id'] for row in rows]
+        except Exception as e:
+            logger.error(f"❌ claim_stale_broadcast_jobs xatolik: {e}")
+            return []
+
+    async def get_broadcast_batch(self, job_id: int, cursor: int, limit: int) -> List[int]:
+        """Keyingi qabul qiluvchilar (natijasi yozilganlar o'tkazib yuboriladi)"""
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT u.user_id FROM users u
+                    WHERE u.is_active = TRUE AND u.user_id > $2
+                      AND NOT EXISTS (
+                          SELECT 1 FROM broadcast_recipients r
+                          WHERE r.job_id = $1 AND r.user_id = u.user_id
+                      )
+                    ORDER BY u.user_id
+                    LIMIT $3
+                ''', job_id, cursor, limit)
+                return [row['user_id'] for row in rows]
         except Exception as e:
-            logger.error(f"get_recent_vacancies_for_user error: {e}")
+            logger.error(f"❌ get_broadcast_batch xatolik: {e}")
             return []
 
+    async def save_broadcast_batch(self, job_id: int, owner: str, cursor: int,
+                                   results: List[Tuple[int, str, Optional[str]]]) -> Optional[Dict]:
+        """Natijalar, hisoblagichlar va cursor - bitta so'rovda.
+
+        Natijalar har doim yoziladi (xabarlar haqiqatan yuborilgan - yangi egasi
+        ularni qayta yubormasin), hisoblagichlar faqat yangi yozilganlar bo'yicha.
+        Cursor va heartbeat esa faqat job hali shu jarayonniki bo'lsa yangilanadi.
+        """
+        try:
+            user_ids = [user_id for user_id, _, _ in results]
+            statuses = [status for _, status, _ in results]
+            errors = [error for _, _, error in results]
+
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    WITH inserted AS (
+                        INSERT INTO broadcast_recipients (job_id, user_id, status, error)
+                        SELECT $1, * FROM unnest($3::bigint[], $4::text[], $5::text[])
+                        ON CONFLICT (job_id, user_id) DO NOTHING
+                        RETURNING status
+                    )
+                    UPDATE broadcast_jobs
+                    SET sent = sent + (SELECT COUNT(*) FROM inserted WHERE status = 'sent'),
+                        blocked = blocked + (SELECT COUNT(*) FROM inserted WHERE status = 'blocked'),
+                        failed = failed + (SELECT COUNT(*) FROM inserted WHERE status = 'failed'),
+                        last_user_id = CASE WHEN owner = $2 THEN GREATEST(last_user_id, $6) ELSE last_user_id END,
+                        heartbeat_at = CASE WHEN owner = $2 THEN NOW() ELSE heartbeat_at END
+                    WHERE id = $1
+                    RETURNING *
+                ''', job_id, owner, user_ids, statuses, errors, cursor)
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"❌ save_broadcast_batch xatolik: {e}")
+            return None
+
     async def get_referral_stats(self, user_id: int) -> Dict:
         """Referral statistikasi"""
         try:
@@ -0,0 +1,120 @@
+"""
+Postgres LISTEN/NOTIFY - replikalar o'rtasida xotiradagi indeks/cache larni yangilash
+
+Bitta alohida ulanish (pool dan emas - LISTEN sessiyaga bog'liq) barcha
+kanallarni tinglaydi. Ulanish har check_interval da SELECT 1 bilan
+tekshiriladi (NAT/idle timeout da jimgina uzilgan ulanish yopilmagan
+ko'rinadi). Ulanish uzilsa, shu orada kelgan NOTIFY lar yo'qoladi:
+qayta ulangandan keyin on_reconnect handlerlari chaqiriladi (to'liq qayta
+yuklash yoki cache tozalash uchun).
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+class DbEventListener:
+    """Kanal -> payload handlerlar, uzilishda qayta ulanish"""
+
+    def __init__(self, check_interval: int = 10):
+        self.check_interval = check_interval
+        self._handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self._reconnect_handlers: List[Callable[[], Awaitable[None]]] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def subscribe(self, channel: str, handler: Callable[[str], None]):
+        """handler(payload) - sinxron, event loop ichida chaqiriladi"""
+        first = channel not in self._handlers
+        self._handlers[channel].append(handler)
+        if first and self.connected:
+            await self._conn.add_listener(channel, self._dispatch)
+
+    def on_reconnect(self, handler: Callable[[], Awaitable[None]]):
+        self._reconnect_handlers.append(handler)
+
+    async def start(self):
+        """Ulanish va kuzatuvni boshlash (qayta chaqirilsa - hech narsa qilmaydi)"""
+        if self._task is not None:
+            return
+        await self._connect()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._drop_connection()
+
+    async def _alive(self) -> bool:
+        """Ulanish haqiqatan javob beradimi (SELECT 1, check_interval timeout bilan)"""
+        if not self.connected:
+            return False
+        try:
+            await asyncio.wait_for(self._conn.fetchval('SELECT 1'), timeout=self.check_interval)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ LISTEN ulanishi javob bermadi, qayta ulanilmoqda: {e!r}")
+            return False
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if await self._alive():
+                continue
+            await self._drop_connection()
+            await self._connect()
+            if self.connected:
+                logger.info("🔌 LISTEN ulanishi tiklandi")
+                for handler in self._reconnect_handlers:
+                    try:
+                        await handler()
+                    except Exception as e:
+                        logger.error(f"❌ on_reconnect handler xatolik: {e}")
+
+    async def _connect(self):
+        try:
+            from config import DATABASE_URL
+            self._conn = await asyncpg.connect(
+                DATABASE_URL,
+                timeout=10,
+                server_settings={'application_name': 'vacancybot-listen'}
+            )
+            for channel in self._handlers:
+                await self._conn.add_listener(channel, self._dispatch)
+        except Exception as e:
+            logger.warning(f"LISTEN ulanmadi: {e}")
+            await self._drop_connection()
+
+    def _dispatch(self, connection, pid, channel, payload):
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"❌ NOTIFY handler xatolik ({channel}: {payload}): {e}")
+
+    async def _drop_connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.terminate()
+            except Exception:
+                pass
+            self._conn = None
+
+
+# Global listener
+db_events = DbEventListener()
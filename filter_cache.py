@@ -0,0 +1,110 @@
+"""
+User filtrlari uchun write-through LRU cache
+
+get_user_filter har scraping siklida har bir user uchun chaqiriladi. Cache
+user_filters qatorini (yoki "filtr yo'q" ni) saqlaydi, premium bo'yicha
+manbalar esa har o'qishda qo'llanadi - premium o'zgarsa cache eskirmaydi.
+save_user_filter / delete_user_filter cache ni darhol yangilaydi, boshqa
+replikalar user_filter_changed NOTIFY orqali yozuvni o'chiradi. LISTEN
+ulanishi yo'q bo'lsa cache ishlatilmaydi (eskirgan filtr qaytmasligi uchun).
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from config import FILTER_CACHE_ENABLED, FILTER_CACHE_SIZE
+from db_events import db_events
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'user_filter_changed'
+
+_MISS = (False, None)
+
+
+def _copy(row: Optional[Dict]) -> Optional[Dict]:
+    """Chaqiruvchilar ro'yxatlarni o'zgartiradi (sources.append) - cache dagi nusxa buzilmasin"""
+    if row is None:
+        return None
+    return {k: list(v) if isinstance(v, (list, tuple)) else v for k, v in row.items()}
+
+
+class FilterCache:
+    """user_id -> user_filters qatori (None - filtr yo'q)"""
+
+    def __init__(self, enabled: bool = True, size: int = 50000):
+        self.enabled = enabled
+        self.size = size
+        self._cache: "OrderedDict[int, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._subscribed = False
+        self._invalidations = 0  # o'qish paytida kelgan NOTIFY ni aniqlash uchun
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self._subscribed and db_events.connected
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[Dict]]:
+        """(topildi, qator nusxasi)"""
+        if not self.active or user_id not in self._cache:
+            self.misses += 1
+            return _MISS
+        self._cache.move_to_end(user_id)
+        self.hits += 1
+        return True, _copy(self._cache[user_id])
+
+    def token(self) -> int:
+        """Bazadan o'qishdan oldin olinadi va put() ga beriladi"""
+        return self._invalidations
+
+    def put(self, user_id: int, row: Optional[Dict], token: Optional[int] = None):
+        """token berilgan bo'lsa va o'qish paytida invalidatsiya bo'lgan bo'lsa - yozilmaydi"""
+        if not self.active or (token is not None and token != self._invalidations):
+            return
+        self._cache[user_id] = _copy(row)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._invalidations += 1
+        self._cache.pop(user_id, None)
+
+    def clear(self):
+        self._invalidations += 1
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    async def start(self):
+        if not self.enabled:
+            return
+        await db_events.subscribe(CHANNEL, self._on_notify)
+        db_events.on_reconnect(self._on_reconnect)
+        await db_events.start()
+        self._subscribed = True
+        logger.info(f"🗂 Filter cache yoqildi (size={self.size})")
+
+    async def _on_reconnect(self):
+        # Uzilish paytidagi o'zgarishlar noma'lum
+        self.clear()
+
+    def _on_notify(self, payload: str):
+        """Payload: '<user_id>:<updated_at epoch yoki bo'sh (o'chirilgan)>'"""
+        user_id, _, epoch = payload.partition(':')
+        user_id = int(user_id)
+        cached = self._cache.get(user_id)
+        # O'zimiz yozgan (write-through) qator - o'chirish shart emas
+        if epoch and cached and isinstance(cached.get('updated_at'), datetime) \
+                and abs(cached['updated_at'].timestamp() - float(epoch)) < 1e-5:
+            return
+        if not epoch and user_id in self._cache and cached is None:
+            return
+        self.invalidate(user_id)
+
+
+filter_cache = FilterCache(enabled=FILTER_CACHE_ENABLED, size=FILTER_CACHE_SIZE)
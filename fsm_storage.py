@@ -0,0 +1,143 @@
+"""
+Postgres asosidagi FSM storage
+
+MemoryStorage o'rniga ishlatiladi: sozlamalar, vakansiya/rezyume qo'shish
+jarayonlari bot qayta ishga tushganda yo'qolmaydi va bir nechta bot
+jarayoni bitta bazadan foydalana oladi.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresStorage(BaseStorage):
+    """FSM holatlarini fsm_storage jadvalida saqlash (ixtiyoriy read-cache bilan)"""
+
+    def __init__(self, database, key_builder: KeyBuilder = None,
+                 cache_enabled: bool = False, cache_size: int = 10000):
+        # database.db - pool connect() dan keyin paydo bo'ladi, shuning uchun
+        # obyektni saqlaymiz va pool ni har safar undan olamiz
+        self.database = database
+        self.key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        self.cache_enabled = cache_enabled
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Optional[str], Dict[str, Any]]]" = OrderedDict()
+
+    # ========== CACHE ==========
+
+    def _cache_get(self, key: str):
+        if not self.cache_enabled:
+            return None
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+        return record
+
+    def _cache_put(self, key: str, state: Optional[str], data: Dict[str, Any]):
+        if not self.cache_enabled:
+            return
+        self._cache[key] = (state, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Yozuvni cache yoki bazadan olish"""
+        record = self._cache_get(key)
+        if record is not None:
+            return record
+
+        row = await self.database.pool.fetchrow(
+            'SELECT state, data FROM fsm_storage WHERE key = $1',
+            key
+        )
+        if row:
+            record = (row['state'], json.loads(row['data']) if row['data'] else {})
+        else:
+            record = (None, {})
+
+        self._cache_put(key, *record)
+        return record
+
+    # ========== BaseStorage ==========
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        """Holatni saqlash (upsert)"""
+        storage_key = self.key_builder.build(key)
+        state_value = state.state if isinstance(state, State) else state
+
+        row = await self.database.pool.fetchrow('''
+            INSERT INTO fsm_storage (key, state, updated_at)
+            VALUES ($1, $2, NOW())
+            ON CONFLICT (key) DO UPDATE
+            SET state = EXCLUDED.state,
+                updated_at = EXCLUDED.updated_at
+            RETURNING data
+        ''', storage_key, state_value)
+
+        if self.cache_enabled:
+            data = json.loads(row['data']) if row and row['data'] else {}
+            self._cache_put(storage_key, state_value, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._load(self.key_builder.build(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        """Ma'lumotlarni saqlash (upsert)"""
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(
+                f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            )
+
+        storage_key = self.key_builder.build(key)
+        row = await self.database.pool.fetchrow('''
+            INSERT INTO fsm_storage (key, data, updated_at)
+            VALUES ($1, $2::jsonb, NOW())
+            ON CONFLICT (key) DO UPDATE
+            SET data = EXCLUDED.data,
+                updated_at = EXCLUDED.updated_at
+            RETURNING state
+        ''', storage_key, json.dumps(data, default=str))
+
+        if self.cache_enabled:
+            self._cache_put(storage_key, row['state'] if row else None, data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._load(self.key_builder.build(key))
+        return data.copy()
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    # ========== TOZALASH ==========
+
+    async def cleanup(self, ttl_seconds: int) -> int:
+        """Tashlab ketilgan (eskirgan) va bo'sh holatlarni o'chirish"""
+        try:
+            threshold = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+            result = await self.database.pool.execute('''
+                DELETE FROM fsm_storage
+                WHERE updated_at < $1
+                   OR (state IS NULL AND data = '{}'::jsonb)
+            ''', threshold)
+            deleted = int(result.split()[-1]) if result else 0
+
+            # Cache ni ham tozalash (o'chirilgan yozuvlar qayta o'qiladi)
+            self._cache.clear()
+
+            if deleted:
+                logger.info(f"🧹 FSM storage: {deleted} ta eskirgan holat o'chirildi")
+            return deleted
+        except Exception as e:
+            logger.error(f"FSM storage cleanup xatolik: {e}")
+            return 0
@@ -27,6 +27,46 @@ def is_admin(user_id: int) -> bool:
     return user_id in ADMIN_IDS
 
 
+# ========== KEYSET PAGINATION ==========
+
+ADMIN_PAGE_SIZE = 10
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(prefix: str, direction: str, moment: datetime, user_id: int) -> str:
+    """callback_data: '<prefix>:<n|p>:<mikrosekund>:<user_id>' (64 baytdan kam)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return f"{prefix}:{direction}:{(moment - _EPOCH) // timedelta(microseconds=1)}:{user_id}"
+
+
+def decode_cursor(data: str):
+    """(backward, (datetime, user_id)) yoki birinchi sahifa uchun (False, None)"""
+    parts = data.split(':')
+    if len(parts) != 4:
+        return False, None
+    _, direction, micros, user_id = parts
+    return direction == 'p', (_EPOCH + timedelta(microseconds=int(micros)), int(user_id))
+
+
+def pagination_row(prefix: str, rows: list, key: str, backward: bool, cursor, has_more: bool):
+    """Oldingi/keyingi tugmalari (sahifadagi birinchi/oxirgi qator kaliti bo'yicha)"""
+    has_prev = has_more if backward else cursor is not None
+    has_next = True if backward else has_more
+    buttons = []
+    if rows and has_prev:
+        first = rows[0]
+        buttons.append(InlineKeyboardButton(
+            text="⬅️ Oldingi", callback_data=encode_cursor(prefix, 'p', first[key], first['user_id'])
+        ))
+    if rows and has_next:
+        last = rows[-1]
+        buttons.append(InlineKeyboardButton(
+            text="Keyingi ➡️", callback_data=encode_cursor(prefix, 'n', last[key], last['user_id'])
+        ))
+    return buttons
+
+
 def get_admin_keyboard():
     """Admin panel klaviaturasi"""
     return InlineKeyboardMarkup(
@@ -124,32 +164,27 @@ async def admin_stats(callback: CallbackQuery):
         return
     
     try:
-        all_users = await db.get_all_active_users()
-        total_users = len(all_users)
-        
-        premium_count = 0
-        for user_id in all_users:
-            if await db.is_premium(user_id):
-                premium_count += 1
-        
-        free_count = total_users - premium_count
-        
-        # Bugungi yangi userlar
-        new_users_today = 0
-        today = datetime.now(timezone.utc).date()
-        for user_id in all_users:
-            user = await db.get_user(user_id)
-            if user and user.get('created_at') and user['created_at'].date() == today:
-                new_users_today += 1
+        stats = await db.get_admin_stats()
+        total_users = stats['total']
+        premium_count = stats['premium']
         
         text = f"""
 📊 <b>Bot Statistikasi</b>
 
 👥 <b>Foydalanuvchilar:</b>
 • Jami: {total_users}
-• 📅 Bugun yangi: +{new_users_today}
+• 📅 Bugun yangi: +{stats['new_today']}
+• 🟢 Oxirgi 24 soatda faol: {stats['active_24h']}
 • 💎 Premium: {premium_count}
-• 🆓 Free: {free_count}
+• 🆓 Free: {stats['free']}
+
+👔 <b>Rollar:</b>
+• 🔍 Ish qidiruvchi: {stats['seekers']}
+• 💼 Ish beruvchi: {stats['employers']}
+• ⚙️ Filtr sozlagan: {stats['with_filters']}
+
+📋 <b>Vakansiyalar:</b>
+• 📅 Bugun qo'shilgan: {stats['vacancies_today']}
 
 📈 <b>Konversiya:</b>
 • Premium %: {(premium_count/total_users*100) if total_users > 0 else 0:.1f}%
@@ -176,21 +211,21 @@ async def admin_stats(callback: CallbackQuery):
 
 
 @router.callback_query(F.data == "admin_users")
+@router.callback_query(F.data.startswith("admin_users:"))
 async def admin_users(callback: CallbackQuery):
-    """Foydalanuvchilar ro'yxati"""
+    """Foydalanuvchilar ro'yxati (yangilari birinchi, keyset sahifalar)"""
     if not is_admin(callback.from_user.id):
         await callback.answer("⛔️ Admin emas!", show_alert=True)
         return
     
     try:
-        all_users = await db.get_all_active_users()
+        backward, cursor = decode_cursor(callback.data)
+        users, has_more = await db.get_users_page(cursor, backward, ADMIN_PAGE_SIZE)
         
         recent_users = []
-        for user_id in all_users[-10:]:
-            user = await db.get_user(user_id)
-            if not user:
-                continue
-            is_premium = await db.is_premium(user_id)
+        for user in users:
+            user_id = user['user_id']
+            is_premium = user['is_premium_active'] or user_id in ADMIN_IDS
             
             username = user.get('username', 'N/A')
             first_name = user.get('first_name', 'N/A')
@@ -201,18 +236,18 @@ async def admin_users(callback: CallbackQuery):
         text = f"""
 👥 <b>Foydalanuvchilar</b>
 
-📋 <b>Jami:</b> {len(all_users)} ta
-
-<b>So'nggi 10 ta:</b>
-{''.join(recent_users)}
+<b>Yangilari birinchi:</b>
+{''.join(recent_users) or "Foydalanuvchilar yo'q"}
 
 💡 Aniq foydalanuvchini qidirish uchun "🔍 Qidirish" tugmasini bosing.
 """
         
+        navigation = pagination_row('admin_users', users, 'created_at', backward, cursor, has_more)
         await callback.message.edit_text(
             text,
             reply_markup=InlineKeyboardMarkup(
                 inline_keyboard=[
+                    *([navigation] if navigation else []),
                     [InlineKeyboardButton(text="🔍 Qidirish", callback_data="admin_find_user")],
                     [InlineKeyboardButton(text="🔙 Orqaga", callback_data="admin_panel")]
                 ]
@@ -579,53 +614,45 @@ async def process_revoke_premium(message: Message, state: FSMContext):
 
 
 @router.callback_query(F.data == "admin_premium_list")
+@router.callback_query(F.data.startswith("admin_premium_list:"))
 async def admin_premium_list(callback: CallbackQuery):
-    """Premium foydalanuvchilar ro'yxati"""
+    """Premium foydalanuvchilar ro'yxati (eng tez tugaydigani birinchi, keyset sahifalar)"""
     if not is_admin(callback.from_user.id):
         await callback.answer("⛔️ Admin emas!", show_alert=True)
         return
     
     try:
-        all_users = await db.get_all_active_users()
+        backward, cursor = decode_cursor(callback.data)
+        users, has_more = await db.get_premium_users_page(cursor, backward, ADMIN_PAGE_SIZE)
         premium_users = []
         
-        for user_id in all_users:
-            if await db.is_premium(user_id):
-                user = await db.get_user(user_id)
-                if not user:
-                    continue
-                    
-                username = user.get('username', 'N/A')
-                first_name = user.get('first_name', 'N/A')
-                premium_until = user.get('premium_until')
-                
-                if premium_until:
-                    date_str = premium_until.strftime('%d.%m.%Y')
-                else:
-                    date_str = "Abadiy"
-                
-                premium_users.append(
-                    f"\n💎 {first_name} (@{username})"
-                    f"\n   ID: {user_id}"
-                    f"\n   Tugash: {date_str}"
-                )
+        for user in users:
+            username = user.get('username', 'N/A')
+            first_name = user.get('first_name', 'N/A')
+            date_str = user['premium_until'].strftime('%d.%m.%Y')
+            
+            premium_users.append(
+                f"\n💎 {first_name} (@{username})"
+                f"\n   ID: {user['user_id']}"
+                f"\n   Tugash: {date_str}"
+            )
         
         if premium_users:
             text = f"""
 📋 <b>Premium Foydalanuvchilar</b>
 
-Jami: {len(premium_users)} ta
-{''.join(premium_users[:10])}
+<b>Tugash sanasi bo'yicha:</b>
+{''.join(premium_users)}
 """
-            if len(premium_users) > 10:
-                text += f"\n\n... va yana {len(premium_users) - 10} ta"
         else:
             text = "📋 <b>Premium foydalanuvchilar yo'q</b>"
         
+        navigation = pagination_row('admin_premium_list', users, 'premium_until', backward, cursor, has_more)
         await callback.message.edit_text(
             text,
             reply_markup=InlineKeyboardMarkup(
                 inline_keyboard=[
+                    *([navigation] if navigation else []),
                     [InlineKeyboardButton(text="🔙 Orqaga", callback_data="admin_premium")]
                 ]
             ),
@@ -695,35 +722,50 @@ async def confirm_broadcast(callback: CallbackQuery, state: FSMContext):
     
     data = await state.get_data()
     broadcast_text = data.get('broadcast_text')
+    await state.clear()
     
-    await callback.message.edit_text("📤 Xabar yuborilmoqda...")
-    
-    all_users = await db.get_all_active_users()
-    success = 0
-    failed = 0
-    
-    for user_id in all_users:
-        try:
-            await callback.bot.send_message(user_id, broadcast_text, parse_mode='HTML')
-            success += 1
-            await asyncio.sleep(0.05)
-        except Exception as e:
-            failed += 1
-            logger.debug(f"Broadcast xatolik {user_id}: {e}")
+    await callback.message.edit_text("📤 Broadcast boshlanmoqda...")
     
-    await callback.message.edit_text(
-        f"✅ <b>Broadcast yakunlandi!</b>\n\n"
-        f"📊 Statistika:\n"
-        f"• Yuborildi: {success}\n"
-        f"• Xatolik: {failed}\n"
-        f"• Jami: {len(all_users)}",
-        parse_mode='HTML'
+    # Fon workeri yuboradi va shu xabarni progress bilan yangilab turadi
+    from broadcast import broadcast_manager
+    job_id = await broadcast_manager.create(
+        callback.bot,
+        callback.from_user.id,
+        broadcast_text,
+        chat_id=callback.message.chat.id,
+        message_id=callback.message.message_id
     )
     
-    await state.clear()
+    if not job_id:
+        await callback.message.edit_text("❌ Broadcast yaratishda xatolik")
     await callback.answer()
 
 
+@router.callback_query(F.data.regexp(r'^broadcast_(pause|resume|stop):\d+$'))
+async def control_broadcast(callback: CallbackQuery):
+    """Broadcast ni pauza qilish / davom ettirish / to'xtatish"""
+    if not is_admin(callback.from_user.id):
+        await callback.answer("⛔️ Admin emas!", show_alert=True)
+        return
+    
+    from broadcast import broadcast_manager
+    action, job_id = callback.data.split(':')
+    job_id = int(job_id)
+    
+    if action == 'broadcast_pause':
+        ok = await broadcast_manager.pause(job_id)
+        notice = "⏸ Pauza qilindi" if ok else "Job ishlamayapti"
+    elif action == 'broadcast_resume':
+        ok = await broadcast_manager.resume(callback.bot, job_id)
+        notice = "▶️ Davom ettirilmoqda" if ok else "Job pauzada emas"
+    else:
+        ok = await broadcast_manager.cancel(job_id)
+        notice = "❌ To'xtatildi" if ok else "Job allaqachon tugagan"
+    
+    await broadcast_manager.report(callback.bot, job_id)
+    await callback.answer(notice)
+
+
 @router.callback_query(F.data == "broadcast_cancel")
 async def cancel_broadcast(callback: CallbackQuery, state: FSMContext):
     """Broadcast ni bekor qilish"""
@@ -757,14 +799,17 @@ async def search_user_by_id(message: Message):
     
     try:
         user_id = int(message.text.strip())
-        user = await db.get_user(user_id)
+        # User, premium va filtr - bitta so'rovda
+        from middlewares.user_context import load_user_context
+        context = await load_user_context(user_id)
+        user = context.user
         
         if not user:
             await message.answer(f"❌ Foydalanuvchi {user_id} topilmadi!")
             return
         
-        is_premium = await db.is_premium(user_id)
-        user_filter = await db.get_user_filter(user_id)
+        is_premium = context.is_premium
+        user_filter = context.filter
         
         username = user.get('username', 'N/A')
         first_name = user.get('first_name', 'N/A')
@@ -1,6 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from database import db
+from middlewares.user_context import LazyUserContext
 import logging
 
 logger = logging.getLogger(__name__)
@@ -48,17 +49,21 @@ def format_resume_message(resume: dict) -> str:
 """
 
 
-async def show_candidates(message: Message, user_id: int = None):
+async def show_candidates(message: Message, user_id: int = None, user_context: LazyUserContext = None):
     """Nomzodlarni ko'rsatish"""
     if user_id is None:
         user_id = message.from_user.id
     
     # Role check + Admin check
-    user_data = await db.get_user(user_id)
+    if user_context and user_context.user_id == user_id:
+        role = (await user_context.get()).role
+    else:
+        user_data = await db.get_user(user_id)
+        role = user_data.get('role') if user_data else None
     from config import ADMIN_IDS
     
     is_admin = user_id in ADMIN_IDS
-    if not is_admin and (not user_data or user_data.get('role') != 'employer'):
+    if not is_admin and role != 'employer':
         await message.answer("❌ Bu bo'lim faqat Ish beruvchilar uchun.")
         return
 
@@ -6,6 +6,8 @@ import logging
 logger = logging.getLogger(__name__)
 router = Router()
 
+FAVORITES_COUNT_SQL = 'SELECT COUNT(*) FROM favorites WHERE user_id = $1'
+
 
 def get_favorite_keyboard(vacancy_id: str):
     """Vakansiya uchun saqlash tugmasi"""
@@ -70,24 +72,22 @@ async def cmd_favorites(message: Message):
         async with db.pool.acquire() as conn:
             favorites = await conn.fetch('''
                 SELECT 
-                    sv.vacancy_id,
-                    sv.vacancy_title,
-                    sv.sent_at,
-                    v.title,
-                    v.company,
-                    v.location,
-                    v.salary_min,
-                    v.salary_max,
-                    v.url,
-                    v.source
-                FROM sent_vacancies sv
-                LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
-                WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                    vacancy_id,
+                    saved_at,
+                    title,
+                    company,
+                    location,
+                    salary_min,
+                    salary_max,
+                    url,
+                    source
+                FROM favorites
+                WHERE user_id = $1
+                ORDER BY saved_at DESC
                 LIMIT 5
             ''', message.from_user.id)
             
-            total = await conn.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', message.from_user.id)
+            total = await conn.fetchval(FAVORITES_COUNT_SQL, message.from_user.id)
             total_pages = (total + 4) // 5
         
         if not favorites:
@@ -105,7 +105,7 @@ async def cmd_favorites(message: Message):
         text += f"📊 Jami: <b>{total}</b> ta\n\n"
         
         for i, fav in enumerate(favorites, 1):
-            title = fav['title'] or fav['vacancy_title'] or 'Vakansiya'
+            title = fav['title'] or 'Vakansiya'
             company = fav['company'] or 'Kompaniya'
             location = fav['location'] or 'Joylashuv'
             
@@ -132,11 +132,7 @@ async def save_favorite(callback: CallbackQuery):
         vacancy_id = callback.data.replace("save_favorite_", "")
         
         # Saqlash
-        success = await db.add_sent_vacancy(
-            callback.from_user.id, 
-            vacancy_id, 
-            "Saved by user"
-        )
+        success = await db.add_favorite(callback.from_user.id, vacancy_id)
         
         if success:
             await callback.answer("✅ Vakansiya saqlandi!", show_alert=True)
@@ -156,10 +152,10 @@ async def unsave_favorite(callback: CallbackQuery):
         vacancy_id = callback.data.replace("unsave_favorite_", "")
         
         async with db.pool.acquire() as conn:
-            await conn.execute('''
-                DELETE FROM sent_vacancies
-                WHERE user_id = $1 AND vacancy_id = $2
-            ''', callback.from_user.id, vacancy_id)
+            await conn.execute(
+                'DELETE FROM favorites WHERE user_id = $1 AND vacancy_id = $2',
+                callback.from_user.id, vacancy_id
+            )
         
         await callback.answer("🗑 O'chirildi", show_alert=True)
         
@@ -198,7 +194,7 @@ async def confirm_clear_favorites(callback: CallbackQuery):
     try:
         async with db.pool.acquire() as conn:
             await conn.execute('''
-                DELETE FROM sent_vacancies
+                DELETE FROM favorites
                 WHERE user_id = $1
             ''', callback.from_user.id)
         
@@ -219,15 +215,14 @@ async def refresh_favorites(callback: CallbackQuery):
     try:
         async with db.pool.acquire() as conn:
             favorites = await conn.fetch('''
-                SELECT sv.vacancy_id, sv.vacancy_title, v.title, v.company, v.location, v.salary_min, v.salary_max
-                FROM sent_vacancies sv
-                LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
-                WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                SELECT vacancy_id, title, company, location, salary_min, salary_max
+                FROM favorites
+                WHERE user_id = $1
+                ORDER BY saved_at DESC
                 LIMIT 5
             ''', callback.from_user.id)
             
-            total = await db.pool.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', callback.from_user.id)
+            total = await db.pool.fetchval(FAVORITES_COUNT_SQL, callback.from_user.id)
             total_pages = (total + 4) // 5
         
         if not favorites:
@@ -242,7 +237,7 @@ async def refresh_favorites(callback: CallbackQuery):
         text += f"📊 Jami: <b>{total}</b> ta\n\n"
         
         for i, fav in enumerate(favorites, 1):
-            title = fav['title'] or fav['vacancy_title'] or 'Vakansiya'
+            title = fav['title'] or 'Vakansiya'
             company = fav['company'] or 'Kompaniya'
             text += f"{i}. <b>{title}</b>\n   🏢 {company}\n   🔗 /view_{fav['vacancy_id']}\n\n"
         
@@ -264,14 +259,13 @@ async def saved_page(callback: CallbackQuery):
         page = int(callback.data.replace("saved_page_", ""))
         async with db.pool.acquire() as conn:
             favorites = await conn.fetch('''
-                SELECT sv.vacancy_id, sv.vacancy_title, v.title, v.company, v.location, v.salary_min, v.salary_max
-                FROM sent_vacancies sv
-                LEFT JOIN vacancies v ON sv.vacancy_id = v.vacancy_id
-                WHERE sv.user_id = $1
-                ORDER BY sv.sent_at DESC
+                SELECT vacancy_id, title, company, location, salary_min, salary_max
+                FROM favorites
+                WHERE user_id = $1
+                ORDER BY saved_at DESC
                 LIMIT 5 OFFSET $2
             ''', callback.from_user.id, page * 5)
-            total = await db.pool.fetchval('SELECT COUNT(*) FROM sent_vacancies WHERE user_id = $1', callback.from_user.id)
+            total = await db.pool.fetchval(FAVORITES_COUNT_SQL, callback.from_user.id)
             total_pages = (total + 4) // 5
         
         if not favorites:
@@ -280,7 +274,7 @@ async def saved_page(callback: CallbackQuery):
             
         text = f"💾 <b>Saqlangan vakansiyalar</b>\n\n📊 Jami: <b>{total}</b> ta\n\n"
         for i, fav in enumerate(favorites, page * 5 + 1):
-            title = fav['title'] or fav['vacancy_title'] or 'Vakansiya'
+            title = fav['title'] or 'Vakansiya'
             company = fav['company'] or 'Kompaniya'
             text += f"{i}. <b>{title}</b>\n   🏢 {company}\n   🔗 /view_{fav['vacancy_id']}\n\n"
             
@@ -296,7 +290,8 @@ async def view_full_saved(callback: CallbackQuery):
     """Saqlangan vakansiyani to'liq ko'rish"""
     try:
         vacancy_id = callback.data.replace("view_full_", "")
-        vac = await db.get_vacancy(vacancy_id)
+        # Vakansiya retention bilan o'chgan bo'lsa - saqlangan nusxasi
+        vac = await db.get_vacancy(vacancy_id) or await db.get_favorite(callback.from_user.id, vacancy_id)
         if not vac:
             await callback.answer("⚠️ Vakansiya topilmadi", show_alert=True)
             return
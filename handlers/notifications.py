@@ -1,11 +1,24 @@
 from aiogram import Router, F
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+from config import DIGEST_SLOTS
 from database import db
+from middlewares.user_context import LazyUserContext
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+# Xulosa vaqtlari Uzbekistan vaqti bilan (UTC+5)
+UZ_TZ = timezone(timedelta(hours=5))
+
+# Slot -> oldindan tayyorlangan xulosalar (prepare_digests)
+_prepared_digests: Dict[str, List[Dict]] = {}
+# Tayyorlash, slot va catch-up yuborishlari ketma-ket - bir userga ikki marta yuborilmasin
+_digest_lock = asyncio.Lock()
+
 
 def get_notifications_keyboard(is_enabled: bool):
     """Bildirishnomalar klaviaturasi"""
@@ -82,12 +95,12 @@ def get_notification_settings_keyboard(settings: dict):
 
 
 @router.message(F.text == "🔔 Bildirishnomalar")
-async def cmd_notifications(message: Message):
+async def cmd_notifications(message: Message, user_context: LazyUserContext):
     """Bildirishnomalar sozlamalari"""
-    # Premium tekshirish
-    is_premium = await db.is_premium(message.from_user.id)
+    # Premium va sozlamalar - bitta so'rovda
+    context = await user_context.get()
     
-    if not is_premium:
+    if not context.is_premium:
         await message.answer(
             "🔒 <b>Premium xususiyat!</b>\n\n"
             "Push bildirishnomalar faqat Premium foydalanuvchilar uchun.\n\n"
@@ -102,11 +115,7 @@ async def cmd_notifications(message: Message):
         return
     
     # Bildirishnomalar holati
-    async with db.pool.acquire() as conn:
-        settings = await conn.fetchrow('''
-            SELECT * FROM notification_settings
-            WHERE user_id = $1
-        ''', message.from_user.id)
+    settings = context.notification_settings
     
     is_enabled = settings.get('enabled', True) if settings else True
     
@@ -318,7 +327,7 @@ async def save_notification_settings(callback: CallbackQuery):
 @router.callback_query(F.data == "set_notification_time")
 async def set_notification_time(callback: CallbackQuery):
     """Vaqtni tanlash klaviaturasi (sodda versiya)"""
-    times = ["08:00", "12:00", "18:00", "20:00", "22:00"]
+    times = DIGEST_SLOTS
     buttons = []
     row = []
     for t in times:
@@ -361,38 +370,84 @@ async def close_notifications(callback: CallbackQuery):
     await callback.message.delete()
     await callback.answer()
 
-async def send_daily_digests():
-    """Kunlik xulosalarni yuborish"""
+def digest_slot_bounds(slot: str):
+    """Slot userlari: digest_time (oxirgi slot, slot] - bugungi shu slotgacha bo'lgan barcha vaqtlar
+
+    Oldingi slot o'tkazib yuborilgan bo'lsa (lider yo'q, restart) uning userlari
+    ham shu slotda yuboriladi; bugun olganlar get_digests da last_digest_sent
+    bo'yicha tushib qoladi. Oxirgi slotdan keyingi vaqtlar - birinchi slotga.
+    """
+    return (
+        datetime.strptime(DIGEST_SLOTS[-1], '%H:%M').time(),
+        datetime.strptime(slot, '%H:%M').time(),
+    )
+
+
+async def prepare_digests(slot: str):
+    """Slotdan oldin xulosalarni tayyorlash (yuborish vaqtida faqat send)"""
+    async with _digest_lock:
+        digests = await db.get_digests(*digest_slot_bounds(slot), limit=5)
+        if digests is None:
+            return  # baza xatoligi - send_daily_digests o'zi hisoblaydi
+        _prepared_digests[slot] = digests
+    logger.info(f"📅 {slot} xulosalari tayyor: {len(digests)} ta user")
+
+
+async def catch_up_digests():
+    """Liderlik olinganda: bugun o'tib ketgan slotlarda olmaganlarga yuborish"""
+    now = datetime.now(UZ_TZ).strftime('%H:%M')
+    passed = [slot for slot in DIGEST_SLOTS if slot <= now]
+    if passed:
+        await send_daily_digests(passed[-1])
+
+
+async def send_daily_digests(slot: str):
+    """Slot userlariga kunlik xulosalarni yuborish"""
+    async with _digest_lock:
+        await _send_daily_digests(slot)
+
+
+async def _send_daily_digests(slot: str):
     from loader import bot
-    logger.info("📅 Kunlik xulosalar yuborish boshlandi...")
+    logger.info(f"📅 Kunlik xulosalar ({slot}) yuborish boshlandi...")
     
-    users = await db.get_users_for_digest()
-    if not users:
+    digests = _prepared_digests.pop(slot, None)
+    # Boshqa slotlar uchun tayyorlanganlar shu yuborishdan oldin hisoblangan - eskirgan
+    _prepared_digests.clear()
+    if digests is None:
+        # Tayyorlanmagan (restart, lider almashgan, catch-up) - hozir hisoblaymiz
+        digests = await db.get_digests(*digest_slot_bounds(slot), limit=5)
+    if digests is None:
+        logger.error(f"❌ {slot} xulosalarini olib bo'lmadi")
+        return
+    if not digests:
         logger.info("   Hozircha yuboriladigan xulosa yo'q")
         return
-        
-    for user_row in users:
-        user_id = user_row['user_id']
-        try:
-            vacancies = await db.get_recent_vacancies_for_user(user_id, limit=5)
-            if not vacancies:
-                continue
+    
+    sent = []
+    try:
+        for digest in digests:
+            user_id = digest['user_id']
+            vacancies = digest['vacancies']
+            try:
+                text = f"📅 <b>Kunlik xulosa</b>\n\n"
+                text += f"Oxirgi 24 soat ichida sizga mos <b>{len(vacancies)}</b> ta yangi vakansiya topildi:\n\n"
                 
-            text = f"📅 <b>Kunlik xulosa</b>\n\n"
-            text += f"Oxirgi 24 soat ichida sizga mos <b>{len(vacancies)}</b> ta yangi vakansiya topildi:\n\n"
-            
-            for i, vac in enumerate(vacancies, 1):
-                text += f"{i}. <b>{vac['title']}</b>\n"
-                text += f"   🏢 {vac['company']}\n"
-                text += f"   🔗 /view_{vac['vacancy_id']}\n\n"
-            
-            text += "💡 Batafsil ma'lumot uchun linkni bosing."
-            
-            await bot.send_message(user_id, text, parse_mode='HTML')
-            await db.update_last_digest_sent(user_id)
-            await asyncio.sleep(0.3)
-            
-        except Exception as e:
-            logger.error(f"Error sending digest to {user_id}: {e}")
+                for i, vac in enumerate(vacancies, 1):
+                    text += f"{i}. <b>{vac['title']}</b>\n"
+                    text += f"   🏢 {vac['company']}\n"
+                    text += f"   🔗 /view_{vac['vacancy_id']}\n\n"
+                
+                text += "💡 Batafsil ma'lumot uchun linkni bosing."
+                
+                await bot.send_message(user_id, text, parse_mode='HTML')
+                sent.append(user_id)
+                await asyncio.sleep(0.3)
+                
+            except Exception as e:
+                logger.error(f"Error sending digest to {user_id}: {e}")
+    finally:
+        # To'xtatilsa ham yuborilganlar qayta yuborilmasin
+        await db.mark_digests_sent(sent)
     
-    logger.info(f"✅ Kunlik xulosalar {len(users)} ta userga yuborildi")
+    logger.info(f"✅ Kunlik xulosalar {len(sent)}/{len(digests)} ta userga yuborildi")
@@ -2,6 +2,7 @@ from aiogram import Router, F
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from database import db
 from filters import vacancy_filter
+from recommendations import recommendations
 import logging
 from datetime import datetime, timezone, timedelta
 
@@ -172,19 +173,10 @@ async def smart_best_match(callback: CallbackQuery):
     )
     
     try:
-        # User profili
-        user_filter = await db.get_user_filter(callback.from_user.id)
+        # Oldindan hisoblangan tavsiyalar (oxirgi 7 kun, score bo'yicha saralangan)
+        scored_vacancies = await recommendations.get(callback.from_user.id, limit=5)
         
-        # Vakansiyalarni olish (oxirgi 7 kun)
-        async with db.pool.acquire() as conn:
-            vacancies = await conn.fetch('''
-                SELECT * FROM vacancies
-                WHERE published_date > NOW() - INTERVAL '7 days'
-                ORDER BY published_date DESC
-                LIMIT 100
-            ''')
-        
-        if not vacancies:
+        if not scored_vacancies:
             await callback.message.edit_text(
                 "😕 <b>Hech qanday vakansiya topilmadi</b>\n\n"
                 "Keyinroq qayta urinib ko'ring.",
@@ -192,21 +184,10 @@ async def smart_best_match(callback: CallbackQuery):
             )
             return
         
-        # Match score hisoblash
-        scored_vacancies = []
-        for vac in vacancies:
-            vac_dict = dict(vac)
-            score = calculate_match_score(vac_dict, user_filter)
-            vac_dict['match_score'] = score
-            scored_vacancies.append(vac_dict)
-        
-        # Saralash (yuqoridan pastga)
-        scored_vacancies.sort(key=lambda x: x['match_score'], reverse=True)
-        
         # Top 5 ni ko'rsatish
         text = "🎯 <b>Sizga eng mos vakansiyalar</b>\n\n"
         
-        for i, vac in enumerate(scored_vacancies[:5], 1):
+        for i, vac in enumerate(scored_vacancies, 1):
             score = vac['match_score']
             emoji = get_match_emoji(score)
             
@@ -251,31 +232,13 @@ async def smart_best_match(callback: CallbackQuery):
 async def smart_top_10(callback: CallbackQuery):
     """Top 10 vakansiyalar (qisqacha)"""
     try:
-        user_filter = await db.get_user_filter(callback.from_user.id)
-        
-        async with db.pool.acquire() as conn:
-            vacancies = await conn.fetch('''
-                SELECT * FROM vacancies
-                WHERE published_date > NOW() - INTERVAL '7 days'
-                ORDER BY published_date DESC
-                LIMIT 100
-            ''')
-        
-        # Scoring
-        scored_vacancies = []
-        for vac in vacancies:
-            vac_dict = dict(vac)
-            score = calculate_match_score(vac_dict, user_filter)
-            vac_dict['match_score'] = score
-            scored_vacancies.append(vac_dict)
-        
-        scored_vacancies.sort(key=lambda x: x['match_score'], reverse=True)
+        scored_vacancies = await recommendations.get(callback.from_user.id, limit=10)
         
         # Top 10
         text = "🔥 <b>Top 10 vakansiyalar</b>\n"
         text += "<i>Sizga eng mos</i>\n\n"
         
-        for i, vac in enumerate(scored_vacancies[:10], 1):
+        for i, vac in enumerate(scored_vacancies, 1):
             score = vac['match_score']
             emoji = get_match_emoji(score)
             
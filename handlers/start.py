@@ -4,15 +4,17 @@ from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from database import db
+from middlewares.user_context import LazyUserContext
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
-async def get_main_keyboard(user_id: int):
+async def get_main_keyboard(user_id: int, is_premium: bool = None):
     """Asosiy klaviatura - Premium va funksiyalarga qarab"""
-    is_premium = await db.is_premium(user_id)
+    if is_premium is None:
+        is_premium = await db.is_premium(user_id)
     
     keyboard_buttons = [
         [
@@ -58,7 +60,7 @@ class StartStates(StatesGroup):
     waiting_for_role = State()
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext):
+async def cmd_start(message: Message, state: FSMContext, user_context: LazyUserContext = None):
     """Start komandasi"""
     user = message.from_user
     
@@ -85,8 +87,8 @@ async def cmd_start(message: Message, state: FSMContext):
         from handlers.referral import process_referral_start
         await process_referral_start(message, referrer_id)
         
-    # Premium status
-    is_premium = await db.is_premium(user.id)
+    # Premium status (add_user dan keyin - kontekst yangi userni ham ko'radi)
+    is_premium = (await user_context.get()).is_premium if user_context else await db.is_premium(user.id)
     premium_badge = "💎" if is_premium else ""
     
     welcome_text = f"👋 Assalomu alaykum, <b>{user.first_name}</b> {premium_badge}!\n\n"
@@ -133,7 +135,7 @@ async def cmd_start(message: Message, state: FSMContext):
     
     await message.answer(
         welcome_text,
-        reply_markup=await get_main_keyboard(user.id),
+        reply_markup=await get_main_keyboard(user.id, is_premium),
         parse_mode='HTML'
     )
 
@@ -163,9 +165,9 @@ async def send_main_menu(message: Message, user_id: int, prefix_text: str = ""):
 
 @router.message(F.text == "ℹ️ Yordam")
 @router.message(Command("help"))
-async def cmd_help(message: Message):
+async def cmd_help(message: Message, user_context: LazyUserContext = None):
     """Yordam komandasi"""
-    is_premium = await db.is_premium(message.from_user.id)
+    is_premium = (await user_context.get()).is_premium if user_context else await db.is_premium(message.from_user.id)
     
     help_text = """
 📖 <b>Yordam</b>
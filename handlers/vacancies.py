@@ -163,9 +163,9 @@ async def cancel_choice(callback: CallbackQuery):
     await callback.answer()
 
 @router.callback_query(F.data == "start_search_candidates")
-async def trigger_candidates_search(callback: CallbackQuery):
+async def trigger_candidates_search(callback: CallbackQuery, user_context=None):
     from handlers.candidates import show_candidates
-    await show_candidates(callback.message, user_id=callback.from_user.id)
+    await show_candidates(callback.message, user_id=callback.from_user.id, user_context=user_context)
     await callback.message.delete()
     await callback.answer()
 
@@ -528,7 +528,7 @@ async def save_vacancy(callback: CallbackQuery):
     """Vakansiyani saqlash"""
     try:
         vacancy_id = callback.data.split("_", 2)[2]
-        await db.add_sent_vacancy(callback.from_user.id, vacancy_id, "Saqlangan")
+        await db.add_favorite(callback.from_user.id, vacancy_id)
         await callback.answer("✅ Vakansiya saqlandi!", show_alert=True)
     except Exception as e:
         logger.error(f"Vakansiya saqlashda xatolik: {e}")
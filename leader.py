@@ -0,0 +1,153 @@
+"""
+Scheduler joblari uchun lider tanlash (Postgres advisory lock)
+
+Bir nechta replika ishlaganda scraping, digest va boshqa fon ishlari faqat
+lider jarayonda bajariladi. Lock alohida ulanishga bog'langan: jarayon
+o'lsa yoki ulanish uzilsa, Postgres lockni o'zi bo'shatadi va boshqa
+replika keyingi tekshiruvda liderlikni oladi.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import asyncpg
+
+from config import LEADER_ELECTION_ENABLED, LEADER_LOCK_ID, LEADER_RENEW_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """Advisory lock asosidagi lider tanlash - lease yangilash va failover bilan"""
+
+    def __init__(self, lock_id: int, renew_interval: int = 10, enabled: bool = True):
+        self.lock_id = lock_id
+        self.renew_interval = renew_interval
+        self.enabled = enabled
+        self.is_leader = not enabled  # O'chirilgan bo'lsa - har doim lider
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._acquire_handlers: List[Callable[[], Awaitable[None]]] = []
+        self._handler_tasks = set()
+
+    def on_acquire(self, handler: Callable[[], Awaitable[None]]):
+        """Liderlik olinganda (ishga tushish yoki failover) - o'tkazib yuborilgan ishlarni bajarish uchun"""
+        self._acquire_handlers.append(handler)
+
+    def _became_leader(self):
+        # Fon taskida: lease yangilash sikli handlerlarni kutmaydi
+        for handler in self._acquire_handlers:
+            task = asyncio.create_task(self._call(handler))
+            self._handler_tasks.add(task)
+            task.add_done_callback(self._handler_tasks.discard)
+
+    @staticmethod
+    async def _call(handler):
+        try:
+            await handler()
+        except Exception as e:
+            logger.error(f"❌ on_acquire handler xatolik: {e}")
+
+    async def start(self):
+        """Birinchi urinish va fon tekshiruvini boshlash"""
+        if not self.enabled:
+            logger.info("ℹ️ Leader election o'chirilgan - jarayon lider hisoblanadi")
+            self._became_leader()
+            return
+
+        await self._try_acquire()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Liderlikni bo'shatish"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._conn and not self._conn.is_closed():
+            try:
+                if self.is_leader:
+                    await self._conn.execute('SELECT pg_advisory_unlock($1)', self.lock_id)
+                await self._conn.close()
+            except Exception as e:
+                logger.debug(f"Leader stop: {e}")
+
+        self._conn = None
+        if self.enabled:
+            self.is_leader = False
+
+    async def _run(self):
+        """Har renew_interval da lease ni yangilash yoki lockni olishga urinish"""
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            if self.is_leader:
+                await self._renew()
+            else:
+                await self._try_acquire()
+
+    async def _connect(self):
+        if self._conn is None or self._conn.is_closed():
+            from config import DATABASE_URL
+            # Pool dan emas: pool ulanishlarni yopib/almashtirib turadi, lock esa sessiyaga bog'liq
+            self._conn = await asyncpg.connect(
+                DATABASE_URL,
+                timeout=10,
+                server_settings={'application_name': 'vacancybot-leader'}
+            )
+        return self._conn
+
+    async def _try_acquire(self):
+        try:
+            conn = await self._connect()
+            acquired = await asyncio.wait_for(
+                conn.fetchval('SELECT pg_try_advisory_lock($1)', self.lock_id),
+                timeout=self.renew_interval
+            )
+            if acquired:
+                self.is_leader = True
+                logger.info(f"👑 Liderlik olindi (lock={self.lock_id}) - scheduler joblari shu jarayonda")
+                self._became_leader()
+        except Exception as e:
+            logger.warning(f"Leader lock olishda xatolik: {e}")
+            await self._drop_connection()
+
+    async def _renew(self):
+        """Lease: ulanish tirik bo'lsa, session lock ham ushlab turilgan"""
+        try:
+            await asyncio.wait_for(self._conn.fetchval('SELECT 1'), timeout=self.renew_interval)
+        except Exception as e:
+            logger.error(f"⚠️ Leader ulanishi yo'qoldi, liderlikdan voz kechildi: {e}")
+            self.is_leader = False
+            await self._drop_connection()
+
+    async def _drop_connection(self):
+        if self._conn is not None:
+            try:
+                self._conn.terminate()
+            except Exception:
+                pass
+            self._conn = None
+
+    def leader_only(self, func):
+        """Job faqat lider jarayonda bajarilishi uchun wrapper"""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self.is_leader:
+                logger.debug(f"{func.__name__}: lider emas, o'tkazib yuborildi")
+                return None
+            return await func(*args, **kwargs)
+        return wrapper
+
+
+# Global leader instance
+leader_election = LeaderElection(
+    lock_id=LEADER_LOCK_ID,
+    renew_interval=LEADER_RENEW_INTERVAL,
+    enabled=LEADER_ELECTION_ENABLED
+)
@@ -1,9 +1,11 @@
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from config import BOT_TOKEN
+from config import BOT_TOKEN, FSM_STORAGE, FSM_CACHE_ENABLED, TELEGRAM_API_URL
 import logging
 
 # Logging
@@ -13,14 +15,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Bot va Dispatcher
+# Bot va Dispatcher (TELEGRAM_API_URL - lokal/fake Bot API server uchun)
+session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None
 bot = Bot(
     token=BOT_TOKEN,
+    session=session,
     default=DefaultBotProperties(
         parse_mode=ParseMode.HTML
     )
 )
-storage = MemoryStorage()
+# Bot API so'rovlari metrikalari (latency va natija)
+from middlewares.request_metrics import RequestMetricsMiddleware
+bot.session.middleware(RequestMetricsMiddleware())
+# Botni bloklagan / o'chirilgan userlarni avtomatik is_active = FALSE qilish
+from middlewares.unreachable_users import UnreachableUsersMiddleware, unreachable_users
+bot.session.middleware(UnreachableUsersMiddleware(unreachable_users))
+
+# FSM storage - Postgres (restart va bir nechta jarayon uchun) yoki Memory
+if FSM_STORAGE == 'postgres':
+    from database import db
+    from fsm_storage import PostgresStorage
+    storage = PostgresStorage(db, cache_enabled=FSM_CACHE_ENABLED)
+else:
+    storage = MemoryStorage()
 dp = Dispatcher(storage=storage)
 
 # OPTIMIZED: Dispatcher fsm_strategy
@@ -0,0 +1,204 @@
+"""
+Prometheus metrikalari (scraping -> matching -> yuborish pipeline)
+
+prometheus_client ixtiyoriy: o'rnatilmagan bo'lsa metrikalar hech narsa
+qilmaydi va /metrics endpoint 503 qaytaradi.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client import (optional)
+try:
+    from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    logger.warning("⚠️ prometheus_client o'rnatilmagan. /metrics o'chirilgan.")
+
+
+class _NoopMetric:
+    """prometheus_client yo'q bo'lganda ishlatiladigan bo'sh metrika"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def set_function(self, func):
+        pass
+
+
+if not PROMETHEUS_AVAILABLE:
+    Counter = Gauge = Histogram = _NoopMetric
+
+
+# ========== SCRAPING ==========
+
+SCRAPE_DURATION = Histogram(
+    'vacancybot_scrape_duration_seconds',
+    'Bitta scraper chaqiruvi davomiyligi',
+    ['source', 'target'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+SCRAPE_ERRORS = Counter(
+    'vacancybot_scrape_errors_total',
+    'Scraper xatoliklari',
+    ['source', 'target']
+)
+VACANCIES_INGESTED = Counter(
+    'vacancybot_vacancies_ingested_total',
+    'Scraperlardan olingan vakansiyalar',
+    ['source']
+)
+VACANCIES_NEW = Counter(
+    'vacancybot_vacancies_new_total',
+    'Bazaga yangi qo\'shilgan vakansiyalar',
+    ['source']
+)
+
+# ========== MATCHING ==========
+
+MATCH_DURATION = Histogram(
+    'vacancybot_match_duration_seconds',
+    'Bitta user uchun filtrlash davomiyligi',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+MATCHED_VACANCIES = Histogram(
+    'vacancybot_matched_vacancies',
+    'Bitta user uchun filtrdan o\'tgan vakansiyalar soni',
+    buckets=(0, 1, 3, 5, 10, 25, 50, 100, 250)
+)
+
+# ========== YUBORISH (Bot API) ==========
+
+TELEGRAM_REQUEST_DURATION = Histogram(
+    'vacancybot_telegram_request_duration_seconds',
+    'Bot API so\'rovlari davomiyligi',
+    ['method'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+TELEGRAM_REQUESTS = Counter(
+    'vacancybot_telegram_requests_total',
+    'Bot API so\'rovlari natijasi',
+    ['method', 'outcome']
+)
+USERS_DEACTIVATED = Counter(
+    'vacancybot_users_deactivated_total',
+    'Yetib bo\'lmagani uchun o\'chirilgan userlar',
+    ['reason']
+)
+
+# ========== HANDLERLAR ==========
+
+HANDLER_DURATION = Histogram(
+    'vacancybot_handler_duration_seconds',
+    'Update ni qayta ishlash davomiyligi (router/handler bo\'yicha)',
+    ['router', 'handler'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HANDLER_DB_TIME = Histogram(
+    'vacancybot_handler_db_seconds',
+    'Bitta update davomida DB so\'rovlariga ketgan vaqt',
+    ['router', 'handler'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+HANDLER_DB_QUERIES = Histogram(
+    'vacancybot_handler_db_queries',
+    'Bitta update davomida bajarilgan DB so\'rovlari soni',
+    ['router', 'handler'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+SLOW_UPDATES = Counter(
+    'vacancybot_slow_updates_total',
+    'Chegaradan sekin qayta ishlangan updatelar',
+    ['router', 'handler']
+)
+
+# ========== DATABASE ==========
+
+DB_POOL_WAIT = Histogram(
+    'vacancybot_db_pool_wait_seconds',
+    'Pool dan ulanish olishni kutish vaqti',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+DB_POOL_SIZE = Gauge('vacancybot_db_pool_size', 'Pooldagi ulanishlar soni')
+DB_POOL_IN_USE = Gauge('vacancybot_db_pool_in_use', 'Band ulanishlar soni')
+
+# ========== RUNTIME ==========
+
+EVENT_LOOP_LAG = Histogram(
+    'vacancybot_event_loop_lag_seconds',
+    'Event loop kechikishi',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+JOB_DURATION = Histogram(
+    'vacancybot_job_duration_seconds',
+    'Scheduler joblari davomiyligi',
+    ['job', 'status'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+
+
+# ========== HELPERS ==========
+
+def observe_pool(pool):
+    """Pool hajmi va band ulanishlarni /metrics so'ralganda hisoblash"""
+    DB_POOL_SIZE.set_function(pool.get_size)
+    DB_POOL_IN_USE.set_function(lambda: pool.get_size() - pool.get_idle_size())
+
+
+def track_job(name: str):
+    """Scheduler job davomiyligini o'lchash uchun decorator"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = 'ok'
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                JOB_DURATION.labels(job=name, status=status).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+async def monitor_event_loop(interval: float = 1.0):
+    """Event loop lag: sleep qancha kechikib uyg'onganini o'lchash"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """/metrics endpoint"""
+    if not PROMETHEUS_AVAILABLE:
+        return web.Response(status=503, text="prometheus_client o'rnatilmagan")
+    return web.Response(
+        body=generate_latest(),
+        headers={'Content-Type': CONTENT_TYPE_LATEST}
+    )
@@ -0,0 +1,98 @@
+"""
+Handler latency middleware
+
+Har bir update uchun umumiy vaqt, DB so'rovlari soni va vaqti router/handler
+bo'yicha yoziladi. SLOW_UPDATE_THRESHOLD dan sekin updatelar logga chiqadi.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from config import SLOW_UPDATE_THRESHOLD
+from database import QueryStats, query_stats
+from metrics import HANDLER_DB_QUERIES, HANDLER_DB_TIME, HANDLER_DURATION, SLOW_UPDATES
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateTrace:
+    """Qaysi handler update ni qayta ishlagani (inner middleware to'ldiradi)"""
+
+    __slots__ = ('router', 'handler')
+
+    def __init__(self):
+        self.router = 'unhandled'
+        self.handler = 'unhandled'
+
+
+_current_trace: ContextVar[Optional[UpdateTrace]] = ContextVar('update_trace', default=None)
+
+
+class LatencyMiddleware(BaseMiddleware):
+    """Outer middleware (dp.update) - butun update vaqtini o'lchash"""
+
+    def __init__(self, slow_threshold: float = SLOW_UPDATE_THRESHOLD):
+        self.slow_threshold = slow_threshold
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        trace = UpdateTrace()
+        stats = QueryStats()
+        trace_token = _current_trace.set(trace)
+        stats_token = query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - start
+            query_stats.reset(stats_token)
+            _current_trace.reset(trace_token)
+
+            labels = {'router': trace.router, 'handler': trace.handler}
+            HANDLER_DURATION.labels(**labels).observe(elapsed)
+            HANDLER_DB_TIME.labels(**labels).observe(stats.time)
+            HANDLER_DB_QUERIES.labels(**labels).observe(stats.count)
+
+            if elapsed >= self.slow_threshold:
+                SLOW_UPDATES.labels(**labels).inc()
+                update_id = event.update_id if isinstance(event, Update) else None
+                logger.warning(
+                    f"🐢 Sekin update {update_id}: {trace.router}.{trace.handler} "
+                    f"{elapsed * 1000:.0f}ms (DB: {stats.count} ta so'rov, {stats.time * 1000:.0f}ms)"
+                )
+
+
+class HandlerTraceMiddleware(BaseMiddleware):
+    """Inner middleware - tanlangan handler nomini UpdateTrace ga yozish"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        trace = _current_trace.get()
+        handler_object = data.get('handler')
+        if trace is not None and handler_object is not None:
+            callback = handler_object.callback
+            trace.router = getattr(callback, '__module__', 'unknown').rsplit('.', 1)[-1]
+            trace.handler = getattr(callback, '__name__', type(callback).__name__)
+        return await handler(event, data)
+
+
+def setup_latency_middleware(dp: Dispatcher):
+    """Middlewarelarni ro'yxatdan o'tkazish (inner middleware child routerlarga ham tegishli)"""
+    dp.update.outer_middleware(LatencyMiddleware())
+    trace_middleware = HandlerTraceMiddleware()
+    for name, observer in dp.observers.items():
+        if name not in ('update', 'error'):
+            observer.middleware(trace_middleware)
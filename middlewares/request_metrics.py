@@ -0,0 +1,42 @@
+"""
+Bot API so'rovlari uchun metrika middleware (bot.session darajasida)
+"""
+
+import time
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import (
+    TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError,
+    TelegramRetryAfter, TelegramServerError
+)
+
+from metrics import TELEGRAM_REQUEST_DURATION, TELEGRAM_REQUESTS
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """Har bir Bot API so'rovining davomiyligi va natijasini yozish"""
+
+    async def __call__(self, make_request, bot, method):
+        method_name = type(method).__name__
+        start = time.perf_counter()
+        outcome = 'ok'
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter:
+            outcome = 'retry_after'
+            raise
+        except TelegramForbiddenError:
+            outcome = 'forbidden'
+            raise
+        except TelegramBadRequest:
+            outcome = 'bad_request'
+            raise
+        except (TelegramNetworkError, TelegramServerError):
+            outcome = 'network_error'
+            raise
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            TELEGRAM_REQUEST_DURATION.labels(method=method_name).observe(time.perf_counter() - start)
+            TELEGRAM_REQUESTS.labels(method=method_name, outcome=outcome).inc()
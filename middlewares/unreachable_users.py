@@ -0,0 +1,100 @@
+"""
+Yetib bo'lmaydigan userlarni avtomatik o'chirish (bot.session darajasida)
+
+Botni bloklagan, akkaunti o'chirilgan yoki chati topilmagan userga yuborish
+har safar 403/400 bilan tugaydi. Middleware bunday userlarni yig'adi va
+ularni bazada bo'laklab is_active = FALSE qiladi - broadcast, digest va
+scraping fan-outi faqat yetib boriladigan userlar bo'yicha ketadi.
+/start (add_user) userni yana faollashtiradi.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from metrics import USERS_DEACTIVATED
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500  # shuncha user yig'ilsa - darhol yoziladi
+
+# 400 xatoliklardan doimiylari (vaqtinchalik xatoliklar - userni o'chirmaymiz)
+PERMANENT_BAD_REQUESTS = ('chat not found', 'user is deactivated', 'peer_id_invalid')
+
+
+def permanent_failure(error: Exception) -> Optional[str]:
+    """Doimiy yetkazib bo'lmaslik sababi ('blocked', 'deactivated', 'not_found') yoki None"""
+    message = str(error).lower()
+    if isinstance(error, TelegramForbiddenError):
+        return 'deactivated' if 'deactivated' in message else 'blocked'
+    if isinstance(error, TelegramBadRequest):
+        if 'deactivated' in message:
+            return 'deactivated'
+        if any(text in message for text in PERMANENT_BAD_REQUESTS):
+            return 'not_found'
+    return None
+
+
+class UnreachableUsers:
+    """Yetib bo'lmaydigan userlar navbati: user_id -> (aniqlangan vaqt, sabab)"""
+
+    def __init__(self, batch_size: int = FLUSH_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pending: Dict[int, Tuple[datetime, str]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, user_id: int, reason: str):
+        if user_id in self._pending:
+            return
+        self._pending[user_id] = (datetime.now(timezone.utc), reason)
+        if len(self._pending) >= self.batch_size and not (self._flush_task and not self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def flush(self):
+        """Navbatdagi userlarni bitta so'rov bilan o'chirish (scheduler va shutdown)"""
+        if not self._pending:
+            return
+        from database import db
+
+        pending, self._pending = self._pending, {}
+        deactivated = await db.deactivate_users({user_id: seen for user_id, (seen, _) in pending.items()})
+        if deactivated is None:
+            # Baza xatoligi - keyingi flush da qayta urinamiz
+            for user_id, item in pending.items():
+                self._pending.setdefault(user_id, item)
+            return
+
+        for user_id in deactivated:
+            USERS_DEACTIVATED.labels(reason=pending[user_id][1]).inc()
+        if deactivated:
+            logger.info(f"🚫 {len(deactivated)} ta yetib bo'lmaydigan user o'chirildi")
+
+
+class UnreachableUsersMiddleware(BaseRequestMiddleware):
+    """Shaxsiy chatga yuborish doimiy xatolik bilan tugasa - userni navbatga qo'shish"""
+
+    def __init__(self, tracker: UnreachableUsers):
+        self.tracker = tracker
+
+    async def __call__(self, make_request, bot, method):
+        try:
+            return await make_request(bot, method)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            chat_id = getattr(method, 'chat_id', None)
+            # Faqat shaxsiy chatlar (guruh/kanal id lari manfiy)
+            if isinstance(chat_id, int) and chat_id > 0:
+                reason = permanent_failure(e)
+                if reason:
+                    self.tracker.add(chat_id, reason)
+            raise
+
+
+# Global navbat
+unreachable_users = UnreachableUsers()
@@ -0,0 +1,99 @@
+"""
+Per-update UserContext
+
+Handler bitta update davomida bir xil user uchun get_user, is_premium,
+get_user_filter va notification_settings ni alohida so'ramasligi uchun:
+middleware ``user_context`` (LazyUserContext) ni inject qiladi, birinchi
+``await user_context.get()`` da hammasi bitta so'rovda yuklanadi, keyingi
+chaqiruvlar xotiradan qaytadi. Kontekstni ishlatmagan updatelar bazaga
+umuman bormaydi.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, User
+
+from database import db
+
+
+class UserContext:
+    """User qatori, premium, rol, filtr va bildirishnoma sozlamalari"""
+
+    __slots__ = ('user_id', 'user', 'is_premium', 'role', 'filter', 'notification_settings')
+
+    def __init__(self, user_id: int, user: Optional[Dict], is_premium: bool,
+                 filter: Dict, notification_settings: Optional[Dict]):
+        self.user_id = user_id
+        self.user = user
+        self.is_premium = is_premium
+        self.role = user.get('role') if user else None
+        self.filter = filter
+        self.notification_settings = notification_settings
+
+    @property
+    def exists(self) -> bool:
+        return self.user is not None
+
+
+async def load_user_context(user_id: int) -> UserContext:
+    """Bitta so'rov bilan UserContext (boshqa user uchun ham - masalan admin qidiruvi)"""
+    from config import ADMIN_IDS
+    from premium_index import premium_index
+
+    row = await db.get_user_context(user_id)
+    user = row['user'] if row else None
+
+    if user_id in ADMIN_IDS:
+        is_premium = True
+    elif premium_index.ready:
+        is_premium = premium_index.is_premium(user_id)
+    else:
+        is_premium = bool(user and user.get('is_premium_active'))
+
+    return UserContext(
+        user_id=user_id,
+        user=user,
+        is_premium=is_premium,
+        filter=db.build_user_filter(row['filter'] if row else None, is_premium),
+        notification_settings=row['notification_settings'] if row else None,
+    )
+
+
+class LazyUserContext:
+    """Update davomida UserContext ni ko'pi bilan bir marta yuklash"""
+
+    __slots__ = ('user_id', '_context')
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self._context: Optional[UserContext] = None
+
+    async def get(self) -> UserContext:
+        if self._context is None:
+            self._context = await load_user_context(self.user_id)
+        return self._context
+
+    def invalidate(self):
+        """Handler user ma'lumotini o'zgartirgandan keyin (keyingi get() qayta yuklaydi)"""
+        self._context = None
+
+
+class UserContextMiddleware(BaseMiddleware):
+    """Outer middleware (dp.update) - data['user_context'] ni inject qilish"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user: Optional[User] = data.get('event_from_user')
+        if user is not None:
+            data['user_context'] = LazyUserContext(user.id)
+        return await handler(event, data)
+
+
+def setup_user_context_middleware(dp: Dispatcher):
+    # aiogram ning o'z event_from_user middleware idan keyin ishlaydi
+    dp.update.outer_middleware(UserContextMiddleware())
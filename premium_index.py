@@ -0,0 +1,129 @@
+"""
+Premium statuslar xotiradagi indeksi
+
+Ishga tushganda aktiv premium foydalanuvchilar (user_id -> premium_until)
+yuklanadi, shundan keyin db.is_premium bazaga bormaydi. Har bir yozuv o'z
+premium_until muddatida o'zi eskiradi. users.premium_until o'zgarganda
+trigger premium_changed kanaliga NOTIFY yuboradi - barcha replikalar
+indeksni yangilaydi (db_events). LISTEN ulanishi uzilsa (xabarlar yo'qolgan
+bo'lishi mumkin) indeks qayta yuklanadi, ungacha is_premium bazadan o'qiydi.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import PREMIUM_INDEX_ENABLED, PREMIUM_INDEX_RELOAD_INTERVAL
+from db_events import db_events
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'premium_changed'
+
+
+class PremiumIndex:
+    """user_id -> premium_until (faqat aktiv premiumlar)"""
+
+    def __init__(self, enabled: bool = True, reload_interval: int = 3600):
+        self.enabled = enabled
+        self.reload_interval = reload_interval
+        self._loaded = False
+        self._until: Dict[int, datetime] = {}
+        self._pool = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[list] = None  # reload paytida kelgan o'zgarishlar
+
+    @property
+    def ready(self) -> bool:
+        """False bo'lsa - is_premium bazadan o'qiydi"""
+        return self._loaded and db_events.connected
+
+    # ========== LOOKUP ==========
+
+    def is_premium(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= datetime.now(timezone.utc):
+            # Muddati tugadi - yozuv o'zi eskiradi
+            self._until.pop(user_id, None)
+            return False
+        return True
+
+    def set(self, user_id: int, premium_until: Optional[datetime]):
+        """Write-through: set_premium/remove_premium va NOTIFY dan"""
+        if self._pending is not None:
+            self._pending.append((user_id, premium_until))
+        if premium_until is None:
+            self._until.pop(user_id, None)
+            return
+        if premium_until.tzinfo is None:
+            premium_until = premium_until.replace(tzinfo=timezone.utc)
+        if premium_until > datetime.now(timezone.utc):
+            self._until[user_id] = premium_until
+        else:
+            self._until.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._until)
+
+    # ========== LIFECYCLE ==========
+
+    async def start(self, pool):
+        """Indeksni yuklash va NOTIFY larga obuna bo'lish"""
+        if not self.enabled:
+            logger.info("ℹ️ Premium index o'chirilgan - is_premium bazadan o'qiydi")
+            return
+        self._pool = pool
+        await db_events.subscribe(CHANNEL, self._on_notify)
+        db_events.on_reconnect(self.reload)
+        await db_events.start()
+        await self.reload()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loaded = False
+
+    async def reload(self):
+        """Barcha aktiv premiumlarni qayta yuklash"""
+        self._pending = []
+        try:
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT user_id, premium_until FROM users WHERE premium_until > NOW()'
+                )
+            self._until = {row['user_id']: row['premium_until'] for row in rows}
+            # Snapshot dan keyingi o'zgarishlar ustidan yozilmasin
+            pending, self._pending = self._pending, None
+            for user_id, until in pending:
+                self.set(user_id, until)
+            self._loaded = True
+            logger.info(f"💎 Premium index yuklandi: {len(self._until)} ta aktiv premium")
+        except Exception as e:
+            logger.error(f"❌ Premium index yuklashda xatolik: {e}")
+            self._loaded = False
+        finally:
+            self._pending = None
+
+    async def _run(self):
+        """Davriy to'liq qayta yuklash (xavfsizlik uchun)"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload()
+
+    def _on_notify(self, payload: str):
+        """Payload: '<user_id>:<premium_until epoch yoki bo'sh>'"""
+        user_id, _, epoch = payload.partition(':')
+        until = datetime.fromtimestamp(float(epoch), timezone.utc) if epoch else None
+        self.set(int(user_id), until)
+
+
+premium_index = PremiumIndex(enabled=PREMIUM_INDEX_ENABLED, reload_interval=PREMIUM_INDEX_RELOAD_INTERVAL)
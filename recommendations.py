@@ -0,0 +1,129 @@
+"""
+Smart tavsiyalar - oldindan hisoblangan top-K (user_recommendations)
+
+Smart sahifalarni ochgan har bir userning eng mos RECOMMENDATIONS_TOP_K
+vakansiyasi (vacancies.id, score) bazada saqlanadi va bitta indeksli so'rov
+bilan o'qiladi. Yangi vakansiyalar saqlanganda faqat ular tavsiyalari bor
+premium userlarga qarshi baholanadi - top-K ga kirganlari qo'shiladi.
+Filtr o'zgarsa (save_user_filter) yoki hisoblanganiga RECOMMENDATIONS_REBUILD_HOURS
+bo'lsa - keyingi ochishda qaytadan hisoblanadi. Nomzodlar oxirgi
+RECOMMENDATIONS_WINDOW_DAYS kundan kalit so'zlar bo'yicha BM25 relevance
+tartibida olinadi (search_index), teng match % lar relevance bo'yicha saralanadi.
+"""
+
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from config import (
+    RECOMMENDATIONS_CANDIDATES, RECOMMENDATIONS_REBUILD_HOURS,
+    RECOMMENDATIONS_TOP_K, RECOMMENDATIONS_WINDOW_DAYS
+)
+from database import db
+from scoring import VacancyBatch, score_matrix
+from search_index import search_index
+
+logger = logging.getLogger(__name__)
+
+
+class Recommendations:
+    """user_recommendations ni o'qish, qayta hisoblash va inkremental yangilash"""
+
+    def __init__(self, top_k: int, window_days: int, rebuild_hours: int, candidates: int):
+        self.top_k = top_k
+        self.window = timedelta(days=window_days)
+        self.rebuild_after = timedelta(hours=rebuild_hours)
+        self.candidates = candidates
+
+    @staticmethod
+    def _top(scores: List[int], relevance: Dict[int, float], vacancies: List[Dict],
+             k: int) -> List[Tuple[int, float, datetime, int]]:
+        """Eng mos k ta: [(score, relevance, published_date, vacancies.id)] - teng score da relevanti oldin"""
+        return heapq.nlargest(k, (
+            (score, relevance.get(vacancy['id'], 0.0), vacancy['published_date'], vacancy['id'])
+            for score, vacancy in zip(scores, vacancies)
+        ))
+
+    async def _candidates(self, user_filter: Dict, since: datetime) -> Tuple[List[Dict], Dict[int, float]]:
+        """Kalit so'zlar bo'yicha eng relevant nomzodlar; kam bo'lsa - eng yangilari bilan to'ldiriladi"""
+        await search_index.refresh(db.pool)
+        relevance, vacancies = {}, []
+        if search_index.ready and user_filter.get('keywords'):
+            relevance = dict(search_index.search(user_filter['keywords'], self.candidates))
+            if relevance:
+                vacancies = await db.get_match_candidates(since, list(relevance), limit=self.candidates)
+        if len(vacancies) < self.top_k:
+            seen = {vacancy['id'] for vacancy in vacancies}
+            vacancies += [
+                vacancy for vacancy in await db.get_match_candidates(since, limit=self.candidates)
+                if vacancy['id'] not in seen
+            ]
+        return vacancies, relevance
+
+    async def get(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """Top tavsiyalar (vakansiya + match_score); hisoblanmagan yoki eskirgan bo'lsa - qayta hisoblanadi"""
+        now = datetime.now(timezone.utc)
+        rows = await db.get_recommendations(user_id, now - self.window, now - self.rebuild_after, limit)
+        if rows == []:
+            await self.rebuild(user_id)
+            rows = await db.get_recommendations(user_id, now - self.window, now - self.rebuild_after, limit)
+        return rows or []
+
+    async def rebuild(self, user_id: int):
+        """Oxirgi window dagi eng yangi vakansiyalardan to'liq qayta hisoblash"""
+        built_at = datetime.now(timezone.utc)
+        user_filter = await db.get_user_filter(user_id)
+        vacancies, relevance = await self._candidates(user_filter, built_at - self.window)
+        scores = score_matrix(VacancyBatch(vacancies), [user_filter])[0].tolist()
+        top = self._top(scores, relevance, vacancies, self.top_k)
+        await db.save_recommendations(user_id, built_at, [
+            (vacancy_id, score, rel, published_date) for score, rel, published_date, vacancy_id in top
+        ])
+
+    async def on_ingest(self, vacancy_ids: List[int]):
+        """Yangi vakansiyalarni faqat tavsiyalari saqlangan premium userlarga qarshi baholash"""
+        if not vacancy_ids:
+            return
+        try:
+            users = await db.get_recommendation_users()
+            if not users:
+                return
+            since = datetime.now(timezone.utc) - self.window
+            vacancies = await db.get_match_candidates(since, vacancy_ids, limit=len(vacancy_ids))
+            if not vacancies:
+                return
+            for vacancy in vacancies:
+                search_index.add(vacancy)
+            new_ids = [vacancy['id'] for vacancy in vacancies]
+
+            # Barcha userlar x yangi vakansiyalar - bitta matritsa
+            matrix = score_matrix(VacancyBatch(vacancies), users)
+            items = []
+            for user_filter, scores in zip(users, matrix.tolist()):
+                relevance = search_index.score(user_filter.get('keywords') or [], new_ids) \
+                    if search_index.ready else {}
+                top = self._top(scores, relevance, vacancies, self.top_k)
+                if user_filter['kept'] >= self.top_k:
+                    # To'la top-K ga faqat eng pastidan kam bo'lmaganlar kirishi mumkin
+                    top = [item for item in top if item[0] >= user_filter['min_score']]
+                items += [
+                    (user_filter['user_id'], vacancy_id, score, rel, published_date)
+                    for score, rel, published_date, vacancy_id in top
+                ]
+            await db.add_recommendations(items, self.top_k, since)
+            logger.info(
+                f"🎯 Tavsiyalar: {len(vacancies)} ta yangi vakansiya x {len(users)} ta user, "
+                f"{len(items)} ta qo'shildi"
+            )
+        except Exception as e:
+            logger.error(f"❌ Tavsiyalarni yangilash xatolik: {e}")
+
+
+# Global obyekt
+recommendations = Recommendations(
+    top_k=RECOMMENDATIONS_TOP_K,
+    window_days=RECOMMENDATIONS_WINDOW_DAYS,
+    rebuild_hours=RECOMMENDATIONS_REBUILD_HOURS,
+    candidates=RECOMMENDATIONS_CANDIDATES,
+)
@@ -0,0 +1,135 @@
+"""
+Smart matching ballari - NumPy bilan batch hisoblash
+
+handlers.smart_matching.calculate_match_score bilan bir xil natija beradi,
+lekin nomzodlar to'plami bir marta ustunli ko'rinishga o'tkaziladi:
+
+- kalit so'zlar hit matritsasi (vakansiya x kalit so'z, har bir kalit so'z
+  ustuni bir marta hisoblanadi va barcha userlar uchun ishlatiladi);
+- joylashuv kodlari (takrorlanmaydigan joylashuvlar, substring tekshiruvi
+  har bir user uchun joylashuvlar soni bo'yicha, vakansiyalar bo'yicha emas);
+- maosh chegaralari (yo'q qiymat - 0) va tajriba kodlari.
+
+Ballar ko'p userlar x ko'p vakansiyalar matritsasi sifatida vektor
+amallari bilan hisoblanadi.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+MID_EXPERIENCE = ('between_1_and_3', 'between_3_and_6')
+NOT_SPECIFIED = 'not_specified'
+
+
+class VacancyBatch:
+    """Nomzod vakansiyalarning ustunli ko'rinishi"""
+
+    def __init__(self, vacancies: List[Dict]):
+        self.size = len(vacancies)
+        self._texts = [
+            f"{vacancy.get('title', '')} {vacancy.get('description', '')}".lower()
+            for vacancy in vacancies
+        ]
+        self._keyword_columns: Dict[str, np.ndarray] = {}
+
+        # Joylashuvlar -> kodlar (takrorlanmaydiganlari bo'yicha)
+        location_codes: Dict[str, int] = {}
+        self.location_codes = np.fromiter(
+            (location_codes.setdefault((vacancy.get('location') or '').lower(), len(location_codes))
+             for vacancy in vacancies),
+            dtype=np.int64, count=self.size
+        )
+        self.locations = list(location_codes)
+
+        # Maosh: None -> 0 (calculate_match_score da ham "yo'q" hisoblanadi)
+        self.salary_min = np.array([vacancy.get('salary_min') or 0 for vacancy in vacancies], dtype=np.float64)
+        self.salary_max = np.array([vacancy.get('salary_max') or 0 for vacancy in vacancies], dtype=np.float64)
+
+        # Tajriba: bo'sh -> -1
+        experience_codes: Dict[str, int] = {}
+        self.experience_codes = np.fromiter(
+            (experience_codes.setdefault(vacancy['experience_level'], len(experience_codes))
+             if vacancy.get('experience_level') else -1
+             for vacancy in vacancies),
+            dtype=np.int64, count=self.size
+        )
+        self.experience_index = experience_codes
+
+    def keyword_hits(self, keywords: List[str]) -> np.ndarray:
+        """(vakansiya x kalit so'z) bool matritsa; kalit so'zlar kichik harfda"""
+        hits = np.zeros((self.size, len(keywords)), dtype=bool)
+        for index, keyword in enumerate(keywords):
+            column = self._keyword_columns.get(keyword)
+            if column is None:
+                column = np.fromiter((keyword in text for text in self._texts), dtype=bool, count=self.size)
+                self._keyword_columns[keyword] = column
+            hits[:, index] = column
+        return hits
+
+
+def score_matrix(batch: VacancyBatch, user_filters: List[Dict]) -> np.ndarray:
+    """(user x vakansiya) match % matritsasi - calculate_match_score bilan bir xil"""
+    users = len(user_filters)
+    if not users or not batch.size:
+        return np.zeros((users, batch.size), dtype=np.int64)
+
+    # Keywords (40%): mos kelganlar soni = user kalit so'zlari soni x hit matritsa
+    user_keywords = [[kw.lower() for kw in (f.get('keywords') or [])] for f in user_filters]
+    vocabulary = {kw: index for index, kw in enumerate(sorted({kw for kws in user_keywords for kw in kws}))}
+    counts = np.zeros((users, len(vocabulary)), dtype=np.float64)
+    for row, kws in enumerate(user_keywords):
+        for kw in kws:
+            counts[row, vocabulary[kw]] += 1
+    matched = counts @ batch.keyword_hits(list(vocabulary)).T.astype(np.float64)
+    total = np.array([len(kws) for kws in user_keywords], dtype=np.float64)[:, None]
+    has_keywords = total > 0
+    keyword_score = np.where(
+        has_keywords,
+        np.trunc(matched / np.where(has_keywords, total, 1) * 40),
+        20
+    )
+
+    # Location (20%): user x takrorlanmaydigan joylashuv jadvali -> vakansiyalarga
+    location_table = np.array([
+        [any(loc.lower() in location for loc in (f.get('locations') or [])) for location in batch.locations]
+        for f in user_filters
+    ], dtype=bool).reshape(users, len(batch.locations))
+    has_locations = np.array([bool(f.get('locations')) for f in user_filters])[:, None]
+    location_score = np.where(has_locations, np.where(location_table[:, batch.location_codes], 20, 0), 10)
+
+    # Salary (20%)
+    user_salary = np.array([f.get('salary_min') or 0 for f in user_filters], dtype=np.float64)[:, None]
+    vac_min, vac_max = batch.salary_min[None, :], batch.salary_max[None, :]
+    salary_score = np.where(
+        (user_salary != 0) & ((vac_min != 0) | (vac_max != 0)),
+        np.where((vac_max != 0) & (vac_max >= user_salary), 20,
+                 np.where((vac_min != 0) & (vac_min >= user_salary * 0.8), 15, 0)),
+        10
+    )
+
+    # Experience (20%): -2 - user tajribasi bo'sh, -3 - vakansiyalarda uchramaydi
+    user_experience = np.array([
+        batch.experience_index.get(f['experience_level'], -3) if f.get('experience_level') else -2
+        for f in user_filters
+    ], dtype=np.int64)[:, None]
+    user_mid = np.array([f.get('experience_level') in MID_EXPERIENCE for f in user_filters])[:, None]
+    vac_experience = batch.experience_codes[None, :]
+    vac_not_specified = vac_experience == batch.experience_index.get(NOT_SPECIFIED, -4)
+    experience_score = np.where(
+        (user_experience == -2) | (vac_experience == -1),
+        10,
+        np.where(vac_experience == user_experience, 20, np.where(user_mid & vac_not_specified, 15, 0))
+    )
+
+    scores = keyword_score + location_score + salary_score + experience_score
+    return np.minimum(scores, 100).astype(np.int64)
+
+
+def calculate_match_scores(vacancies: List[Dict], user_profile: Dict) -> List[int]:
+    """Bitta user uchun ballar ro'yxati (vakansiyalar tartibida)"""
+    return score_matrix(VacancyBatch(vacancies), [user_profile])[0].tolist()
+
+
+# benchmarks.bench_filters --compare: (vacancies, user_filter) -> ballar ro'yxati
+calculate_match_scores.batch = True
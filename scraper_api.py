@@ -3,6 +3,11 @@ import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
 import logging
+import time
+
+from config import HH_API_URL
+from metrics import SCRAPE_DURATION, SCRAPE_ERRORS
+from scraper_recorder import scraper_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +15,7 @@ class VacancyScraperAPI:
     """hh.uz API orqali vakansiyalarni yig'ish"""
     
     def __init__(self):
-        self.base_url = 'https://api.hh.uz'
+        self.base_url = HH_API_URL
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'application/json',
@@ -53,10 +58,13 @@ class VacancyScraperAPI:
                           pages: int = 5) -> List[Dict]:
         """hh.uz API dan vakansiyalarni yig'ish"""
         vacancies = []
+        start_time = time.perf_counter()
         
         # Location ID ni aniqlash (dynamic)
         location_lower = location.lower() if location else 'tashkent'
         area_id = self.area_ids.get(location_lower, '2759')  # Default: Tashkent
+        # Metrika labeli - user filtridagi ixtiyoriy matn emas, ma'lum shaharlar yoki 'other'
+        target = location_lower if location_lower in self.area_ids else 'other'
         
         # Keywords'ni birlashtirish
         search_text = ' '.join(keywords) if keywords else 'python'
@@ -80,6 +88,7 @@ class VacancyScraperAPI:
                 async with session.get(url, params=params, timeout=30) as response:
                     if response.status == 200:
                         data = await response.json()
+                        scraper_recorder.record('hh_uz', {'url': url, 'params': params}, data)
                         items = data.get('items', [])
                         found = data.get('found', 0)
                         
@@ -89,14 +98,7 @@ class VacancyScraperAPI:
                             logger.warning("Items bo'sh, to'xtatilmoqda")
                             break
                         
-                        for item in items:
-                            try:
-                                vacancy = self.parse_vacancy(item)
-                                if vacancy:
-                                    vacancies.append(vacancy)
-                            except Exception as e:
-                                logger.error(f"Item parse xatolik: {e}")
-                                continue
+                        vacancies.extend(self.parse_page(data))
                         
                         # Agar oxirgi sahifa bo'lsa
                         total_pages = data.get('pages', 0)
@@ -105,21 +107,38 @@ class VacancyScraperAPI:
                             break
                     else:
                         logger.error(f"API xatolik: Status {response.status}")
+                        SCRAPE_ERRORS.labels(source='hh_uz', target=target).inc()
                         break
             
             except asyncio.TimeoutError:
                 logger.error(f"Timeout: page {page}")
+                SCRAPE_ERRORS.labels(source='hh_uz', target=target).inc()
                 break
             except Exception as e:
                 logger.error(f"API request xatolik: {e}", exc_info=True)
+                SCRAPE_ERRORS.labels(source='hh_uz', target=target).inc()
                 break
             
             # API rate limiting uchun kutish
             await asyncio.sleep(0.5)
         
+        SCRAPE_DURATION.labels(source='hh_uz', target=target).observe(time.perf_counter() - start_time)
         logger.info(f"✅ Jami {len(vacancies)} ta vakansiya topildi va parse qilindi")
         return vacancies
     
+    def parse_page(self, data: Dict) -> List[Dict]:
+        """Bitta API sahifasidagi vakansiyalarni parse qilish"""
+        vacancies = []
+        for item in data.get('items', []):
+            try:
+                vacancy = self.parse_vacancy(item)
+                if vacancy:
+                    vacancies.append(vacancy)
+            except Exception as e:
+                logger.error(f"Item parse xatolik: {e}")
+                continue
+        return vacancies
+    
     def parse_vacancy(self, item: Dict) -> Optional[Dict]:
         """API dan kelgan vakansiyani parse qilish"""
         try:
@@ -0,0 +1,73 @@
+"""
+Scraper javoblarini yozib olish (record/replay fixture lar uchun)
+
+SCRAPER_RECORD_DIR o'rnatilgan bo'lsa, scraperlar olgan xom javoblar
+(hh.uz JSON sahifalari, UzJobs HTML, Telegram xabarlari) gzip JSON fayllarga
+yoziladi. Fayllar benchmarks/replay_scrapers.py orqali tarmoqsiz, haqiqiy
+parse kodi bilan qayta o'ynaladi.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_SUFFIX = '.json.gz'
+
+
+class ScraperRecorder:
+    """Xom javoblarni {directory}/{source}/ ichiga yozish"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def record(self, source: str, request: Dict[str, Any], payload: Any) -> Optional[str]:
+        """Bitta javobni yozish - xatolik scrapingni to'xtatmaydi"""
+        if not self.enabled:
+            return None
+        try:
+            source_dir = os.path.join(self.directory, source)
+            os.makedirs(source_dir, exist_ok=True)
+            path = os.path.join(source_dir, f"{time.time_ns()}{FIXTURE_SUFFIX}")
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'source': source,
+                    'recorded_at': time.time(),
+                    'request': request,
+                    'payload': payload,
+                }, f, ensure_ascii=False, default=str)
+            return path
+        except Exception as e:
+            logger.warning(f"Scraper javobini yozib bo'lmadi ({source}): {e}")
+            return None
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_fixtures(directory: str, source: Optional[str] = None) -> Iterator[str]:
+    """Fixture fayllar yo'llari (manba va vaqt bo'yicha tartiblangan)"""
+    if not os.path.isdir(directory):
+        return
+    sources = [source] if source else sorted(os.listdir(directory))
+    for name in sources:
+        source_dir = os.path.join(directory, name)
+        if not os.path.isdir(source_dir):
+            continue
+        for filename in sorted(os.listdir(source_dir)):
+            if filename.endswith(FIXTURE_SUFFIX) and not filename.endswith('.expected' + FIXTURE_SUFFIX):
+                yield os.path.join(source_dir, filename)
+
+
+# Global recorder (SCRAPER_RECORD_DIR bo'sh bo'lsa o'chirilgan)
+scraper_recorder = ScraperRecorder(os.getenv('SCRAPER_RECORD_DIR'))
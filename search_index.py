@@ -0,0 +1,173 @@
+"""
+Vakansiyalar matni bo'yicha BM25 indeksi (xotirada)
+
+Oxirgi RECOMMENDATIONS_WINDOW_DAYS kun vakansiyalarining title (ikki
+baravar og'irlik bilan), description va company matni inverted index ga
+olinadi: so'z -> {vacancies.id: tf}. Smart tavsiyalar nomzodlarni "eng
+yangi N ta" emas, user kalit so'zlari bo'yicha BM25 relevance tartibida
+oladi, teng match % lar ham relevance bo'yicha saralanadi.
+
+Indeks birinchi so'rovda bazadan quriladi, keyin yangi vakansiyalar
+saqlanganda (add) va refresh() da (oxirgi id dan keyingilar - boshqa
+replikalar saqlaganlari uchun) to'ldiriladi. Muddati o'tgan hujjatlar
+so'rov paytida o'zi chiqib ketadi.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import RECOMMENDATIONS_WINDOW_DAYS, SEARCH_INDEX_ENABLED
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+REFRESH_INTERVAL = 60  # bazadan yangi vakansiyalarni shundan tez-tez o'qimaslik, soniya
+ID_OVERLAP = 1000      # kechikib commit bo'lgan id lar uchun
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """vacancies.id -> BM25 hujjat (title, description, company)"""
+
+    def __init__(self, enabled: bool = True, window_days: int = 7):
+        self.enabled = enabled
+        self.window = timedelta(days=window_days)
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._terms: Dict[int, Counter] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._expiry: List[Tuple[datetime, int]] = []  # (published_date, id) heap
+        self._max_id = 0
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """False bo'lsa - nomzodlar eng yangilari bo'yicha olinadi"""
+        return self.enabled and self._loaded
+
+    def __len__(self):
+        return len(self._terms)
+
+    # ========== HUJJATLAR ==========
+
+    def add(self, vacancy):
+        """Vakansiya (dict yoki Record: id, title, description, company, published_date)"""
+        doc_id = vacancy['id']
+        if doc_id in self._terms or vacancy['published_date'] <= datetime.now(timezone.utc) - self.window:
+            return
+        tokens = (tokenize(vacancy.get('title')) * TITLE_WEIGHT
+                  + tokenize(vacancy.get('description'))
+                  + tokenize(vacancy.get('company')))
+        terms = Counter(tokens)
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._terms[doc_id] = terms
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+        heapq.heappush(self._expiry, (vacancy['published_date'], doc_id))
+        self._max_id = max(self._max_id, doc_id)
+
+    def _remove(self, doc_id: int):
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def _expire(self):
+        cutoff = datetime.now(timezone.utc) - self.window
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            _, doc_id = heapq.heappop(self._expiry)
+            self._remove(doc_id)
+
+    # ========== QIDIRUV ==========
+
+    def search(self, keywords: List[str], limit: int) -> List[Tuple[int, float]]:
+        """Eng relevant limit ta: [(vacancies.id, bm25)] - kamayish tartibida"""
+        scores = self._score(keywords, None)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def score(self, keywords: List[str], doc_ids: Iterable[int]) -> Dict[int, float]:
+        """Faqat berilgan hujjatlar uchun BM25 (mos so'zi yo'qlari natijada bo'lmaydi)"""
+        return self._score(keywords, doc_ids)
+
+    def _score(self, keywords: List[str], doc_ids: Optional[Iterable[int]]) -> Dict[int, float]:
+        self._expire()
+        count = len(self._terms)
+        if not count:
+            return {}
+        if doc_ids is not None:
+            doc_ids = list(doc_ids)
+        avg_length = self._total_length / count or 1
+        scores: Dict[int, float] = {}
+        for term in {term for keyword in keywords for term in tokenize(keyword)}:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            items = postings.items() if doc_ids is None else \
+                ((doc_id, postings[doc_id]) for doc_id in doc_ids if doc_id in postings)
+            for doc_id, tf in items:
+                norm = K1 * (1 - B + B * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        return scores
+
+    # ========== BAZADAN YUKLASH ==========
+
+    async def refresh(self, pool):
+        """Birinchi chaqiruvda qurish, keyin oxirgi id dan keyingilarni qo'shish"""
+        if not self.enabled or time.monotonic() - self._refreshed_at < REFRESH_INTERVAL:
+            return
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at < REFRESH_INTERVAL:
+                return
+            try:
+                start = time.perf_counter()
+                loaded = self._loaded
+                await self._load(pool, self._max_id - ID_OVERLAP if loaded else None)
+                self._loaded = True
+                self._refreshed_at = time.monotonic()
+                if not loaded:
+                    logger.info(
+                        f"🔎 Qidiruv indeksi qurildi: {len(self)} ta vakansiya, "
+                        f"{len(self._postings)} ta so'z, {time.perf_counter() - start:.1f}s"
+                    )
+            except Exception as e:
+                logger.error(f"❌ Qidiruv indeksini yangilash xatolik: {e}")
+
+    async def _load(self, pool, after_id: Optional[int]):
+        query = '''
+            SELECT id, title, description, company, published_date
+            FROM vacancies WHERE published_date > $1
+        '''
+        args = [datetime.now(timezone.utc) - self.window]
+        if after_id is not None:
+            query += ' AND id > $2'
+            args.append(after_id)
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(query, *args, prefetch=5000):
+                    self.add(row)
+
+
+search_index = SearchIndex(enabled=SEARCH_INDEX_ENABLED, window_days=RECOMMENDATIONS_WINDOW_DAYS)
@@ -9,6 +9,10 @@ import re
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
 import logging
+import time
+
+from metrics import SCRAPE_DURATION, SCRAPE_ERRORS
+from scraper_recorder import scraper_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +46,8 @@ class TelegramVacancyScraper:
             self.vacancy_channels = [
                 '@UstozShogirdSohalar', '@ishmi_ish', '@techjobs_vakansiya', '@vakansiyaa_ishbor', '@freelancer_Uzbek', '@freelance_uzb'
             ]
+        # Metrika labellari - faqat sozlangan kanallar, qolganlari 'other'
+        self._metric_channels = frozenset(self.vacancy_channels)
         
         # Vakansiya trigger so'zlari (kengroq)
         self.vacancy_triggers = [
@@ -252,6 +258,25 @@ class TelegramVacancyScraper:
         logger.info(f"✅ Telegram vakansiya: {title[:50]} from {channel_name}")
         return vacancy
     
+    def parse_messages(self, messages, channel: str) -> List[Dict]:
+        """Kanal xabarlaridan (id, text, date atributlari bilan) vakansiyalarni ajratish"""
+        vacancies = []
+        for msg in messages:
+            try:
+                vacancy = self.parse_vacancy_from_text(
+                    msg.text,
+                    channel,
+                    msg.id,
+                    msg.date
+                )
+                
+                if vacancy:
+                    vacancies.append(vacancy)
+            except Exception as e:
+                logger.debug(f"   Parse error: {e}")
+                continue
+        return vacancies
+    
     async def scrape_channels(self, limit_per_channel: int = 30) -> List[Dict]:
         """Kanallardan vakansiyalarni yig'ish"""
         if not self.is_available():
@@ -267,6 +292,8 @@ class TelegramVacancyScraper:
         for channel in self.vacancy_channels:
             try:
                 logger.info(f"📱 Kanal scraping: {channel}")
+                start_time = time.perf_counter()
+                target = channel if channel in self._metric_channels else 'other'
                 
                 # Oxirgi xabarlarni olish
                 messages = []
@@ -276,29 +303,26 @@ class TelegramVacancyScraper:
                             messages.append(message)
                 except Exception as e:
                     logger.error(f"   ❌ Kanal {channel} dan xabar olishda xatolik: {e}")
+                    SCRAPE_ERRORS.labels(source='telegram', target=target).inc()
                     continue
+                finally:
+                    SCRAPE_DURATION.labels(source='telegram', target=target).observe(time.perf_counter() - start_time)
                 
                 logger.info(f"   {channel}: {len(messages)} ta xabar topildi")
                 
+                if scraper_recorder.enabled:
+                    scraper_recorder.record(
+                        'telegram',
+                        {'channel': channel, 'limit': limit_per_channel},
+                        [{'id': m.id, 'text': m.text, 'date': m.date.isoformat() if m.date else None}
+                         for m in messages]
+                    )
+                
                 # Parse qilish
-                parsed_count = 0
-                for msg in messages:
-                    try:
-                        vacancy = self.parse_vacancy_from_text(
-                            msg.text,
-                            channel,
-                            msg.id,
-                            msg.date
-                        )
-                        
-                        if vacancy:
-                            vacancies.append(vacancy)
-                            parsed_count += 1
-                    except Exception as e:
-                        logger.debug(f"   Parse error: {e}")
-                        continue
+                parsed = self.parse_messages(messages, channel)
+                vacancies.extend(parsed)
                 
-                logger.info(f"   ✅ {channel}: {parsed_count} ta vakansiya parse qilindi")
+                logger.info(f"   ✅ {channel}: {len(parsed)} ta vakansiya parse qilindi")
                 
             except Exception as e:
                 logger.error(f"   ❌ Kanal {channel} scraping xatolik: {e}")
@@ -5,6 +5,11 @@ from typing import List, Dict, Optional
 from datetime import datetime, timezone
 import logging
 import re
+import time
+
+from config import UZJOBS_URL
+from metrics import SCRAPE_DURATION, SCRAPE_ERRORS
+from scraper_recorder import scraper_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +17,7 @@ class UzJobsScraper:
     """uzjobs.com saytidan vakansiyalarni yig'ish"""
     
     def __init__(self):
-        self.base_url = 'https://uzjobs.com'
+        self.base_url = UZJOBS_URL
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
@@ -25,33 +30,45 @@ class UzJobsScraper:
         # Qidiruv sahifasi
         url = f"{self.base_url}/ru/vacancy/search"
         params = {'q': search_query}
+        start_time = time.perf_counter()
         
         try:
             async with aiohttp.ClientSession(headers=self.headers) as session:
                 async with session.get(url, params=params, timeout=30) as response:
                     if response.status != 200:
                         logger.error(f"UzJobs error: {response.status}")
+                        SCRAPE_ERRORS.labels(source='uzjobs', target='search').inc()
                         return []
                     
                     html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Vakansiya bloklarini topish
-                    items = soup.select('.vacancy-box') # Bu selektorni tekshirish kerak
-                    if not items:
-                        # Fallback selektor
-                        items = soup.find_all('div', class_='vacancy-item')
-                    
-                    for item in items:
-                        vacancy = self.parse_item(item)
-                        if vacancy:
-                            vacancies.append(vacancy)
+                    scraper_recorder.record('uzjobs', {'url': url, 'params': params}, html)
+                    vacancies = self.parse_html(html)
                             
         except Exception as e:
             logger.error(f"UzJobs scraper error: {e}")
+            SCRAPE_ERRORS.labels(source='uzjobs', target='search').inc()
+        finally:
+            SCRAPE_DURATION.labels(source='uzjobs', target='search').observe(time.perf_counter() - start_time)
             
         return vacancies
 
+    def parse_html(self, html: str) -> List[Dict]:
+        """Qidiruv sahifasi HTML idan vakansiyalarni ajratish"""
+        vacancies = []
+        soup = BeautifulSoup(html, 'lxml')
+        
+        # Vakansiya bloklarini topish
+        items = soup.select('.vacancy-box') # Bu selektorni tekshirish kerak
+        if not items:
+            # Fallback selektor
+            items = soup.find_all('div', class_='vacancy-item')
+        
+        for item in items:
+            vacancy = self.parse_item(item)
+            if vacancy:
+                vacancies.append(vacancy)
+        return vacancies
+
     def parse_item(self, item) -> Optional[Dict]:
         """Bir dona vakansiya itemini parse qilish"""
         try:
@@ -0,0 +1,67 @@
+"""
+Health check va webhook uchun aiohttp server
+
+Bot bilan bitta event loop ichida ishlaydi (alohida Flask thread kerak emas).
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from metrics import metrics_handler
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Webhook handler - bir vaqtda qayta ishlanadigan updatelar soni cheklangan"""
+
+    def __init__(self, *args, max_concurrent_updates: int = 50, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._semaphore = asyncio.Semaphore(max_concurrent_updates)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        # Limit to'lganda javobni kechiktiramiz - Telegram yangi update yubormay kutadi
+        await self._semaphore.acquire()
+        try:
+            return await super()._handle_request_background(bot=bot, request=request)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        try:
+            await super()._background_feed_update(bot=bot, update=update)
+        finally:
+            self._semaphore.release()
+
+
+async def home(request: web.Request) -> web.Response:
+    return web.Response(text="Bot ishlayapti ✅")
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.Response(text="OK")
+
+
+def create_web_app() -> web.Application:
+    """Health va metrics endpointlari bilan aiohttp ilova"""
+    app = web.Application()
+    app.router.add_get('/', home)
+    app.router.add_get('/health', health)
+    app.router.add_get('/metrics', metrics_handler)
+    return app
+
+
+async def start_web_server(app: web.Application, host: str, port: int) -> web.AppRunner:
+    """Serverni joriy event loop da ishga tushirish"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"🌐 Web server: http://{host}:{port}")
+    return runner